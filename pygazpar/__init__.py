@@ -1,10 +1,35 @@
+from pygazpar.aggregator import FrequencyAggregator  # noqa: F401
+from pygazpar.analytics import ConsumptionAnalytics  # noqa: F401
+from pygazpar.backfill import (  # noqa: F401
+    BackfillCheckpoint,
+    BackfillEngine,
+    BackfillError,
+)
+from pygazpar.billing import BillingReconciler  # noqa: F401
+from pygazpar.cache import MemoryResultCache, SharedMemoryResultCache  # noqa: F401
 from pygazpar.client import Client  # noqa: F401
+from pygazpar.daemon import PollingDaemon  # noqa: F401
 from pygazpar.datasource import (  # noqa: F401
+    DirectoryDataSource,
     ExcelFileDataSource,
     ExcelWebDataSource,
     JsonFileDataSource,
     JsonWebDataSource,
+    MemoryMappedDataSource,
+    PublishedJsonFileDataSource,
+    PublishedJsonWebDataSource,
     TestDataSource,
 )
 from pygazpar.enum import Frequency, PropertyName  # noqa: F401
+from pygazpar.fleet import FleetClient, FleetError  # noqa: F401
+from pygazpar.gapplanner import GapPlanner  # noqa: F401
+from pygazpar.profiler import Profiler  # noqa: F401
+from pygazpar.ratelimiter import RateLimiter  # noqa: F401
+from pygazpar.sink import (  # noqa: F401
+    CsvSink,
+    InfluxLineProtocolSink,
+    JsonLinesSink,
+    SqlSink,
+)
+from pygazpar.snapshot import FileSnapshotStore, MemorySnapshotStore  # noqa: F401
 from pygazpar.version import __version__  # noqa: F401
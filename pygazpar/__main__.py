@@ -1,9 +1,13 @@
 import argparse
+import contextlib
 import json
 import logging
 import os
+import signal
 import sys
 import traceback
+from datetime import date, timedelta
+from typing import Optional
 
 import pygazpar
 
@@ -12,6 +16,11 @@ Logger = logging.getLogger(__name__)
 
 def main():
     """Main function"""
+    if sys.argv[1:2] == ["serve"]:
+        return serve(sys.argv[2:])
+    if sys.argv[1:2] == ["backfill"]:
+        return backfill(sys.argv[2:])
+
     parser = argparse.ArgumentParser()
     parser.add_argument("-v", "--version", action="version", version=f"PyGazpar {pygazpar.__version__}")
     parser.add_argument("-u", "--username", required=True, help="GRDF username (email)")
@@ -36,25 +45,25 @@ def main():
         help="Get only the last N days of records (default: 365 days)",
     )
     parser.add_argument("--datasource", required=False, default="json", help="Datasource: json | excel | test")
+    parser.add_argument(
+        "--profile",
+        required=False,
+        action="store_true",
+        help="Print the time and the memory peak of each stage of the run",
+    )
+    parser.add_argument(
+        "--profile-output",
+        required=False,
+        dest="profileOutput",
+        help="With --profile, also write a pstats file (*.pstats, *.prof) or a speedscope file (*.json)",
+    )
 
     args = parser.parse_args()
 
     print(f"PyGazpar version: {pygazpar.__version__}")
     print(f"Running on Python version: {sys.version}")
 
-    # We create the tmp directory if not already exists.
-    if not os.path.exists(args.tmpdir):
-        os.mkdir(args.tmpdir)
-
-    # We remove the pygazpar log file.
-    pygazparLogFile = f"{args.tmpdir}/pygazpar.log"
-    if os.path.isfile(pygazparLogFile):
-        os.remove(pygazparLogFile)
-
-    # Setup logging.
-    logging.basicConfig(
-        filename=f"{pygazparLogFile}", level=logging.DEBUG, format="%(asctime)s %(levelname)s [%(name)s] %(message)s"
-    )
+    _setupLogging(args.tmpdir)
 
     Logger.info(f"PyGazpar version: {pygazpar.__version__}")
     Logger.info(f"Running on Python version: {sys.version}")
@@ -62,15 +71,16 @@ def main():
     Logger.info(f"--frequency {args.frequency}")
     Logger.info(f"--lastNDays {args.lastNDays}")
     Logger.info(f"--datasource {bool(args.datasource)}")
+    Logger.info(f"--profile {args.profile}")
+
+    dataSource = _createDataSource(args.datasource, args.username, args.password, args.tmpdir)
+
+    profiler = None
+    if args.profile:
+        withCProfile = args.profileOutput is not None and not args.profileOutput.endswith(".json")
+        profiler = pygazpar.Profiler(withCProfile=withCProfile)
 
-    if args.datasource == "json":
-        client = pygazpar.Client(pygazpar.JsonWebDataSource(args.username, args.password))
-    elif args.datasource == "excel":
-        client = pygazpar.Client(pygazpar.ExcelWebDataSource(args.username, args.password, args.tmpdir))
-    elif args.datasource == "test":
-        client = pygazpar.Client(pygazpar.TestDataSource())
-    else:
-        raise ValueError("Invalid datasource: (json | excel | test) is expected")
+    client = pygazpar.Client(dataSource, profiler=profiler)
 
     try:
         data = client.load_since(args.pce, int(args.lastNDays), [args.frequency])
@@ -80,10 +90,222 @@ def main():
 
     Logger.info(f"Data loaded: {len(data)} records")
     Logger.debug(f"Data: {data}")
-    print(json.dumps(data, indent=2))
+
+    profiling = profiler.activate() if profiler is not None else contextlib.nullcontext()
+    with profiling, pygazpar.Profiler.stage("serialize output"):
+        output = json.dumps(data, indent=2)
+    print(output)
+
+    if profiler is not None:
+        # The data go to stdout: the profile goes to stderr.
+        print(profiler.summary(), file=sys.stderr)
+        if args.profileOutput is not None:
+            if args.profileOutput.endswith(".json"):
+                profiler.dump_speedscope(args.profileOutput)
+            else:
+                profiler.dump_stats(args.profileOutput)
+            print(f"Profile written to {args.profileOutput}", file=sys.stderr)
 
     return 0
 
 
+def serve(argv: list[str]) -> int:
+    """Polling daemon: writes the new or changed daily readings of the PCEs as JSON lines until stopped"""
+    parser = argparse.ArgumentParser(prog="pygazpar serve")
+    parser.add_argument("-u", "--username", required=True, help="GRDF username (email)")
+    parser.add_argument("-p", "--password", required=True, help="GRDF password")
+    parser.add_argument(
+        "-c",
+        "--pce",
+        required=False,
+        action="append",
+        dest="pces",
+        help="GRDF PCE identifier, may be repeated (default is all the PCEs of the account)",
+    )
+    parser.add_argument("-t", "--tmpdir", required=False, default="/tmp", help="tmp directory (default is /tmp)")
+    parser.add_argument(
+        "-d",
+        "--lastNDays",
+        required=False,
+        type=int,
+        default=pygazpar.daemon.DEFAULT_POLL_DAYS,
+        help=f"Number of last days loaded by each poll (default: {pygazpar.daemon.DEFAULT_POLL_DAYS} days)",
+    )
+    parser.add_argument(
+        "-o", "--output", required=False, default="-", help="JSON lines output file (default is the standard output)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        required=False,
+        type=float,
+        default=pygazpar.daemon.DEFAULT_POLL_INTERVAL.total_seconds() / 60,
+        dest="pollInterval",
+        help="Minutes between the polls of a PCE until its publication time is learned",
+    )
+    parser.add_argument(
+        "--min-retry-interval",
+        required=False,
+        type=float,
+        default=pygazpar.daemon.DEFAULT_MIN_RETRY_INTERVAL.total_seconds() / 60,
+        dest="minRetryInterval",
+        help="Minutes before polling again a PCE whose data is late (doubled at each attempt)",
+    )
+    parser.add_argument(
+        "--max-retry-interval",
+        required=False,
+        type=float,
+        default=pygazpar.daemon.DEFAULT_MAX_RETRY_INTERVAL.total_seconds() / 60,
+        dest="maxRetryInterval",
+        help="Maximum minutes before polling again a PCE whose data is late",
+    )
+    parser.add_argument("--datasource", required=False, default="json", help="Datasource: json | excel | test")
+
+    args = parser.parse_args(argv)
+
+    _setupLogging(args.tmpdir)
+
+    Logger.info(f"PyGazpar version: {pygazpar.__version__}")
+    Logger.info(f"Running on Python version: {sys.version}")
+    Logger.info(f"serve --pce {args.pces} --lastNDays {args.lastNDays} --output {args.output}")
+
+    client = pygazpar.Client(_createDataSource(args.datasource, args.username, args.password, args.tmpdir))
+
+    daemon = pygazpar.PollingDaemon(
+        client,
+        pygazpar.JsonLinesSink(sys.stdout if args.output == "-" else args.output),
+        pce_identifiers=args.pces,
+        poll_days=args.lastNDays,
+        poll_interval=timedelta(minutes=args.pollInterval),
+        min_retry_interval=timedelta(minutes=args.minRetryInterval),
+        max_retry_interval=timedelta(minutes=args.maxRetryInterval),
+    )
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        Logger.info("Polling daemon interrupted")
+
+    return 0
+
+
+def backfill(argv: list[str]) -> int:
+    """Backfill: loads the daily history of the PCEs into a local store, resuming from its checkpoint file"""
+    parser = argparse.ArgumentParser(prog="pygazpar backfill")
+    parser.add_argument("-u", "--username", required=True, help="GRDF username (email)")
+    parser.add_argument("-p", "--password", required=True, help="GRDF password")
+    parser.add_argument(
+        "-c",
+        "--pce",
+        required=False,
+        action="append",
+        dest="pces",
+        help="GRDF PCE identifier, may be repeated (default is all the PCEs of the account)",
+    )
+    parser.add_argument("-t", "--tmpdir", required=False, default="/tmp", help="tmp directory (default is /tmp)")
+    parser.add_argument("-s", "--store", required=True, help="Directory of the daily reading store")
+    parser.add_argument("--start", required=True, type=date.fromisoformat, help="First day of the history (YYYY-MM-DD)")
+    parser.add_argument(
+        "--end",
+        required=False,
+        type=date.fromisoformat,
+        default=date.today(),
+        help="Last day of the history (YYYY-MM-DD, default is today)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        required=False,
+        help="Checkpoint file (default is backfill.checkpoint.json in the store directory)",
+    )
+    parser.add_argument(
+        "--window-days",
+        required=False,
+        type=int,
+        default=pygazpar.backfill.DEFAULT_WINDOW_DAYS,
+        dest="windowDays",
+        help=f"Number of days loaded by each request (default: {pygazpar.backfill.DEFAULT_WINDOW_DAYS} days)",
+    )
+    parser.add_argument(
+        "--workers",
+        required=False,
+        type=int,
+        default=pygazpar.backfill.DEFAULT_MAX_WORKERS,
+        help=f"Number of windows loaded at the same time (default: {pygazpar.backfill.DEFAULT_MAX_WORKERS})",
+    )
+    parser.add_argument("--datasource", required=False, default="json", help="Datasource: json | excel | test")
+
+    args = parser.parse_args(argv)
+
+    _setupLogging(args.tmpdir)
+
+    Logger.info(f"PyGazpar version: {pygazpar.__version__}")
+    Logger.info(f"Running on Python version: {sys.version}")
+    Logger.info(f"backfill --pce {args.pces} --store {args.store} --start {args.start} --end {args.end}")
+
+    dataSource = pygazpar.MemoryMappedDataSource(
+        args.store,
+        _createDataSource(args.datasource, args.username, args.password, args.tmpdir, poolSize=args.workers),
+    )
+
+    engine = pygazpar.BackfillEngine(
+        dataSource,
+        pygazpar.BackfillCheckpoint(args.checkpoint or os.path.join(args.store, "backfill.checkpoint.json")),
+        window_days=args.windowDays,
+        max_workers=args.workers,
+    )
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: engine.stop())
+
+    try:
+        count = engine.run(args.pces, args.start, args.end)
+    except pygazpar.BackfillError as error:
+        print(f"Backfill incomplete, run it again to resume: {error}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        Logger.info("Backfill interrupted")
+        return 1
+    finally:
+        dataSource.store.close()
+
+    print(f"{count} daily readings backfilled into '{args.store}'", file=sys.stderr)
+
+    return 0
+
+
+def _setupLogging(tmpdir: str):
+
+    # We create the tmp directory if not already exists.
+    if not os.path.exists(tmpdir):
+        os.mkdir(tmpdir)
+
+    # We remove the pygazpar log file.
+    pygazparLogFile = f"{tmpdir}/pygazpar.log"
+    if os.path.isfile(pygazparLogFile):
+        os.remove(pygazparLogFile)
+
+    # Setup logging.
+    logging.basicConfig(
+        filename=f"{pygazparLogFile}", level=logging.DEBUG, format="%(asctime)s %(levelname)s [%(name)s] %(message)s"
+    )
+
+
+def _createDataSource(
+    datasource: str, username: str, password: str, tmpdir: str, poolSize: Optional[int] = None
+) -> pygazpar.datasource.IDataSource:
+
+    # With a pool size, the data source is shared between threads.
+    if datasource == "json" and poolSize is not None:
+        return pygazpar.JsonWebDataSource(username, password, threadSafe=True, poolSize=poolSize)
+    if datasource == "json":
+        return pygazpar.JsonWebDataSource(username, password)
+    if datasource == "excel":
+        return pygazpar.ExcelWebDataSource(username, password, tmpdir)
+    if datasource == "test":
+        return pygazpar.TestDataSource()
+
+    raise ValueError("Invalid datasource: (json | excel | test) is expected")
+
+
 if __name__ == "__main__":
     sys.exit(main())
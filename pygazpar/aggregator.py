@@ -0,0 +1,242 @@
+import bisect
+import logging
+from datetime import date, timedelta
+from typing import Any, Callable, Optional
+
+from pygazpar.datasource import FrequencyConverter, JsonWebDataSource
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.timeperiod import TimePeriod
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _Bucket:  # pylint: disable=too-few-public-methods
+
+    # ------------------------------------------------------
+    def __init__(self, key: date, time_period: str):
+
+        self.key = key
+        self.time_period = time_period
+        self.days = set[date]()
+        self.start_index: Any = None
+        self.end_index: Any = None
+        self.volume: Any = 0
+        self.energy: Any = 0
+        self.timestamp: Any = None
+        self.count = 0
+
+    # ------------------------------------------------------
+    def add(self, reading: dict[str, Any]):
+
+        volume = reading.get(PropertyName.VOLUME.value)
+        if volume is not None:
+            self.volume += volume
+
+        energy = reading.get(PropertyName.ENERGY.value)
+        if energy is not None:
+            self.energy += energy
+            self.count += 1
+
+        self.start_index = _min(self.start_index, reading.get(PropertyName.START_INDEX.value))
+        self.end_index = _max(self.end_index, reading.get(PropertyName.END_INDEX.value))
+        self.timestamp = _min(self.timestamp, reading.get(PropertyName.TIMESTAMP.value))
+
+    # ------------------------------------------------------
+    def remove(self, reading: dict[str, Any]) -> bool:
+
+        volume = reading.get(PropertyName.VOLUME.value)
+        if volume is not None:
+            self.volume -= volume
+
+        energy = reading.get(PropertyName.ENERGY.value)
+        if energy is not None:
+            self.energy -= energy
+            self.count -= 1
+
+        # Returns True if the removed reading holds one of the extrema: they must be recomputed.
+        return (
+            reading.get(PropertyName.START_INDEX.value) == self.start_index
+            or reading.get(PropertyName.END_INDEX.value) == self.end_index
+            or reading.get(PropertyName.TIMESTAMP.value) == self.timestamp
+        )
+
+    # ------------------------------------------------------
+    def resetExtrema(self, readings: list[dict[str, Any]]):
+
+        self.start_index = None
+        self.end_index = None
+        self.timestamp = None
+        for reading in readings:
+            self.start_index = _min(self.start_index, reading.get(PropertyName.START_INDEX.value))
+            self.end_index = _max(self.end_index, reading.get(PropertyName.END_INDEX.value))
+            self.timestamp = _min(self.timestamp, reading.get(PropertyName.TIMESTAMP.value))
+
+    # ------------------------------------------------------
+    def toReading(self) -> dict[str, Any]:
+
+        return {
+            PropertyName.TIME_PERIOD.value: self.time_period,
+            PropertyName.START_INDEX.value: self.start_index,
+            PropertyName.END_INDEX.value: self.end_index,
+            PropertyName.VOLUME.value: self.volume,
+            PropertyName.ENERGY.value: self.energy,
+            PropertyName.TIMESTAMP.value: self.timestamp,
+        }
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _min(current: Any, value: Any) -> Any:
+
+    if value is None:
+        return current
+    if current is None:
+        return value
+    return min(current, value)
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _max(current: Any, value: Any) -> Any:
+
+    if value is None:
+        return current
+    if current is None:
+        return value
+    return max(current, value)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FrequencyAggregator:
+    """Maintains the weekly, monthly and yearly aggregates of a daily history incrementally.
+
+    Appending or correcting N daily readings only touches the buckets those days belong to. The produced
+    aggregates are the same as the ones of FrequencyConverter.computeWeekly/computeMonthly/computeYearly.
+    """
+
+    # Minimum number of days for a bucket to be complete (the last bucket is always kept).
+    MIN_DAY_COUNT = {
+        Frequency.WEEKLY: 7,
+        Frequency.MONTHLY: 28,
+        Frequency.YEARLY: 360,
+    }
+
+    # ------------------------------------------------------
+    def __init__(self, daily: Optional[list[dict[str, Any]]] = None):
+
+        self.__daily = dict[date, dict[str, Any]]()
+
+        self.__bucketKeyByFrequency: dict[Frequency, Callable[[date], tuple[date, str]]] = {
+            Frequency.WEEKLY: FrequencyAggregator.__weekKey,
+            Frequency.MONTHLY: FrequencyAggregator.__monthKey,
+            Frequency.YEARLY: FrequencyAggregator.__yearKey,
+        }
+
+        self.__buckets: dict[Frequency, dict[date, _Bucket]] = {
+            frequency: {} for frequency in self.__bucketKeyByFrequency
+        }
+
+        # Bucket keys kept sorted to produce the aggregates in date order.
+        self.__sortedKeys: dict[Frequency, list[date]] = {frequency: [] for frequency in self.__bucketKeyByFrequency}
+
+        if daily is not None:
+            self.update(daily)
+
+    # ------------------------------------------------------
+    def update(self, daily: list[dict[str, Any]]) -> dict[Frequency, list[str]]:
+        """Appends new daily readings or replaces the already known ones having the same time period.
+
+        Returns the time periods of the buckets that have been modified, by frequency.
+        """
+
+        res: dict[Frequency, list[str]] = {frequency: [] for frequency in self.__bucketKeyByFrequency}
+
+        for reading in daily:
+            day = TimePeriod.parse_day(reading[PropertyName.TIME_PERIOD.value])
+
+            previous = self.__daily.get(day)
+            self.__daily[day] = reading
+
+            for frequency, bucketKey in self.__bucketKeyByFrequency.items():
+                key, time_period = bucketKey(day)
+
+                bucket = self.__buckets[frequency].get(key)
+                if bucket is None:
+                    bucket = _Bucket(key, time_period)
+                    self.__buckets[frequency][key] = bucket
+                    bisect.insort(self.__sortedKeys[frequency], key)
+
+                if previous is not None and bucket.remove(previous):
+                    bucket.add(reading)
+                    bucket.resetExtrema([self.__daily[d] for d in bucket.days])
+                else:
+                    bucket.days.add(day)
+                    bucket.add(reading)
+
+                if len(res[frequency]) == 0 or res[frequency][-1] != time_period:
+                    res[frequency].append(time_period)
+
+        Logger.debug(f"{len(daily)} daily readings aggregated")
+
+        return res
+
+    # ------------------------------------------------------
+    def get(self, frequency: Frequency) -> list[dict[str, Any]]:
+
+        if frequency == Frequency.DAILY:
+            return [self.__daily[day] for day in sorted(self.__daily)]
+
+        if frequency not in self.__buckets:
+            return []
+
+        res = []
+
+        keys = self.__sortedKeys[frequency]
+        minDayCount = FrequencyAggregator.MIN_DAY_COUNT[frequency]
+        for i, key in enumerate(keys):
+            bucket = self.__buckets[frequency][key]
+            # Select buckets where we have a full period except for the current one.
+            if bucket.count >= minDayCount or i == len(keys) - 1:
+                res.append(bucket.toReading())
+
+        return res
+
+    # ------------------------------------------------------
+    def computeWeekly(self) -> list[dict[str, Any]]:
+
+        return self.get(Frequency.WEEKLY)
+
+    # ------------------------------------------------------
+    def computeMonthly(self) -> list[dict[str, Any]]:
+
+        return self.get(Frequency.MONTHLY)
+
+    # ------------------------------------------------------
+    def computeYearly(self) -> list[dict[str, Any]]:
+
+        return self.get(Frequency.YEARLY)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __weekKey(day: date) -> tuple[date, str]:
+
+        first_day_of_week = day - timedelta(days=day.weekday())
+        last_day_of_week = first_day_of_week + timedelta(days=6)
+
+        time_period = (
+            f"Du {first_day_of_week.strftime(JsonWebDataSource.OUTPUT_DATE_FORMAT)}"
+            f" au {last_day_of_week.strftime(JsonWebDataSource.OUTPUT_DATE_FORMAT)}"
+        )
+
+        return first_day_of_week, time_period
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __monthKey(day: date) -> tuple[date, str]:
+
+        return day.replace(day=1), f"{FrequencyConverter.MONTHS[day.month - 1]} {day.year}"
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __yearKey(day: date) -> tuple[date, str]:
+
+        return day.replace(month=1, day=1), str(day.year)
@@ -0,0 +1,390 @@
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+
+from pygazpar.datasource import MeterReadings
+from pygazpar.enum import PropertyName
+from pygazpar.readingstore import DailyReadingStore
+from pygazpar.timeperiod import TimePeriod
+
+# Base temperature of the French heating degree days (DJU).
+DEFAULT_BASE_TEMPERATURE = 18.0
+
+DEFAULT_ROLLING_DAYS = 30
+
+# Minimum number of days with both an energy and a temperature to compute the energy signature of a PCE.
+MIN_SIGNATURE_DAYS = 30
+
+# Minimum fraction of the days of two years with an energy for their comparison.
+MIN_YEAR_COVERAGE = 0.9
+
+# Index of February 29th in a leap year, from January 1st.
+FEBRUARY_29_INDEX = 59
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+@dataclass
+class YearlyComparison:
+    """Yearly totals by PCE (rows) and year (columns), and the change of the normalised consumption from the
+    previous year (NaN for the first year and for the years not covered enough).
+    """
+
+    years: np.ndarray
+    energy: np.ndarray
+    degree_days: np.ndarray
+    normalised_energy: np.ndarray
+    coverage: np.ndarray
+    change: np.ndarray
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ConsumptionAnalytics:
+    """Heating degree days and weather normalised consumption of many PCEs at once.
+
+    The daily energies (kWh) and temperatures (°C) are held in (PCEs, days) arrays covering the same calendar
+    days, NaN for the missing days, so that every computation is done on all the PCEs by NumPy.
+
+    The degree days (DJU) of a day are max(base temperature - temperature, 0). The energy signature of a PCE is the
+    linear regression energy = base load + slope x DJU over its days: the slope is its consumption in kWh per degree
+    day. The normalised consumption of a day is its energy corrected for the difference between its DJU and the
+    normal DJU of the same day of the year (its average over the years of the PCE).
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        pce_identifiers: list[str],
+        start_date: date,
+        energy: np.ndarray,
+        temperature: np.ndarray,
+        base_temperature: float = DEFAULT_BASE_TEMPERATURE,
+    ):
+
+        energy = np.asarray(energy, dtype=np.float64)
+        temperature = np.asarray(temperature, dtype=np.float64)
+
+        if energy.ndim != 2 or energy.shape != temperature.shape or energy.shape[0] != len(pce_identifiers):
+            raise ValueError(
+                f"Invalid arrays: energy {energy.shape} and temperature {temperature.shape}"
+                f" ({len(pce_identifiers)} PCEs x days expected)"
+            )
+
+        self.__pceIdentifiers = list(pce_identifiers)
+        self.__startDate = start_date
+        self.__energy = energy
+        self.__temperature = temperature
+        self.__baseTemperature = base_temperature
+
+        self.__dates = np.datetime64(start_date, "D") + np.arange(energy.shape[1])
+        self.__degreeDays = np.maximum(base_temperature - temperature, 0.0)
+
+        # Computed on demand.
+        self.__signature: Optional[tuple[np.ndarray, np.ndarray]] = None
+        self.__normalDegreeDays: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------
+    @staticmethod
+    def from_readings(
+        daily_by_pce: dict[str, MeterReadings], base_temperature: float = DEFAULT_BASE_TEMPERATURE
+    ) -> "ConsumptionAnalytics":
+        """Builds the arrays from the daily readings of each PCE, as returned by Client.load_date_range()."""
+
+        pce_identifiers = list(daily_by_pce)
+
+        timePeriodName = PropertyName.TIME_PERIOD.value
+        energyName = PropertyName.ENERGY.value
+        temperatureName = PropertyName.TEMPERATURE.value
+
+        days = [
+            ConsumptionAnalytics.__parseDays([reading[timePeriodName] for reading in daily_by_pce[pce_identifier]])
+            for pce_identifier in pce_identifiers
+        ]
+
+        today = np.datetime64(date.today(), "D")
+        firstDay = min((pceDays.min() for pceDays in days if len(pceDays) > 0), default=today)
+        lastDay = max((pceDays.max() for pceDays in days if len(pceDays) > 0), default=firstDay - 1)
+
+        energy = np.full((len(pce_identifiers), int((lastDay - firstDay).astype(np.int64)) + 1), np.nan)
+        temperature = np.full_like(energy, np.nan)
+
+        for row, pce_identifier in enumerate(pce_identifiers):
+            readings = daily_by_pce[pce_identifier]
+            columns = (days[row] - firstDay).astype(np.int64)
+
+            # None values become NaN.
+            energy[row, columns] = np.array([reading.get(energyName) for reading in readings], dtype=np.float64)
+            temperature[row, columns] = np.array(
+                [reading.get(temperatureName) for reading in readings], dtype=np.float64
+            )
+
+        return ConsumptionAnalytics(pce_identifiers, firstDay.astype(date), energy, temperature, base_temperature)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def from_store(
+        store: DailyReadingStore,
+        pce_identifiers: Optional[list[str]],
+        start_date: date,
+        end_date: date,
+        base_temperature: float = DEFAULT_BASE_TEMPERATURE,
+    ) -> "ConsumptionAnalytics":
+        """Builds the arrays straight from the records of a DailyReadingStore (all its PCEs if None)."""
+
+        if pce_identifiers is None:
+            pce_identifiers = store.pce_identifiers()
+
+        energy = np.full((len(pce_identifiers), end_date.toordinal() - start_date.toordinal() + 1), np.nan)
+        temperature = np.full_like(energy, np.nan)
+
+        for row, pce_identifier in enumerate(pce_identifiers):
+            energy[row], temperature[row] = store.read_columns(
+                pce_identifier, start_date, end_date, [PropertyName.ENERGY.value, PropertyName.TEMPERATURE.value]
+            )
+
+        return ConsumptionAnalytics(pce_identifiers, start_date, energy, temperature, base_temperature)
+
+    # ------------------------------------------------------
+    @property
+    def pce_identifiers(self) -> list[str]:
+
+        return list(self.__pceIdentifiers)
+
+    # ------------------------------------------------------
+    @property
+    def start_date(self) -> date:
+
+        return self.__startDate
+
+    # ------------------------------------------------------
+    @property
+    def end_date(self) -> date:
+
+        return self.__startDate + timedelta(days=self.__energy.shape[1] - 1)
+
+    # ------------------------------------------------------
+    @property
+    def base_temperature(self) -> float:
+
+        return self.__baseTemperature
+
+    # ------------------------------------------------------
+    @property
+    def dates(self) -> np.ndarray:
+        """The days of the columns (datetime64[D])."""
+
+        return self.__dates
+
+    # ------------------------------------------------------
+    @property
+    def energy(self) -> np.ndarray:
+
+        return self.__energy
+
+    # ------------------------------------------------------
+    @property
+    def temperature(self) -> np.ndarray:
+
+        return self.__temperature
+
+    # ------------------------------------------------------
+    @property
+    def degree_days(self) -> np.ndarray:
+        """The degree days (DJU) of each PCE and day, NaN if the temperature is missing."""
+
+        return self.__degreeDays
+
+    # ------------------------------------------------------
+    def energy_signature(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the slope (kWh per degree day) and the base load (kWh per day) of each PCE, by least squares over
+        the days of the range having both an energy and a temperature. Both are NaN for the PCEs with less than
+        MIN_SIGNATURE_DAYS such days or no heating day.
+        """
+
+        if start_date is None and end_date is None and self.__signature is not None:
+            return self.__signature
+
+        columns = self.__columns(start_date, end_date)
+        energy = self.__energy[:, columns]
+        degreeDays = self.__degreeDays[:, columns]
+
+        valid = ~np.isnan(energy) & ~np.isnan(degreeDays)
+        count = valid.sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            meanEnergy = np.where(valid, energy, 0.0).sum(axis=1) / count
+            meanDegreeDays = np.where(valid, degreeDays, 0.0).sum(axis=1) / count
+
+            energyDeviation = np.where(valid, energy - meanEnergy[:, None], 0.0)
+            degreeDaysDeviation = np.where(valid, degreeDays - meanDegreeDays[:, None], 0.0)
+
+            variance = (degreeDaysDeviation**2).sum(axis=1)
+            slope = (energyDeviation * degreeDaysDeviation).sum(axis=1) / variance
+            slope[(count < MIN_SIGNATURE_DAYS) | (variance == 0)] = np.nan
+
+            baseLoad = meanEnergy - slope * meanDegreeDays
+
+        res = (slope, baseLoad)
+
+        if start_date is None and end_date is None:
+            self.__signature = res
+
+        return res
+
+    # ------------------------------------------------------
+    def kwh_per_degree_day(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> np.ndarray:
+
+        return self.energy_signature(start_date, end_date)[0]
+
+    # ------------------------------------------------------
+    def normal_degree_days(self) -> np.ndarray:
+        """Returns the normal degree days of each PCE by day of the year: a (PCEs, 366) array, February 29th
+        included, averaging the years of the PCE.
+        """
+
+        if self.__normalDegreeDays is None:
+            dayIndex = self.__dayOfYearIndex()
+            valid = ~np.isnan(self.__degreeDays)
+
+            total = np.zeros((len(self.__pceIdentifiers), 366))
+            count = np.zeros((len(self.__pceIdentifiers), 366))
+            np.add.at(total.T, dayIndex, np.where(valid, self.__degreeDays, 0.0).T)
+            np.add.at(count.T, dayIndex, valid.T)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.__normalDegreeDays = total / count
+
+        return self.__normalDegreeDays
+
+    # ------------------------------------------------------
+    def normalised_energy(self) -> np.ndarray:
+        """Returns the daily energy of each PCE corrected to the normal degree days of the day:
+        energy - slope x (DJU - normal DJU). It is the energy as is on the days without temperature.
+        """
+
+        slope, _ = self.energy_signature()
+
+        normal = self.normal_degree_days()[:, self.__dayOfYearIndex()]
+
+        correction = slope[:, None] * (self.__degreeDays - normal)
+
+        return self.__energy - np.nan_to_num(correction, nan=0.0)
+
+    # ------------------------------------------------------
+    def rolling_normalised(self, window_days: int = DEFAULT_ROLLING_DAYS) -> np.ndarray:
+        """Returns the mean normalised daily energy over the window_days days ending on each day, NaN when less than
+        half of the days of the window have an energy.
+        """
+
+        if window_days < 1:
+            raise ValueError(f"Invalid window_days: {window_days} (at least 1 expected)")
+
+        values = self.normalised_energy()
+        valid = ~np.isnan(values)
+
+        total = ConsumptionAnalytics.__rollingSum(np.where(valid, values, 0.0), window_days)
+        count = ConsumptionAnalytics.__rollingSum(valid.astype(np.float64), window_days)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(count * 2 >= window_days, total / count, np.nan)
+
+    # ------------------------------------------------------
+    def year_over_year(self) -> YearlyComparison:
+        """Returns the yearly totals of each PCE and the change of its normalised consumption from the previous year.
+
+        The change compares the mean normalised daily energies of the two years, when both have an energy for at
+        least MIN_YEAR_COVERAGE of their days.
+        """
+
+        yearOf = self.__dates.astype("datetime64[Y]").astype(np.int64) + 1970
+        years = np.unique(yearOf)
+        yearIndex = yearOf - years[0] if len(years) > 0 else yearOf
+
+        normalised = self.normalised_energy()
+        valid = ~np.isnan(self.__energy)
+
+        shape = (len(self.__pceIdentifiers), len(years))
+        energy, degreeDays, normalisedEnergy, validDays = (np.zeros(shape) for _ in range(4))
+
+        np.add.at(energy.T, yearIndex, np.nan_to_num(self.__energy).T)
+        np.add.at(degreeDays.T, yearIndex, np.nan_to_num(self.__degreeDays).T)
+        np.add.at(normalisedEnergy.T, yearIndex, np.nan_to_num(normalised).T)
+        np.add.at(validDays.T, yearIndex, valid.T)
+
+        leap = ((years % 4 == 0) & (years % 100 != 0)) | (years % 400 == 0)
+        coverage = validDays / np.where(leap, 366, 365)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            meanNormalised = normalisedEnergy / validDays
+
+        change = np.full(shape, np.nan)
+        if len(years) > 1:
+            covered = (coverage[:, 1:] >= MIN_YEAR_COVERAGE) & (coverage[:, :-1] >= MIN_YEAR_COVERAGE)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change[:, 1:] = np.where(covered, meanNormalised[:, 1:] / meanNormalised[:, :-1] - 1.0, np.nan)
+
+        return YearlyComparison(years, energy, degreeDays, normalisedEnergy, coverage, change)
+
+    # ------------------------------------------------------
+    def __columns(self, start_date: Optional[date], end_date: Optional[date]) -> slice:
+
+        start = 0 if start_date is None else max((start_date - self.__startDate).days, 0)
+        end = self.__energy.shape[1] if end_date is None else max((end_date - self.__startDate).days + 1, 0)
+
+        return slice(start, end)
+
+    # ------------------------------------------------------
+    def __dayOfYearIndex(self) -> np.ndarray:
+        """Index of each day in a leap year: the same day of the year has the same index every year."""
+
+        years = self.__dates.astype("datetime64[Y]")
+        index = (self.__dates - years).astype(np.int64)
+
+        yearNumbers = years.astype(np.int64) + 1970
+        leap = ((yearNumbers % 4 == 0) & (yearNumbers % 100 != 0)) | (yearNumbers % 400 == 0)
+
+        # Skip February 29th in the other years.
+        return np.where(~leap & (index >= FEBRUARY_29_INDEX), index + 1, index)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __parseDays(timePeriods: list[str]) -> np.ndarray:
+        """Parses the 'dd/mm/yyyy' days at once (datetime64[D]), with a fallback to TimePeriod.parse_day()."""
+
+        text = "".join(timePeriods).encode("utf-8")
+
+        if len(text) == 10 * len(timePeriods):
+            characters = np.frombuffer(text, dtype=np.uint8).reshape(-1, 10)
+            digits = characters[:, [0, 1, 3, 4, 6, 7, 8, 9]].astype(np.int64) - ord("0")
+
+            if np.all((characters[:, 2] == ord("/")) & (characters[:, 5] == ord("/"))) and np.all(
+                (digits >= 0) & (digits <= 9)
+            ):
+                day = digits[:, 0] * 10 + digits[:, 1]
+                month = digits[:, 2] * 10 + digits[:, 3]
+                year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+
+                months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+                res = months.astype("datetime64[D]") + (day - 1)
+
+                # Invalid days (31/02/2024...) would silently roll over to the next month.
+                if np.all((month >= 1) & (month <= 12) & (day >= 1) & (res.astype("datetime64[M]") == months)):
+                    return res
+
+        return np.array([TimePeriod.parse_day(timePeriod) for timePeriod in timePeriods], dtype="datetime64[D]")
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __rollingSum(values: np.ndarray, window: int) -> np.ndarray:
+
+        cumulative = np.cumsum(values, axis=1)
+        res = cumulative.copy()
+        res[:, window:] -= cumulative[:, :-window]
+
+        return res
@@ -1,12 +1,20 @@
+import contextlib
 import logging
 import re
+import threading
 import time
 import traceback
 from datetime import date
 from enum import Enum
-from typing import Any
+from typing import Any, Iterator
+from urllib.parse import urlsplit
 
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
+
+from pygazpar.jsoncodec import JsonCodec
+from pygazpar.profiler import Profiler
+from pygazpar.ratelimiter import RateLimiter
 
 START_URL = "https://monespace.grdf.fr/"
 
@@ -26,8 +34,17 @@ PASSWORD_SESSION_TOKEN_PAYLOAD = """{{
 
 API_BASE_URL = "https://monespace.grdf.fr/api"
 
+# Host of the login pages where an expired session is redirected to.
+LOGIN_HOST = "connexion.grdf.fr"
+
 DATE_FORMAT = "%Y-%m-%d"
 
+# Maximum number of connections kept alive by host.
+DEFAULT_POOL_SIZE = 10
+
+# Size of the chunks of the streamed response bodies.
+STREAM_CHUNK_SIZE = 64 * 1024
+
 Logger = logging.getLogger(__name__)
 
 
@@ -61,25 +78,157 @@ class InternalServerError(ServerError):
         super().__init__(message, 500)
 
 
+# ------------------------------------------------------
+class SessionExpiredError(ServerError):
+
+    def __init__(self, message: str):
+        super().__init__(message, 401)
+
+
+# ------------------------------------------------------
+class SessionKeepAlive(threading.Thread):
+    """Keeps the session of an APIClient warm with a periodic cheap request, and logs in again before
+    the session reaches its maximum age.
+    """
+
+    # ------------------------------------------------------
+    def __init__(self, client: "APIClient", interval: float, max_age: float | None = None):
+        super().__init__(name="pygazpar-keep-alive", daemon=True)
+        self._client = client
+        self._interval = interval
+        self._max_age = max_age
+        self._stop_event = threading.Event()
+
+    # ------------------------------------------------------
+    def run(self):
+        while not self._stop_event.wait(self._interval):
+            try:
+                session = self._client._session  # pylint: disable=protected-access
+                if session is None:
+                    continue
+
+                # Log in again if the session would expire before the next call.
+                if self._max_age is not None and self._client.session_age() + self._interval >= self._max_age:
+                    self._client.relogin(session)
+                else:
+                    self._client.get_pce_list()
+            except Exception:  # pylint: disable=broad-exception-caught
+                # Not a blocking error: the next call of the client will log in again if needed.
+                Logger.warning("An error occurred while keeping the session alive", exc_info=True)
+
+    # ------------------------------------------------------
+    def stop(self):
+        self._stop_event.set()
+        if self is not threading.current_thread() and self.is_alive():
+            self.join()
+
+
 # ------------------------------------------------------
 class APIClient:
 
     # ------------------------------------------------------
-    def __init__(self, username: str, password: str, retry_count: int = 10):
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        retry_count: int = 10,
+        rate_limiter: RateLimiter | None = None,
+        thread_safe: bool = False,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive_interval: float | None = None,
+        session_max_age: float | None = None,
+    ):
         self._username = username
         self._password = password
         self._retry_count = retry_count
+        self._rate_limiter = rate_limiter
+        self._pool_size = pool_size
+        self._keep_alive_interval = keep_alive_interval
+        self._session_max_age = session_max_age
+        self._keep_alive: SessionKeepAlive | None = None
         self._session: Session | None = None
+        self._session_created_at = 0.0
+        # In thread-safe mode, the session is shared by the threads and only login/logout are serialized.
+        # The keep-alive runs in a background thread: it implies the thread-safe mode.
+        self._lock: contextlib.AbstractContextManager = (
+            threading.RLock() if thread_safe or keep_alive_interval is not None else contextlib.nullcontext()
+        )
 
     # ------------------------------------------------------
     def login(self):
-        if self._session is not None:
-            return
+        with self._lock:
+            if self._session is not None:
+                return
+
+            with Profiler.stage("login"):
+                self._session = self._create_session()
+            self._session_created_at = time.monotonic()
+
+            if self._keep_alive_interval is not None:
+                self._keep_alive = SessionKeepAlive(self, self._keep_alive_interval, self._session_max_age)
+                self._keep_alive.start()
+
+    # ------------------------------------------------------
+    def session_age(self) -> float:
+        """Returns the number of seconds since the current session has been created."""
+        return time.monotonic() - self._session_created_at
+
+    # ------------------------------------------------------
+    def relogin(self, expired_session: Session | None = None):
+        """Replaces the current session by a new one.
+
+        If expired_session is given and is not the current session anymore, another thread has already
+        logged in again and nothing is done.
+        """
+        with self._lock:
+            if expired_session is not None and self._session is not expired_session:
+                return
+
+            Logger.info("Logging in again...")
+
+            # The current session remains usable by the other threads until the new one is ready.
+            with Profiler.stage("login"):
+                session = self._create_session()
+
+            previous = self._session
+            self._session = session
+            self._session_created_at = time.monotonic()
+
+            # Closed once replaced, so that a long-running process does not keep the pool of each expired session.
+            if previous is not None:
+                previous.close()
+
+    # ------------------------------------------------------
+    def _create_session(self) -> Session:
+
+        session = self._new_session()
+
+        self._authenticate(session)
+
+        return session
+
+    # ------------------------------------------------------
+    def _new_session(self) -> Session:
 
         session = Session()
-        session.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"})
+        session.headers.update(
+            {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            }
+        )
+
+        adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        return session
+
+    # ------------------------------------------------------
+    def _authenticate(self, session: Session):
 
-        start_response = session.get(START_URL)
+        start_response = self._request(session, "GET", START_URL)
         if start_response.status_code != 200:
             raise ServerError(
                 f"An error occurred while logging in start. Status code: {start_response.status_code} - {start_response.url}",
@@ -97,7 +246,9 @@ class APIClient:
         payload = MAIL_SESSION_TOKEN_PAYLOAD.format(self._username, state_token)
         session.cookies.set("ln", self._username)
 
-        mail_response = session.post(
+        mail_response = self._request(
+            session,
+            "POST",
             MAIL_SESSION_TOKEN_URL,
             data=payload,
             headers={"Accept": "application/json; okta-version=1.0.0", "Content-Type": "application/json"},
@@ -113,7 +264,9 @@ class APIClient:
 
         payload = PASSWORD_SESSION_TOKEN_PAYLOAD.format(self._password, state_handle)
 
-        password_response = session.post(
+        password_response = self._request(
+            session,
+            "POST",
             PASSWORD_SESSION_TOKEN_URL,
             data=payload,
             headers={"Accept": "application/json; okta-version=1.0.0", "Content-Type": "application/json"},
@@ -127,7 +280,7 @@ class APIClient:
 
         success_url = password_response.json()["success"]["href"]
 
-        response_redirect = session.get(success_url)
+        response_redirect = self._request(session, "GET", success_url)
 
         if response_redirect.status_code != 200:
             raise ServerError(
@@ -135,44 +288,77 @@ class APIClient:
                 response_redirect.status_code,
             )
 
-        self._session = session
-
     # ------------------------------------------------------
     def is_logged_in(self) -> bool:
         return self._session is not None
 
     # ------------------------------------------------------
     def logout(self):
-        if self._session is None:
-            return
+        # The keep-alive is stopped outside the lock: it may be waiting for it.
+        keep_alive, self._keep_alive = self._keep_alive, None
+        if keep_alive is not None:
+            keep_alive.stop()
+
+        with self._lock:
+            if self._session is None:
+                return
+
+            self._session.close()
+            self._session = None
+
+    # ------------------------------------------------------
+    def _request(self, session: Session, method: str, url: str, **kwargs) -> Response:
+
+        # All the requests go through the rate limiter (if any).
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire(url)
 
-        self._session.close()
-        self._session = None
+        with Profiler.stage(f"http {method} {urlsplit(url).path}"):
+            return session.request(method, url, **kwargs)
 
     # ------------------------------------------------------
-    def get(self, endpoint: str, params: dict[str, Any]) -> Response:
+    def get(self, endpoint: str, params: dict[str, Any], stream: bool = False) -> Response:
 
-        if self._session is None:
-            raise ConnectionError("You must login first")
+        relogged_in = False
 
         retry = self._retry_count
         while retry > 0:
 
-            try:
-                response = self._session.get(f"{API_BASE_URL}{endpoint}", params=params)
-
-                if "text/html" in response.headers.get("Content-Type"):  # type: ignore
-                    raise InternalServerError(
-                        f"An unknown error occurred. Please check your query parameters (endpoint: {endpoint}): {params}"
-                    )
+            # The session may be replaced by another thread in the meantime.
+            session = self._session
+            if session is None:
+                raise ConnectionError("You must login first")
 
-                if response.status_code != 200:
-                    raise ServerError(
-                        f"HTTP error on enpoint '{endpoint}': Status code: {response.status_code} - {response.text}. Query parameters: {params}",
-                        response.status_code,
-                    )
+            try:
+                response = self._request(session, "GET", f"{API_BASE_URL}{endpoint}", params=params, stream=stream)
+
+                try:
+                    if APIClient._is_session_expired(response):
+                        raise SessionExpiredError(f"The session has expired (endpoint: {endpoint})")
+
+                    if "text/html" in response.headers.get("Content-Type"):  # type: ignore
+                        raise InternalServerError(
+                            f"An unknown error occurred. Please check your query parameters (endpoint: {endpoint}): {params}"
+                        )
+
+                    if response.status_code != 200:
+                        raise ServerError(
+                            f"HTTP error on enpoint '{endpoint}': Status code: {response.status_code} - {response.text}. Query parameters: {params}",
+                            response.status_code,
+                        )
+                except Exception:
+                    # A rejected response is not returned: release its connection (left open by a streamed request).
+                    response.close()
+                    raise
 
                 break
+            except SessionExpiredError as sessionExpiredError:
+                # Log in again only once, then replay the request.
+                if relogged_in:
+                    raise sessionExpiredError
+                Logger.warning(f"{sessionExpiredError}. Logging in again and replaying the request...")
+                self.relogin(session)
+                relogged_in = True
             except InternalServerError as internalServerError:  # pylint: disable=broad-exception-caught
                 if retry == 1:
                     Logger.error(f"{internalServerError}. Retry limit reached: {traceback.format_exc()}")
@@ -183,10 +369,27 @@ class APIClient:
 
         return response
 
+    # ------------------------------------------------------
+    @staticmethod
+    def _is_session_expired(response: Response) -> bool:
+
+        if response.status_code == 401:
+            return True
+
+        # Redirected to the login pages.
+        if urlsplit(response.url).hostname == LOGIN_HOST:
+            return True
+        if any(urlsplit(redirect.headers.get("Location", "")).hostname == LOGIN_HOST for redirect in response.history):
+            return True
+
+        # Login page served in place of the API response.
+        content_type = response.headers.get("Content-Type") or ""
+        return "text/html" in content_type and '"stateToken"' in response.text
+
     # ------------------------------------------------------
     def get_pce_list(self, details: bool = False) -> list[Any]:
 
-        res = self.get("/e-conso/pce", {"details": details}).json()
+        res = JsonCodec.loads(self.get("/e-conso/pce", {"details": details}).content)
 
         if type(res) is not list:
             raise TypeError(f"Invalid response type: {type(res)} (list expected)")
@@ -195,16 +398,20 @@ class APIClient:
 
     # ------------------------------------------------------
     def get_pce_consumption(
-        self, consumption_type: ConsumptionType, start_date: date, end_date: date, pce_list: list[str]
+        self,
+        consumption_type: ConsumptionType,
+        start_date: date,
+        end_date: date,
+        pce_list: list[str],
+        frequency: Frequency | None = None,
     ) -> dict[str, Any]:
 
-        start = start_date.strftime(DATE_FORMAT)
-        end = end_date.strftime(DATE_FORMAT)
-
-        res = self.get(
+        response = self.get(
             f"/e-conso/pce/consommation/{consumption_type.value}",
-            {"dateDebut": start, "dateFin": end, "pceList[]": ",".join(pce_list)},
-        ).json()
+            APIClient._consumption_params(start_date, end_date, pce_list, frequency),
+        )
+
+        res = JsonCodec.loads(response.content)
 
         if type(res) is list and len(res) == 0:
             return dict[str, Any]()
@@ -214,6 +421,49 @@ class APIClient:
 
         return res
 
+    # ------------------------------------------------------
+    def iter_pce_consumption(
+        self,
+        consumption_type: ConsumptionType,
+        start_date: date,
+        end_date: date,
+        pce_list: list[str],
+        frequency: Frequency | None = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """Same request as get_pce_consumption(), whose JSON body is returned by chunks as it is downloaded
+        (see JsonParser.iter_parse()).
+        """
+
+        response = self.get(
+            f"/e-conso/pce/consommation/{consumption_type.value}",
+            APIClient._consumption_params(start_date, end_date, pce_list, frequency),
+            stream=True,
+        )
+
+        try:
+            yield from response.iter_content(chunk_size)
+        finally:
+            response.close()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def _consumption_params(
+        start_date: date, end_date: date, pce_list: list[str], frequency: Frequency | None
+    ) -> dict[str, Any]:
+
+        res = {
+            "dateDebut": start_date.strftime(DATE_FORMAT),
+            "dateFin": end_date.strftime(DATE_FORMAT),
+            "pceList[]": ",".join(pce_list),
+        }
+
+        # The daily readings are returned by default.
+        if frequency is not None:
+            res["frequence"] = frequency.value
+
+        return res
+
     # ------------------------------------------------------
     def get_pce_consumption_excelsheet(
         self,
@@ -243,7 +493,7 @@ class APIClient:
 
         end = end_date.strftime(DATE_FORMAT)
 
-        res = self.get(f"/e-conso/pce/{pce}/meteo", {"dateFinPeriode": end, "nbJours": days}).json()
+        res = JsonCodec.loads(self.get(f"/e-conso/pce/{pce}/meteo", {"dateFinPeriode": end, "nbJours": days}).content)
 
         if type(res) is list and len(res) == 0:
             return dict[str, Any]()
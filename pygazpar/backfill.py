@@ -0,0 +1,303 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from typing import Optional
+
+from pygazpar.datasource import MemoryMappedDataSource
+from pygazpar.jsoncodec import JsonCodec
+
+# Large date ranges end with HTTP 500 errors, and the temperatures are limited to 730 days.
+DEFAULT_WINDOW_DAYS = 365
+
+# A failed window is split in halves down to this size before being retried as is.
+DEFAULT_MIN_WINDOW_DAYS = 30
+
+DEFAULT_MAX_WORKERS = 4
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Delay before the first retry of a failed window (doubled at each attempt).
+DEFAULT_RETRY_DELAY = 5.0
+
+# A window: PCE identifier, first and last days (both inclusive).
+Window = tuple[str, date, date]
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class BackfillError(Exception):
+
+    # ------------------------------------------------------
+    def __init__(self, errors: dict[Window, Exception]):
+        super().__init__(
+            f"{len(errors)} window(s) failed to load: "
+            + ", ".join(f"{pce} {start} - {end}" for pce, start, end in sorted(errors))
+        )
+        self.errors = errors
+
+
+# ------------------------------------------------------------------------------------------------------------
+class BackfillCheckpoint:
+    """Days already backfilled, by PCE, persisted in a JSON file replaced atomically at each completed window.
+
+    The days are kept as merged [start, end] ranges: a window is done when its days are covered, whatever the
+    windows of the run that loaded them.
+    """
+
+    VERSION = 1
+
+    # ------------------------------------------------------
+    def __init__(self, path: str):
+
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__ranges = dict[str, list[tuple[date, date]]]()
+
+        if os.path.isfile(path):
+            with open(path, mode="rb") as checkpointFile:
+                content = JsonCodec.loads(checkpointFile.read())
+
+            if content.get("version") != BackfillCheckpoint.VERSION:
+                raise ValueError(f"Invalid backfill checkpoint file: '{path}'")
+
+            for pce_identifier, ranges in content["pces"].items():
+                self.__ranges[pce_identifier] = [
+                    (date.fromisoformat(start), date.fromisoformat(end)) for start, end in ranges
+                ]
+
+    # ------------------------------------------------------
+    @property
+    def path(self) -> str:
+
+        return self.__path
+
+    # ------------------------------------------------------
+    def ranges(self, pce_identifier: str) -> list[tuple[date, date]]:
+        """Returns the backfilled days of a PCE as sorted and disjoint [start, end] ranges."""
+
+        with self.__lock:
+            return list(self.__ranges.get(pce_identifier, []))
+
+    # ------------------------------------------------------
+    def is_done(self, pce_identifier: str, start_date: date, end_date: date) -> bool:
+
+        with self.__lock:
+            return any(start <= start_date and end_date <= end for start, end in self.__ranges.get(pce_identifier, []))
+
+    # ------------------------------------------------------
+    def mark_done(self, pce_identifier: str, start_date: date, end_date: date):
+
+        with self.__lock:
+            ranges = sorted(self.__ranges.get(pce_identifier, []) + [(start_date, end_date)])
+
+            # Merge the overlapping and the adjacent ranges.
+            merged = list[tuple[date, date]]()
+            for start, end in ranges:
+                if len(merged) > 0 and start <= merged[-1][1] + timedelta(days=1):
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                else:
+                    merged.append((start, end))
+
+            self.__ranges[pce_identifier] = merged
+
+            self.__save()
+
+    # ------------------------------------------------------
+    def __save(self):
+
+        content = {
+            "version": BackfillCheckpoint.VERSION,
+            "pces": {
+                pce_identifier: [[start.isoformat(), end.isoformat()] for start, end in ranges]
+                for pce_identifier, ranges in sorted(self.__ranges.items())
+            },
+        }
+
+        temporary_path = f"{self.__path}.tmp"
+        with open(temporary_path, mode="w", encoding="utf-8") as checkpointFile:
+            checkpointFile.write(JsonCodec.dumps(content))
+        os.replace(temporary_path, self.__path)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class BackfillEngine:
+    """Backfills long daily histories of many PCEs into the store of a MemoryMappedDataSource.
+
+    The history is split into windows of window_days days, loaded by at most max_workers threads (the underlying
+    data source must be thread-safe, like a JsonWebDataSource created with threadSafe=True). The windows of the
+    PCEs are interleaved, the most recent ones first. Each completed window is recorded in the checkpoint: a run
+    interrupted, by a crash or by stop(), resumes where it stopped.
+
+    A failed window is split in halves (large ranges tend to end with HTTP 500 errors) and retried with an
+    exponential delay, up to max_attempts attempts.
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        dataSource: MemoryMappedDataSource,
+        checkpoint: BackfillCheckpoint,
+        window_days: int = DEFAULT_WINDOW_DAYS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        min_window_days: int = DEFAULT_MIN_WINDOW_DAYS,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+    ):
+
+        if window_days < 1:
+            raise ValueError(f"Invalid window_days: {window_days} (at least 1 expected)")
+        if max_workers < 1:
+            raise ValueError(f"Invalid max_workers: {max_workers} (at least 1 expected)")
+        if max_attempts < 1:
+            raise ValueError(f"Invalid max_attempts: {max_attempts} (at least 1 expected)")
+
+        self.__dataSource = dataSource
+        self.__checkpoint = checkpoint
+        self.__windowDays = window_days
+        self.__maxWorkers = max_workers
+        self.__maxAttempts = max_attempts
+        self.__minWindowDays = max(min_window_days, 1)
+        self.__retryDelay = retry_delay
+        self.__stopEvent = threading.Event()
+
+    # ------------------------------------------------------
+    @property
+    def checkpoint(self) -> BackfillCheckpoint:
+
+        return self.__checkpoint
+
+    # ------------------------------------------------------
+    def plan(self, pce_identifiers: list[str], start_date: date, end_date: date) -> list[Window]:
+        """Returns the windows not backfilled yet, in loading order.
+
+        The windows are aligned on end_date and interleaved between the PCEs, the most recent ones first.
+        """
+
+        windowsByPce = list[list[Window]]()
+        for pce_identifier in dict.fromkeys(pce_identifiers):
+            windows = list[Window]()
+
+            windowEnd = end_date
+            while windowEnd >= start_date:
+                windowStart = max(windowEnd - timedelta(days=self.__windowDays - 1), start_date)
+                if not self.__checkpoint.is_done(pce_identifier, windowStart, windowEnd):
+                    windows.append((pce_identifier, windowStart, windowEnd))
+                windowEnd = windowStart - timedelta(days=1)
+
+            windowsByPce.append(windows)
+
+        res = list[Window]()
+        for i in range(max((len(windows) for windows in windowsByPce), default=0)):
+            res.extend(windows[i] for windows in windowsByPce if i < len(windows))
+
+        return res
+
+    # ------------------------------------------------------
+    def run(self, pce_identifiers: Optional[list[str]], start_date: date, end_date: date) -> int:
+        """Backfills the given PCEs (all the PCEs of the data source if None) and returns the number of daily
+        readings loaded.
+
+        Raises a BackfillError holding the windows that still fail after max_attempts attempts, the other windows
+        being loaded and checkpointed.
+        """
+
+        if pce_identifiers is None:
+            pce_identifiers = self.__dataSource.get_pce_identifiers()
+
+        self.__stopEvent.clear()
+
+        # Windows to load with their number of failed attempts.
+        queue = deque((window, 0) for window in self.plan(pce_identifiers, start_date, end_date))
+
+        Logger.info(f"Backfilling {len(pce_identifiers)} PCEs from {start_date} to {end_date}: {len(queue)} windows")
+
+        res = 0
+        errors = dict[Window, Exception]()
+        futures = dict[Future, tuple[Window, int]]()
+
+        with ThreadPoolExecutor(max_workers=self.__maxWorkers) as executor:
+            while (len(queue) > 0 and not self.__stopEvent.is_set()) or len(futures) > 0:
+
+                while len(queue) > 0 and len(futures) < self.__maxWorkers and not self.__stopEvent.is_set():
+                    window, attempts = queue.popleft()
+                    futures[executor.submit(self.__load, window, attempts)] = (window, attempts)
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    window, attempts = futures.pop(future)
+                    try:
+                        res += future.result()
+                    except Exception as exception:  # pylint: disable=broad-exception-caught
+                        attempts += 1
+                        if attempts >= self.__maxAttempts:
+                            Logger.error(f"Window {window[1]} - {window[2]} of PCE '{window[0]}' failed: {exception}")
+                            errors[window] = exception
+                            continue
+
+                        Logger.warning(
+                            f"Window {window[1]} - {window[2]} of PCE '{window[0]}' failed (attempt {attempts}),"
+                            f" retrying: {exception}"
+                        )
+                        for retry in self.__split(window):
+                            queue.append((retry, attempts))
+
+        if self.__stopEvent.is_set():
+            Logger.info(f"Backfill stopped: {len(queue)} windows left")
+        else:
+            Logger.info(f"Backfill completed: {res} daily readings loaded")
+
+        if len(errors) > 0:
+            raise BackfillError(errors)
+
+        return res
+
+    # ------------------------------------------------------
+    def stop(self):
+        """Stops dispatching windows: the running ones are completed and checkpointed."""
+
+        self.__stopEvent.set()
+
+    # ------------------------------------------------------
+    def __load(self, window: Window, attempts: int) -> int:
+
+        if attempts > 0:
+            self.__stopEvent.wait(self.__retryDelay * 2 ** (attempts - 1))
+
+        pce_identifier, start_date, end_date = window
+
+        startTime = time.monotonic()
+
+        res = self.__dataSource.fill(pce_identifier, start_date, end_date)
+
+        # Written into the store: the window is done, except its days not published yet which are loaded again
+        # by the next runs.
+        lastPublishedDate = min(end_date, date.today() - timedelta(days=MemoryMappedDataSource.PUBLICATION_DELAY_DAYS))
+        if lastPublishedDate >= start_date:
+            self.__checkpoint.mark_done(pce_identifier, start_date, lastPublishedDate)
+
+        Logger.info(
+            f"PCE '{pce_identifier}': {res} daily readings backfilled from {start_date} to {end_date}"
+            f" in {time.monotonic() - startTime:.1f}s"
+        )
+
+        return res
+
+    # ------------------------------------------------------
+    def __split(self, window: Window) -> list[Window]:
+
+        pce_identifier, start_date, end_date = window
+
+        days = (end_date - start_date).days + 1
+        if days < 2 * self.__minWindowDays:
+            return [window]
+
+        middle = start_date + timedelta(days=days // 2)
+
+        # The most recent half first.
+        return [(pce_identifier, middle, end_date), (pce_identifier, start_date, middle - timedelta(days=1))]
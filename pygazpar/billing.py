@@ -0,0 +1,109 @@
+import logging
+from typing import Any, Optional
+
+from pygazpar.enum import PropertyName
+from pygazpar.timeperiod import TimePeriod
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class BillingReconciler:
+    """Merges the published consumption (one reading per billing period) into the daily informative readings.
+
+    Each daily reading is annotated with the time period of its billing period and with the differences between
+    the published volume/energy of the period and the sum of its daily readings. The differences are None when
+    the daily readings do not cover the whole period.
+    """
+
+    # ------------------------------------------------------
+    @staticmethod
+    def period_of(billing: dict[str, Any]) -> tuple[int, int]:
+        """Returns the ordinals of the first and of the last gas days of a billing period."""
+
+        _, firstDay, _, lastDay = billing[PropertyName.TIME_PERIOD.value].split(" ")
+
+        return TimePeriod.parse_day(firstDay).toordinal(), TimePeriod.parse_day(lastDay).toordinal()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def merge(daily: list[dict[str, Any]], billing: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Returns a copy of the daily readings, in date order, with the billing annotations.
+
+        Both lists are walked once in date order: the cost is linear, plus the sorts when the inputs are not
+        already sorted (as the data sources return them).
+        """
+
+        days = [TimePeriod.parse_day(reading[PropertyName.TIME_PERIOD.value]).toordinal() for reading in daily]
+        order = sorted(range(len(daily)), key=days.__getitem__)
+
+        periods = sorted(
+            (BillingReconciler.period_of(reading) + (reading,) for reading in billing), key=lambda period: period[0]
+        )
+
+        res = list[dict[str, Any]]()
+
+        index = 0
+        for firstDay, lastDay, period in periods:
+            # Daily readings before the period: not billed (yet).
+            while index < len(order) and days[order[index]] < firstDay:
+                res.append(BillingReconciler.__annotate(daily[order[index]], None, None, None))
+                index += 1
+
+            # Daily readings of the period.
+            start = index
+            while index < len(order) and days[order[index]] <= lastDay:
+                index += 1
+            readings = [daily[i] for i in order[start:index]]
+
+            volumeDifference = BillingReconciler.__difference(readings, period, PropertyName.VOLUME.value)
+            energyDifference = BillingReconciler.__difference(readings, period, PropertyName.ENERGY.value)
+
+            # Complete coverage: one reading for each day of the period.
+            if len({days[i] for i in order[start:index]}) != lastDay - firstDay + 1:
+                volumeDifference = energyDifference = None
+
+            timePeriod = period[PropertyName.TIME_PERIOD.value]
+            for reading in readings:
+                res.append(BillingReconciler.__annotate(reading, timePeriod, volumeDifference, energyDifference))
+
+        # Daily readings after the last period.
+        for i in order[index:]:
+            res.append(BillingReconciler.__annotate(daily[i], None, None, None))
+
+        Logger.debug(f"{len(res)} daily readings merged with {len(periods)} billing periods")
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __difference(readings: list[dict[str, Any]], period: dict[str, Any], propertyName: str) -> Optional[float]:
+
+        published = period.get(propertyName)
+        if published is None:
+            return None
+
+        total = 0.0
+        for reading in readings:
+            value = reading.get(propertyName)
+            if value is None:
+                return None
+            total += value
+
+        return round(published - total, 6)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __annotate(
+        reading: dict[str, Any],
+        timePeriod: Optional[str],
+        volumeDifference: Optional[float],
+        energyDifference: Optional[float],
+    ) -> dict[str, Any]:
+
+        res = dict(reading)
+        res[PropertyName.BILLING_PERIOD.value] = timePeriod
+        res[PropertyName.BILLING_VOLUME_DIFFERENCE.value] = volumeDifference
+        res[PropertyName.BILLING_ENERGY_DIFFERENCE.value] = energyDifference
+
+        return res
@@ -0,0 +1,644 @@
+import logging
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, Optional
+
+import numpy as np
+
+from pygazpar.datasource import FrequencyConverter, MeterReadingsByFrequency
+from pygazpar.enum import Frequency
+from pygazpar.filelock import FileLock
+from pygazpar.jsoncodec import JsonCodec
+from pygazpar.timeperiod import TimePeriod
+
+DEFAULT_MAX_ENTRIES = 128
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# GrDF publishes the readings once a day: a few hours are enough to avoid the repeated requests
+# without serving yesterday's data for most of the day.
+DEFAULT_TTL = 6 * 3600.0
+
+CacheKey = tuple[str, date, date, frozenset[Frequency]]
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class IResultCache(ABC):
+    """Cache of the results of Client.load_date_range, keyed by PCE, date range and frequencies."""
+
+    # ------------------------------------------------------
+    def __init__(self):
+
+        self._hits = 0
+        self._misses = 0
+
+    # ------------------------------------------------------
+    @property
+    def hits(self) -> int:
+
+        return self._hits
+
+    # ------------------------------------------------------
+    @property
+    def misses(self) -> int:
+
+        return self._misses
+
+    # ------------------------------------------------------
+    @abstractmethod
+    def get(
+        self, pce_identifier: str, start_date: date, end_date: date, frequencies: list[Frequency]
+    ) -> Optional[MeterReadingsByFrequency]:
+        """Returns the cached readings or None if they are not in the cache."""
+
+    # ------------------------------------------------------
+    @abstractmethod
+    def put(
+        self,
+        pce_identifier: str,
+        start_date: date,
+        end_date: date,
+        frequencies: list[Frequency],
+        data: MeterReadingsByFrequency,
+    ):
+        pass
+
+    # ------------------------------------------------------
+    @abstractmethod
+    def clear(self):
+        pass
+
+    # ------------------------------------------------------
+    @staticmethod
+    def key(pce_identifier: str, start_date: date, end_date: date, frequencies: list[Frequency]) -> CacheKey:
+
+        return (pce_identifier, start_date, end_date, frozenset(frequencies))
+
+    # ------------------------------------------------------
+    @staticmethod
+    def covers(
+        key: CacheKey, data: MeterReadingsByFrequency, start_date: date, end_date: date, frequencies: list[Frequency]
+    ) -> bool:
+        """Tells whether the requested readings can be extracted from the cached result of the given key.
+
+        The same date range is served as is. A smaller date range is served if the daily readings are cached:
+        they are sliced and the other frequencies are computed again from them.
+        """
+
+        _, cachedStart, cachedEnd, cachedFrequencies = key
+
+        if not set(frequencies).issubset(cachedFrequencies):
+            return False
+
+        if (cachedStart, cachedEnd) == (start_date, end_date):
+            return True
+
+        # Hourly readings cannot be computed from the daily ones, they are sliced too.
+        return (
+            cachedStart <= start_date
+            and end_date <= cachedEnd
+            and (Frequency.DAILY.value in data or frequencies == [Frequency.HOURLY])
+        )
+
+    # ------------------------------------------------------
+    @staticmethod
+    def extract(
+        key: CacheKey, data: MeterReadingsByFrequency, start_date: date, end_date: date, frequencies: list[Frequency]
+    ) -> MeterReadingsByFrequency:
+        """Extracts the requested readings from a cached result that covers them."""
+
+        _, cachedStart, cachedEnd, _ = key
+
+        if (cachedStart, cachedEnd) == (start_date, end_date):
+            return {frequency.value: list(data[frequency.value]) for frequency in frequencies}
+
+        daily = TimePeriod.slice_daily(data.get(Frequency.DAILY.value, []), start_date, end_date)
+
+        computeByFrequency = {
+            Frequency.HOURLY: lambda: TimePeriod.slice_hourly(data[Frequency.HOURLY.value], start_date, end_date),
+            Frequency.DAILY: lambda: daily,
+            Frequency.WEEKLY: lambda: FrequencyConverter.computeWeekly(daily),
+            Frequency.MONTHLY: lambda: FrequencyConverter.computeMonthly(daily),
+            Frequency.YEARLY: lambda: FrequencyConverter.computeYearly(daily),
+        }
+
+        return {frequency.value: computeByFrequency[frequency]() for frequency in frequencies}
+
+
+# ------------------------------------------------------------------------------------------------------------
+@dataclass
+class _Entry:
+    data: MeterReadingsByFrequency
+    size: int
+    expires_at: float
+
+
+# ------------------------------------------------------------------------------------------------------------
+class MemoryResultCache(IResultCache):
+    """In-process LRU cache bounded in number of entries and in (estimated) memory, whose entries expire
+    after ttl seconds. It is safe to share between threads.
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL,
+    ):
+
+        super().__init__()
+
+        if max_entries < 1:
+            raise ValueError(f"Invalid max_entries: {max_entries} (at least 1 expected)")
+        if max_bytes < 1:
+            raise ValueError(f"Invalid max_bytes: {max_bytes} (at least 1 expected)")
+        if ttl <= 0:
+            raise ValueError(f"Invalid ttl: {ttl} (strictly positive value expected)")
+
+        self.__maxEntries = max_entries
+        self.__maxBytes = max_bytes
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict[CacheKey, _Entry]()
+        self.__size = 0
+        self.__evictions = 0
+
+    # ------------------------------------------------------
+    @property
+    def evictions(self) -> int:
+
+        return self.__evictions
+
+    # ------------------------------------------------------
+    @property
+    def size(self) -> int:
+        """Estimated memory used by the cached readings in bytes."""
+
+        return self.__size
+
+    # ------------------------------------------------------
+    def __len__(self) -> int:
+
+        return len(self.__entries)
+
+    # ------------------------------------------------------
+    def stats(self) -> dict[str, int]:
+
+        with self.__lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self.__evictions,
+                "entries": len(self.__entries),
+                "size": self.__size,
+            }
+
+    # ------------------------------------------------------
+    def get(
+        self, pce_identifier: str, start_date: date, end_date: date, frequencies: list[Frequency]
+    ) -> Optional[MeterReadingsByFrequency]:
+
+        key = IResultCache.key(pce_identifier, start_date, end_date, frequencies)
+
+        with self.__lock:
+            now = time.monotonic()
+
+            # The exact key first, then any cached range of the same PCE containing the requested one.
+            candidates = [key] if key in self.__entries else []
+            candidates += [
+                cachedKey
+                for cachedKey in reversed(self.__entries)
+                if cachedKey[0] == pce_identifier and cachedKey != key
+            ]
+
+            found: Optional[tuple[CacheKey, _Entry]] = None
+
+            for cachedKey in candidates:
+                entry = self.__entries[cachedKey]
+                if entry.expires_at <= now:
+                    self.__remove(cachedKey)
+                elif IResultCache.covers(cachedKey, entry.data, start_date, end_date, frequencies):
+                    self.__entries.move_to_end(cachedKey)
+                    found = (cachedKey, entry)
+                    break
+
+            if found is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+
+        Logger.debug(f"Cache hit for PCE '{pce_identifier}' from {start_date} to {end_date}")
+
+        # The cached readings are never modified: they can be sliced outside the lock.
+        res = IResultCache.extract(found[0], found[1].data, start_date, end_date, frequencies)
+
+        # Copies: the cached readings are left unchanged by the callers.
+        return {frequency: [dict(reading) for reading in readings] for frequency, readings in res.items()}
+
+    # ------------------------------------------------------
+    def put(
+        self,
+        pce_identifier: str,
+        start_date: date,
+        end_date: date,
+        frequencies: list[Frequency],
+        data: MeterReadingsByFrequency,
+    ):
+
+        key = IResultCache.key(pce_identifier, start_date, end_date, frequencies)
+
+        cached = {
+            frequency.value: [dict(reading) for reading in data.get(frequency.value, [])] for frequency in frequencies
+        }
+
+        entry = _Entry(cached, MemoryResultCache.estimate_size(cached), time.monotonic() + self.__ttl)
+
+        if entry.size > self.__maxBytes:
+            Logger.debug(f"Result of {entry.size} bytes too large to be cached")
+            return
+
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+
+            self.__entries[key] = entry
+            self.__size += entry.size
+
+            while len(self.__entries) > self.__maxEntries or self.__size > self.__maxBytes:
+                self.__remove(next(iter(self.__entries)))
+                self.__evictions += 1
+
+    # ------------------------------------------------------
+    def clear(self):
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    # ------------------------------------------------------
+    def __remove(self, key: CacheKey):
+
+        self.__size -= self.__entries.pop(key).size
+
+    # ------------------------------------------------------
+    @staticmethod
+    def estimate_size(data: MeterReadingsByFrequency) -> int:
+        """Estimates the memory used by the readings (the containers and their values)."""
+
+        res = sys.getsizeof(data)
+
+        for readings in data.values():
+            res += sys.getsizeof(readings)
+            for reading in readings:
+                res += sys.getsizeof(reading)
+                # Small ints, None and interned strings are shared: counting them keeps an upper bound.
+                res += sum(sys.getsizeof(value) for value in reading.values())
+
+        return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+class SharedMemoryResultCache(IResultCache):
+    """Cache shared by the processes of a host (the workers of a web server for instance) through a memory-mapped
+    file: each entry is fetched once for all the processes.
+
+    The file holds a table of max_entries slots (PCE, date range, frequencies, expiry, location of the readings)
+    followed by an arena of max_bytes bytes where the readings are written one after the other, encoded by
+    JsonCodec, wrapping around at the end. The entries whose readings are overwritten are evicted, as the oldest
+    entry when no slot is free.
+
+    Readers never lock: each slot has a sequence number, odd while the slot is written, and a read is retried when
+    the sequence number has changed during the copy of the slot and of its readings (a seqlock). The writes are
+    serialized by a file lock, then a lock per process. The hits and misses are counted per process.
+    """
+
+    MAGIC = b"PYGZCACH"
+
+    VERSION = 1
+
+    HEADER_SIZE = 64
+
+    # A read is retried while a writer updates the slot, then it is a miss.
+    READ_ATTEMPTS = 8
+
+    HEADER_DTYPE = np.dtype(
+        [
+            ("magic", "S8"),
+            ("version", "<u4"),
+            ("slot_count", "<u4"),
+            ("arena_size", "<u8"),
+            ("head", "<u8"),
+            ("reserved", "V32"),
+        ]
+    )
+
+    SLOT_DTYPE = np.dtype(
+        [
+            ("sequence", "<u8"),
+            ("pce_identifier", "S32"),
+            ("start_ordinal", "<i8"),
+            ("end_ordinal", "<i8"),
+            ("frequencies", "<u4"),
+            ("reserved", "<u4"),
+            ("expires_at", "<f8"),
+            ("written_at", "<f8"),
+            ("offset", "<u8"),
+            ("length", "<u8"),
+        ]
+    )
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL,
+    ):
+
+        super().__init__()
+
+        if max_entries < 1:
+            raise ValueError(f"Invalid max_entries: {max_entries} (at least 1 expected)")
+        if max_bytes < 1:
+            raise ValueError(f"Invalid max_bytes: {max_bytes} (at least 1 expected)")
+        if ttl <= 0:
+            raise ValueError(f"Invalid ttl: {ttl} (strictly positive value expected)")
+        FileLock.check_supported()
+
+        self.__path = path
+        self.__lockPath = f"{path}.lock"
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__evictions = 0
+
+        slotsSize = max_entries * SharedMemoryResultCache.SLOT_DTYPE.itemsize
+
+        # The first process creates the file, the others check its layout.
+        with self.__lock, self.__fileLock():
+            with open(path, "a+b") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    header = np.zeros(1, dtype=SharedMemoryResultCache.HEADER_DTYPE)
+                    header["magic"] = SharedMemoryResultCache.MAGIC
+                    header["version"] = SharedMemoryResultCache.VERSION
+                    header["slot_count"] = max_entries
+                    header["arena_size"] = max_bytes
+                    file.write(header.tobytes())
+                    file.truncate(SharedMemoryResultCache.HEADER_SIZE + slotsSize + max_bytes)
+
+        self.__header = np.memmap(path, dtype=SharedMemoryResultCache.HEADER_DTYPE, mode="r+", shape=(1,))
+
+        if (
+            self.__header["magic"][0] != SharedMemoryResultCache.MAGIC
+            or self.__header["version"][0] != SharedMemoryResultCache.VERSION
+        ):
+            raise ValueError(f"Invalid shared cache file: '{path}'")
+        if self.__header["slot_count"][0] != max_entries or self.__header["arena_size"][0] != max_bytes:
+            raise ValueError(
+                f"Shared cache file '{path}' created with max_entries={self.__header['slot_count'][0]}"
+                f" and max_bytes={self.__header['arena_size'][0]}"
+            )
+
+        self.__slots = np.memmap(
+            path,
+            dtype=SharedMemoryResultCache.SLOT_DTYPE,
+            mode="r+",
+            offset=SharedMemoryResultCache.HEADER_SIZE,
+            shape=(max_entries,),
+        )
+        self.__arena = np.memmap(
+            path, dtype=np.uint8, mode="r+", offset=SharedMemoryResultCache.HEADER_SIZE + slotsSize, shape=(max_bytes,)
+        )
+
+    # ------------------------------------------------------
+    @property
+    def path(self) -> str:
+
+        return self.__path
+
+    # ------------------------------------------------------
+    @property
+    def evictions(self) -> int:
+        """Number of entries evicted by the writes of this process."""
+
+        return self.__evictions
+
+    # ------------------------------------------------------
+    @property
+    def size(self) -> int:
+        """Size of the cached readings in the arena in bytes."""
+
+        return int(self.__slots["length"][self.__slots["pce_identifier"] != b""].sum())
+
+    # ------------------------------------------------------
+    def __len__(self) -> int:
+
+        return int(np.count_nonzero(self.__slots["pce_identifier"] != b""))
+
+    # ------------------------------------------------------
+    def stats(self) -> dict[str, int]:
+
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self.__evictions,
+            "entries": len(self),
+            "size": self.size,
+        }
+
+    # ------------------------------------------------------
+    def get(
+        self, pce_identifier: str, start_date: date, end_date: date, frequencies: list[Frequency]
+    ) -> Optional[MeterReadingsByFrequency]:
+
+        slots = self.__slots
+        mask = SharedMemoryResultCache.__mask(frequencies)
+        startOrdinal = start_date.toordinal()
+        endOrdinal = end_date.toordinal()
+
+        # Candidate slots, checked again once read consistently.
+        candidates = np.flatnonzero(
+            (slots["pce_identifier"] == pce_identifier.encode("utf-8"))
+            & (slots["expires_at"] > time.time())
+            & (slots["start_ordinal"] <= startOrdinal)
+            & (slots["end_ordinal"] >= endOrdinal)
+            & ((slots["frequencies"] & mask) == mask)
+        )
+
+        # The exact date range first, then the most recent entries.
+        exact = (slots["start_ordinal"][candidates] == startOrdinal) & (slots["end_ordinal"][candidates] == endOrdinal)
+        candidates = candidates[np.lexsort((-slots["written_at"][candidates], ~exact))]
+
+        for index in candidates:
+            entry = self.__read(int(index))
+            if entry is None:
+                continue
+
+            cachedKey, data = entry
+            if cachedKey[0] == pce_identifier and IResultCache.covers(
+                cachedKey, data, start_date, end_date, frequencies
+            ):
+                with self.__lock:
+                    self._hits += 1
+
+                Logger.debug(f"Shared cache hit for PCE '{pce_identifier}' from {start_date} to {end_date}")
+
+                return IResultCache.extract(cachedKey, data, start_date, end_date, frequencies)
+
+        with self.__lock:
+            self._misses += 1
+
+        return None
+
+    # ------------------------------------------------------
+    def put(
+        self,
+        pce_identifier: str,
+        start_date: date,
+        end_date: date,
+        frequencies: list[Frequency],
+        data: MeterReadingsByFrequency,
+    ):
+
+        pceBytes = pce_identifier.encode("utf-8")
+        if len(pceBytes) > SharedMemoryResultCache.SLOT_DTYPE["pce_identifier"].itemsize:
+            Logger.debug(f"PCE identifier '{pce_identifier}' too long to be cached")
+            return
+
+        cached = {frequency.value: data.get(frequency.value, []) for frequency in frequencies}
+
+        payload = np.frombuffer(JsonCodec.dumps(cached).encode("utf-8"), dtype=np.uint8)
+
+        if len(payload) > len(self.__arena):
+            Logger.debug(f"Result of {len(payload)} bytes too large to be cached")
+            return
+
+        slots = self.__slots
+        mask = SharedMemoryResultCache.__mask(frequencies)
+
+        with self.__lock, self.__fileLock():
+            head = int(self.__header["head"][0])
+            if head + len(payload) > len(self.__arena):
+                head = 0
+
+            used = slots["pce_identifier"] != b""
+
+            # The entries whose readings are overwritten, and the previous entry of the key.
+            overwritten = used & (slots["offset"] < head + len(payload)) & (slots["offset"] + slots["length"] > head)
+            previous = (
+                used
+                & (slots["pce_identifier"] == pceBytes)
+                & (slots["start_ordinal"] == start_date.toordinal())
+                & (slots["end_ordinal"] == end_date.toordinal())
+                & (slots["frequencies"] == mask)
+            )
+
+            for evicted in np.flatnonzero(overwritten | previous):
+                self.__invalidate(int(evicted))
+            self.__evictions += int(np.count_nonzero(overwritten & ~previous))
+
+            # A free slot, else the oldest one.
+            free = np.flatnonzero(slots["pce_identifier"] == b"")
+            if len(free) > 0:
+                index = int(free[0])
+            else:
+                index = int(np.argmin(slots["written_at"]))
+                self.__evictions += 1
+
+            now = time.time()
+
+            slots["sequence"][index] += 1
+            self.__arena[head : head + len(payload)] = payload
+            slots["pce_identifier"][index] = pceBytes
+            slots["start_ordinal"][index] = start_date.toordinal()
+            slots["end_ordinal"][index] = end_date.toordinal()
+            slots["frequencies"][index] = mask
+            slots["expires_at"][index] = now + self.__ttl
+            slots["written_at"][index] = now
+            slots["offset"][index] = head
+            slots["length"][index] = len(payload)
+            slots["sequence"][index] += 1
+
+            self.__header["head"][0] = head + len(payload)
+
+    # ------------------------------------------------------
+    def clear(self):
+
+        with self.__lock, self.__fileLock():
+            for index in np.flatnonzero(self.__slots["pce_identifier"] != b""):
+                self.__invalidate(int(index))
+
+            self.__header["head"][0] = 0
+
+    # ------------------------------------------------------
+    def __read(self, index: int) -> Optional[tuple[CacheKey, MeterReadingsByFrequency]]:
+
+        slots = self.__slots
+
+        for _ in range(SharedMemoryResultCache.READ_ATTEMPTS):
+            sequence = int(slots["sequence"][index])
+            if sequence % 2 == 1:
+                # Being written.
+                time.sleep(0)
+                continue
+
+            slot = np.array(slots[index]).item()
+            offset, length = int(slot[8]), int(slot[9])
+            payload = self.__arena[offset : offset + length].tobytes()
+
+            if int(slots["sequence"][index]) == sequence:
+                break
+        else:
+            return None
+
+        _, pceIdentifier, startOrdinal, endOrdinal, mask, _, _, _, _, _ = slot
+
+        if pceIdentifier == b"" or length == 0:
+            return None
+
+        key = (
+            pceIdentifier.decode("utf-8"),
+            date.fromordinal(startOrdinal),
+            date.fromordinal(endOrdinal),
+            SharedMemoryResultCache.__frequencies(mask),
+        )
+
+        return key, JsonCodec.loads(payload)
+
+    # ------------------------------------------------------
+    def __invalidate(self, index: int):
+
+        self.__slots["sequence"][index] += 1
+        self.__slots["pce_identifier"][index] = b""
+        self.__slots["length"][index] = 0
+        self.__slots["sequence"][index] += 1
+
+    # ------------------------------------------------------
+    @contextmanager
+    def __fileLock(self) -> Iterator[None]:
+
+        with open(self.__lockPath, "a+b") as file, FileLock.locked(file):
+            yield
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __mask(frequencies: list[Frequency]) -> int:
+
+        return sum(1 << index for index, frequency in enumerate(Frequency) if frequency in frequencies)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __frequencies(mask: int) -> frozenset[Frequency]:
+
+        return frozenset(frequency for index, frequency in enumerate(Frequency) if mask & (1 << index))
@@ -1,13 +1,24 @@
+import contextlib
 import logging
 import warnings
 from datetime import date, timedelta
-from typing import Optional
+from typing import Any, Iterator, Optional
 
-from pygazpar.datasource import IDataSource, MeterReadingsByFrequency
-from pygazpar.enum import Frequency
+from pygazpar.cache import IResultCache
+from pygazpar.datasource import IDataSource, MeterReadings, MeterReadingsByFrequency
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.profiler import Profiler
+from pygazpar.snapshot import ISnapshotStore, MemorySnapshotStore
+from pygazpar.timeperiod import TimePeriod
 
 DEFAULT_LAST_N_DAYS = 365
 
+# Number of last days loaded by Client.load_changes(): the recent days may be corrected after their publication.
+DEFAULT_CHANGES_LAST_N_DAYS = 30
+
+# Size of the date windows loaded by Client.iter_readings().
+DEFAULT_WINDOW_DAYS = 90
+
 
 Logger = logging.getLogger(__name__)
 
@@ -16,14 +27,47 @@ Logger = logging.getLogger(__name__)
 class Client:
 
     # ------------------------------------------------------
-    def __init__(self, dataSource: IDataSource):
+    def __init__(
+        self,
+        dataSource: IDataSource,
+        cache: Optional[IResultCache] = None,
+        profiler: Optional[Profiler] = None,
+        snapshot_store: Optional[ISnapshotStore] = None,
+    ):
         self.__dataSource = dataSource
+        self.__cache = cache
+        self.__profiler = profiler
+        self.__snapshotStore = snapshot_store or MemorySnapshotStore()
+
+    # ------------------------------------------------------
+    @property
+    def cache(self) -> Optional[IResultCache]:
+
+        return self.__cache
+
+    # ------------------------------------------------------
+    @property
+    def profiler(self) -> Optional[Profiler]:
+
+        return self.__profiler
+
+    # ------------------------------------------------------
+    @property
+    def snapshot_store(self) -> ISnapshotStore:
+
+        return self.__snapshotStore
+
+    # ------------------------------------------------------
+    def __profiling(self) -> contextlib.AbstractContextManager:
+
+        return self.__profiler.activate() if self.__profiler is not None else contextlib.nullcontext()
 
     # ------------------------------------------------------
     def login(self):
 
         try:
-            self.__dataSource.login()
+            with self.__profiling():
+                self.__dataSource.login()
         except Exception:
             Logger.error("An unexpected error occured while login", exc_info=True)
             raise
@@ -32,7 +76,8 @@ class Client:
     def logout(self):
 
         try:
-            self.__dataSource.logout()
+            with self.__profiling():
+                self.__dataSource.logout()
         except Exception:
             Logger.error("An unexpected error occured while logout", exc_info=True)
             raise
@@ -41,7 +86,8 @@ class Client:
     def get_pce_identifiers(self) -> list[str]:
 
         try:
-            res = self.__dataSource.get_pce_identifiers()
+            with self.__profiling():
+                res = self.__dataSource.get_pce_identifiers()
         except Exception:
             Logger.error("An unexpected error occured while getting the PCE identifiers", exc_info=True)
             raise
@@ -65,6 +111,21 @@ class Client:
         self, pce_identifier: str, start_date: date, end_date: date, frequencies: Optional[list[Frequency]] = None
     ) -> MeterReadingsByFrequency:
 
+        with self.__profiling(), Profiler.stage("load"):
+            return self.__loadDateRange(pce_identifier, start_date, end_date, frequencies)
+
+    # ------------------------------------------------------
+    def __loadDateRange(
+        self, pce_identifier: str, start_date: date, end_date: date, frequencies: Optional[list[Frequency]]
+    ) -> MeterReadingsByFrequency:
+
+        if self.__cache is not None:
+            frequencyList = list(Frequency) if frequencies is None else list(dict.fromkeys(frequencies))
+
+            cached = self.__cache.get(pce_identifier, start_date, end_date, frequencyList)
+            if cached is not None:
+                return cached
+
         Logger.debug("Start loading the data...")
 
         try:
@@ -75,8 +136,83 @@ class Client:
             Logger.error("An unexpected error occured while loading the data", exc_info=True)
             raise
 
+        if self.__cache is not None:
+            self.__cache.put(pce_identifier, start_date, end_date, frequencyList, res)
+
         return res
 
+    # ------------------------------------------------------
+    def load_changes(
+        self,
+        pce_identifier: str,
+        since_watermark: Optional[int] = None,
+        last_n_days: int = DEFAULT_CHANGES_LAST_N_DAYS,
+        end_date: Optional[date] = None,
+    ) -> tuple[MeterReadings, int]:
+        """Loads the last days and returns the daily readings added or corrected since the watermark, in date
+        order, with the new watermark to pass to the next call.
+
+        The readings are compared with the snapshot of the previous loads (see ISnapshotStore), ignoring their
+        timestamp. Without a watermark, all the days of the snapshot are returned. The result cache is bypassed.
+        """
+
+        end_date = end_date or date.today()
+        start_date = end_date + timedelta(days=-last_n_days)
+
+        try:
+            with self.__profiling(), Profiler.stage("load changes"):
+                data = self.__dataSource.load(pce_identifier, start_date, end_date, [Frequency.DAILY])
+
+                watermark = self.__snapshotStore.update(pce_identifier, data.get(Frequency.DAILY.value, []))
+                res = self.__snapshotStore.changes(pce_identifier, since_watermark)
+        except Exception:
+            Logger.error("An unexpected error occured while loading the changes", exc_info=True)
+            raise
+
+        Logger.debug(f"{len(res)} daily readings changed since watermark {since_watermark} (now {watermark})")
+
+        return res, watermark
+
+    # ------------------------------------------------------
+    def iter_readings(
+        self,
+        pce_identifier: str,
+        start_date: date,
+        end_date: date,
+        frequency: Frequency = Frequency.DAILY,
+        window_days: int = DEFAULT_WINDOW_DAYS,
+    ) -> Iterator[dict[str, Any]]:
+        """Yields the readings of the given frequency in date order, loading the date range window by window.
+
+        The windows are aligned on the periods of the frequency, so that a week, a month or a year is never
+        split between two windows. Only one window is in memory at a time.
+        """
+
+        if window_days < 1:
+            raise ValueError(f"Invalid window_days: {window_days} (at least 1 expected)")
+
+        windowStart = start_date
+        while windowStart <= end_date:
+            windowEnd = min(TimePeriod.last_day(windowStart + timedelta(days=window_days - 1), frequency), end_date)
+
+            data = self.load_date_range(pce_identifier, windowStart, windowEnd, [frequency])
+
+            # Keep the periods starting in the window (data sources may return more than asked).
+            periodStart = TimePeriod.first_day(windowStart, frequency)
+            readings = [
+                (TimePeriod.start_of(reading[PropertyName.TIME_PERIOD.value], frequency), reading)
+                for reading in data.get(frequency.value, [])
+            ]
+            readings = [(day, reading) for day, reading in readings if periodStart <= day <= windowEnd]
+            readings.sort(key=lambda item: item[0])
+
+            Logger.debug(f"{len(readings)} {frequency} readings loaded from {windowStart} to {windowEnd}")
+
+            for _, reading in readings:
+                yield reading
+
+            windowStart = windowEnd + timedelta(days=1)
+
     # ------------------------------------------------------
     def loadSince(
         self, pceIdentifier: str, lastNDays: int = DEFAULT_LAST_N_DAYS, frequencies: Optional[list[Frequency]] = None
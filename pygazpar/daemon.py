@@ -0,0 +1,287 @@
+import logging
+import threading
+from collections import deque
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from pygazpar.client import Client
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.sink import ISink
+from pygazpar.timeperiod import TimePeriod
+
+# Number of last days loaded by each poll: the recent days may be corrected after their first publication.
+DEFAULT_POLL_DAYS = 14
+
+# Interval between the polls of a PCE until its publication time is learned.
+DEFAULT_POLL_INTERVAL = timedelta(hours=1)
+
+# Bounds of the interval between the polls of a PCE whose next gas day is late (doubled at each attempt).
+DEFAULT_MIN_RETRY_INTERVAL = timedelta(minutes=15)
+
+DEFAULT_MAX_RETRY_INTERVAL = timedelta(hours=4)
+
+# Number of last publications of a PCE its publication time is learned from.
+PUBLICATION_HISTORY_SIZE = 14
+
+# Number of publications observed before the polls follow the learned publication time.
+MIN_PUBLICATIONS = 3
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PublicationSchedule:
+    """Learns when the daily readings of a PCE are published and tells when to poll it next.
+
+    A publication delay is the time between the start of the day following a gas day and the publication of that
+    gas day. When a new gas day shows up, its publication time is estimated as the middle of the interval since the
+    previous poll if this interval is short, otherwise as the time of the poll (an upper bound). The typical delay
+    is the median of the last delays.
+
+    Once the typical delay is known, the first poll for the next gas day is made a little before its expected
+    publication, then the polls back off exponentially until it shows up.
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        poll_interval: timedelta = DEFAULT_POLL_INTERVAL,
+        min_retry_interval: timedelta = DEFAULT_MIN_RETRY_INTERVAL,
+        max_retry_interval: timedelta = DEFAULT_MAX_RETRY_INTERVAL,
+        history_size: int = PUBLICATION_HISTORY_SIZE,
+    ):
+
+        if min_retry_interval <= timedelta(0) or max_retry_interval < min_retry_interval:
+            raise ValueError(
+                f"Invalid retry intervals: {min_retry_interval} - {max_retry_interval} (0 < min <= max expected)"
+            )
+
+        self.__pollInterval = poll_interval
+        self.__minRetryInterval = min_retry_interval
+        self.__maxRetryInterval = max_retry_interval
+        self.__delays: deque[timedelta] = deque(maxlen=history_size)
+        self.__lastDay: Optional[date] = None
+        self.__lastPoll: Optional[datetime] = None
+        self.__misses = 0
+        self.__failures = 0
+
+    # ------------------------------------------------------
+    @property
+    def last_day(self) -> Optional[date]:
+        """The last gas day published."""
+
+        return self.__lastDay
+
+    # ------------------------------------------------------
+    @property
+    def typical_delay(self) -> Optional[timedelta]:
+        """The typical publication delay, once enough publications have been observed."""
+
+        if len(self.__delays) < MIN_PUBLICATIONS:
+            return None
+
+        # Median of the last delays.
+        return sorted(self.__delays)[len(self.__delays) // 2]
+
+    # ------------------------------------------------------
+    def observe(self, now: datetime, lastDay: Optional[date]) -> bool:
+        """Records a successful poll and the last gas day it returned. Returns True if it is a new gas day."""
+
+        published = lastDay is not None and (self.__lastDay is None or lastDay > self.__lastDay)
+
+        if published and lastDay is not None and self.__lastDay is not None and self.__lastPoll is not None:
+            if now - self.__lastPoll <= self.__maxRetryInterval:
+                publishedAt = self.__lastPoll + (now - self.__lastPoll) / 2
+            else:
+                publishedAt = now
+
+            delay = publishedAt - PublicationSchedule.__dayAfter(lastDay)
+
+            # Several days published at once (an outage): not a typical delay.
+            if lastDay - self.__lastDay == timedelta(days=1):
+                self.__delays.append(delay)
+
+            Logger.debug(f"Gas day {lastDay} published about {delay} after its end")
+
+        if published:
+            self.__lastDay = lastDay
+            self.__misses = 0
+        else:
+            self.__misses += 1
+
+        self.__lastPoll = now
+        self.__failures = 0
+
+        return published
+
+    # ------------------------------------------------------
+    def fail(self):
+        """Records a failed poll."""
+
+        self.__failures += 1
+
+    # ------------------------------------------------------
+    def next_poll(self, now: datetime) -> datetime:
+        """Returns the time of the next poll."""
+
+        if self.__failures > 0:
+            return now + self.__backoff(self.__failures - 1)
+
+        typicalDelay = self.typical_delay
+        if typicalDelay is None or self.__lastDay is None:
+            return now + self.__pollInterval
+
+        # A little before the expected publication of the next gas day.
+        firstPoll = (
+            PublicationSchedule.__dayAfter(self.__lastDay + timedelta(days=1)) + typicalDelay - self.__minRetryInterval
+        )
+        if now < firstPoll:
+            return firstPoll
+
+        return now + self.__backoff(max(self.__misses - 1, 0))
+
+    # ------------------------------------------------------
+    def __backoff(self, attempt: int) -> timedelta:
+
+        return min(self.__minRetryInterval * 2 ** min(attempt, 32), self.__maxRetryInterval)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __dayAfter(gasDay: date) -> datetime:
+
+        return datetime.combine(gasDay + timedelta(days=1), time())
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PollingDaemon:
+    """Polls the daily readings of many PCEs and writes the new or changed ones to a sink.
+
+    Each PCE is polled on its own schedule (see PublicationSchedule): once its publication time is learned, it is
+    polled around it instead of blindly.
+
+    The changes come from Client.load_changes(): the first poll of a PCE emits all the days of its snapshot, unless
+    the watermark of a previous run is given.
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        client: Client,
+        sink: ISink,
+        pce_identifiers: Optional[list[str]] = None,
+        poll_days: int = DEFAULT_POLL_DAYS,
+        poll_interval: timedelta = DEFAULT_POLL_INTERVAL,
+        min_retry_interval: timedelta = DEFAULT_MIN_RETRY_INTERVAL,
+        max_retry_interval: timedelta = DEFAULT_MAX_RETRY_INTERVAL,
+        watermarks: Optional[dict[str, int]] = None,
+    ):
+
+        if poll_days < 1:
+            raise ValueError(f"Invalid poll_days: {poll_days} (at least 1 expected)")
+
+        self.__client = client
+        self.__sink = sink
+        self.__pceIdentifiers = pce_identifiers
+        self.__pollDays = poll_days
+        self.__scheduleArgs = (poll_interval, min_retry_interval, max_retry_interval)
+        self.__schedules = dict[str, PublicationSchedule]()
+        self.__nextPolls = dict[str, datetime]()
+        # Backs off the retries of the PCE identifiers request.
+        self.__identifiersSchedule = PublicationSchedule(*self.__scheduleArgs)
+        self.__watermarks = dict(watermarks or {})
+        self.__stopEvent = threading.Event()
+
+    # ------------------------------------------------------
+    def schedule(self, pce_identifier: str) -> PublicationSchedule:
+
+        if pce_identifier not in self.__schedules:
+            self.__schedules[pce_identifier] = PublicationSchedule(*self.__scheduleArgs)
+
+        return self.__schedules[pce_identifier]
+
+    # ------------------------------------------------------
+    @property
+    def watermarks(self) -> dict[str, int]:
+        """The watermark of the last poll of each PCE (see Client.load_changes())."""
+
+        return dict(self.__watermarks)
+
+    # ------------------------------------------------------
+    def poll(self, pce_identifier: str, now: Optional[datetime] = None) -> int:
+        """Polls a PCE, writes its new or changed readings to the sink and returns their number."""
+
+        now = now or datetime.now()
+
+        changes, watermark = self.__client.load_changes(
+            pce_identifier, self.__watermarks.get(pce_identifier), self.__pollDays, now.date()
+        )
+
+        if len(changes) > 0:
+            self.__sink.write(pce_identifier, Frequency.DAILY, changes)
+            self.__sink.flush()
+
+        # Written to the sink: the changes are acknowledged.
+        self.__watermarks[pce_identifier] = watermark
+
+        # The changes are in date order: a new gas day is the last one.
+        lastDay = TimePeriod.parse_day(changes[-1][PropertyName.TIME_PERIOD.value]) if len(changes) > 0 else None
+
+        if self.schedule(pce_identifier).observe(now, lastDay):
+            Logger.info(f"PCE '{pce_identifier}': new gas day {lastDay}")
+
+        Logger.debug(f"PCE '{pce_identifier}': {len(changes)} new or changed readings")
+
+        return len(changes)
+
+    # ------------------------------------------------------
+    def run_pending(self, now: Optional[datetime] = None) -> datetime:
+        """Polls the PCEs whose poll is due and returns the time of the next poll."""
+
+        now = now or datetime.now()
+
+        if self.__pceIdentifiers is None:
+            try:
+                self.__pceIdentifiers = self.__client.get_pce_identifiers()
+            except Exception:  # pylint: disable=broad-except
+                Logger.error("An error occured while getting the PCE identifiers", exc_info=True)
+                self.__identifiersSchedule.fail()
+                return self.__identifiersSchedule.next_poll(now)
+
+        for pce_identifier in self.__pceIdentifiers:
+            if self.__nextPolls.get(pce_identifier, now) > now:
+                continue
+
+            schedule = self.schedule(pce_identifier)
+            try:
+                self.poll(pce_identifier, now)
+            except Exception:  # pylint: disable=broad-except
+                Logger.error(f"An error occured while polling PCE '{pce_identifier}'", exc_info=True)
+                schedule.fail()
+
+            self.__nextPolls[pce_identifier] = schedule.next_poll(now)
+
+            Logger.debug(f"PCE '{pce_identifier}': next poll at {self.__nextPolls[pce_identifier]}")
+
+        return min(self.__nextPolls.values(), default=now + self.__scheduleArgs[0])
+
+    # ------------------------------------------------------
+    def run(self):
+        """Polls the PCEs until stop() is called."""
+
+        self.__stopEvent.clear()
+
+        Logger.info("Polling daemon started")
+
+        try:
+            while not self.__stopEvent.is_set():
+                nextPoll = self.run_pending()
+                self.__stopEvent.wait(max((nextPoll - datetime.now()).total_seconds(), 0))
+        finally:
+            self.__sink.close()
+
+        Logger.info("Polling daemon stopped")
+
+    # ------------------------------------------------------
+    def stop(self):
+
+        self.__stopEvent.set()
@@ -1,18 +1,28 @@
 import glob
-import json
 import logging
 import os
+import re
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
 from typing import Any, Optional, cast
 
 import pandas as pd
 
-from pygazpar.api_client import APIClient, ConsumptionType
+from pygazpar.api_client import DEFAULT_POOL_SIZE, APIClient, ConsumptionType
 from pygazpar.api_client import Frequency as APIClientFrequency
+from pygazpar.billing import BillingReconciler
 from pygazpar.enum import Frequency, PropertyName
 from pygazpar.excelparser import ExcelParser
+from pygazpar.hourly import HourlyReadings
+from pygazpar.jsoncodec import JsonCodec
 from pygazpar.jsonparser import JsonParser
+from pygazpar.profiler import Profiler
+from pygazpar.ratelimiter import RateLimiter
+from pygazpar.readingstore import DailyReadingStore
+from pygazpar.singleflight import SingleFlight
+from pygazpar.timeperiod import TimePeriod
 
 Logger = logging.getLogger(__name__)
 
@@ -49,9 +59,29 @@ class IDataSource(ABC):  # pylint: disable=too-few-public-methods
 class WebDataSource(IDataSource):  # pylint: disable=too-few-public-methods
 
     # ------------------------------------------------------
-    def __init__(self, username: str, password: str):
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        rateLimiter: Optional[RateLimiter] = None,
+        threadSafe: bool = False,
+        poolSize: int = DEFAULT_POOL_SIZE,
+        keepAliveInterval: Optional[float] = None,
+        sessionMaxAge: Optional[float] = None,
+    ):
+
+        self._api_client = APIClient(
+            username,
+            password,
+            rate_limiter=rateLimiter,
+            thread_safe=threadSafe,
+            pool_size=poolSize,
+            keep_alive_interval=keepAliveInterval,
+            session_max_age=sessionMaxAge,
+        )
 
-        self._api_client = APIClient(username, password)
+        self._singleFlight = SingleFlight[Optional[list[dict[str, Any]]]]()
+        self._hourlySingleFlight = SingleFlight[HourlyReadings]()
 
     # ------------------------------------------------------
     def login(self):
@@ -115,9 +145,9 @@ class ExcelWebDataSource(WebDataSource):  # pylint: disable=too-few-public-metho
     DATA_FILENAME = "Donnees_informatives_*.xlsx"
 
     # ------------------------------------------------------
-    def __init__(self, username: str, password: str, tmpDirectory: str):
+    def __init__(self, username: str, password: str, tmpDirectory: str, rateLimiter: Optional[RateLimiter] = None):
 
-        super().__init__(username, password)
+        super().__init__(username, password, rateLimiter)
 
         self.__tmpDirectory = tmpDirectory
 
@@ -126,7 +156,7 @@ class ExcelWebDataSource(WebDataSource):  # pylint: disable=too-few-public-metho
         self, pceIdentifier: str, startDate: date, endDate: date, frequencies: Optional[list[Frequency]] = None
     ) -> MeterReadingsByFrequency:  # pylint: disable=too-many-branches
 
-        res = {}
+        res = MeterReadingsByFrequency()
 
         # XLSX is in the TMP directory
         data_file_path_pattern = self.__tmpDirectory + "/" + ExcelWebDataSource.DATA_FILENAME
@@ -149,6 +179,11 @@ class ExcelWebDataSource(WebDataSource):  # pylint: disable=too-few-public-metho
 
         for frequency in frequencyList:
 
+            # The hourly export is only downloaded when explicitly requested.
+            if frequency == Frequency.HOURLY and frequencies is None:
+                res[frequency.value] = []
+                continue
+
             Logger.debug(
                 f"Loading data of frequency {ExcelWebDataSource.FREQUENCY_VALUES[frequency]} from {startDate.strftime(ExcelWebDataSource.DATE_FORMAT)} to {endDate.strftime(ExcelWebDataSource.DATE_FORMAT)}"
             )
@@ -215,7 +250,7 @@ class ExcelFileDataSource(IDataSource):  # pylint: disable=too-few-public-method
         self, pceIdentifier: str, startDate: date, endDate: date, frequencies: Optional[list[Frequency]] = None
     ) -> MeterReadingsByFrequency:
 
-        res = {}
+        res = MeterReadingsByFrequency()
 
         if frequencies is None:
             # Transform Enum in List.
@@ -225,7 +260,10 @@ class ExcelFileDataSource(IDataSource):  # pylint: disable=too-few-public-method
             frequencyList = list(set(frequencies))
 
         for frequency in frequencyList:
-            if frequency != Frequency.YEARLY:
+            if frequency == Frequency.HOURLY and frequencies is None:
+                # The hourly readings are only parsed when explicitly requested.
+                res[frequency.value] = []
+            elif frequency != Frequency.YEARLY:
                 res[frequency.value] = ExcelParser.parse(self.__excelFile, frequency)
             else:
                 daily = ExcelParser.parse(self.__excelFile, Frequency.DAILY)
@@ -256,6 +294,84 @@ class JsonWebDataSource(WebDataSource):  # pylint: disable=too-few-public-method
             Frequency.YEARLY: FrequencyConverter.computeYearly,
         }
 
+        if frequencies is None:
+            # Transform Enum in List.
+            frequencyList = list(Frequency)
+        else:
+            # Get unique values.
+            frequencyList = list(set(frequencies))
+
+        # Hourly readings are not computed from the daily ones: they have their own request, only sent when they
+        # are explicitly requested.
+        if frequencies is not None and Frequency.HOURLY in frequencyList:
+            frequencyList.remove(Frequency.HOURLY)
+            res[Frequency.HOURLY.value] = self.load_hourly(pceIdentifier, startDate, endDate).to_readings()
+
+            if len(frequencyList) == 0:
+                return res
+
+        # Concurrent loads of the same PCE and of a contained date range share a single fetch.
+        daily, fetchedStartDate, fetchedEndDate = self._singleFlight.do(
+            pceIdentifier, startDate, endDate, lambda: self.__fetchDaily(pceIdentifier, startDate, endDate)
+        )
+
+        if daily is not None and (fetchedStartDate, fetchedEndDate) != (startDate, endDate):
+            daily = TimePeriod.slice_daily(daily, startDate, endDate)
+
+        # Transform all the data into the target structure.
+        if daily is None or len(daily) == 0:
+            return res
+
+        # The fetch is shared by the concurrent callers: each one gets its own readings.
+        daily = [dict(reading) for reading in daily]
+
+        for frequency in frequencyList:
+            res[frequency.value] = computeByFrequency[frequency](list(daily))
+
+        return res
+
+    # ------------------------------------------------------
+    def load_hourly(self, pceIdentifier: str, startDate: date, endDate: date) -> HourlyReadings:
+        """Loads the hourly readings of the gas days between startDate and endDate in compact columns.
+
+        The response body is parsed as it is downloaded: the readings are never all held as dictionaries.
+        """
+
+        if not self._api_client.is_logged_in():
+            self._api_client.login()
+
+        hourly, fetchedStartDate, fetchedEndDate = self._hourlySingleFlight.do(
+            pceIdentifier, startDate, endDate, lambda: self.__fetchHourly(pceIdentifier, startDate, endDate)
+        )
+
+        if (fetchedStartDate, fetchedEndDate) != (startDate, endDate):
+            hourly = hourly.between(startDate, endDate)
+
+        return hourly
+
+    # ------------------------------------------------------
+    def __fetchHourly(self, pceIdentifier: str, startDate: date, endDate: date) -> HourlyReadings:
+
+        chunks = self._api_client.iter_pce_consumption(
+            ConsumptionType.INFORMATIVE, startDate, endDate, [pceIdentifier], APIClientFrequency.HOURLY
+        )
+
+        try:
+            # Keep the requested gas days only.
+            res = HourlyReadings.from_releves(JsonParser.iter_releves(chunks, pceIdentifier)).between(
+                startDate, endDate
+            )
+        except KeyError:
+            # Not any data for this PCE.
+            res = HourlyReadings.from_rows([])
+
+        Logger.debug(f"{len(res)} hourly readings loaded ({res.nbytes} bytes)")
+
+        return res
+
+    # ------------------------------------------------------
+    def __fetchDaily(self, pceIdentifier: str, startDate: date, endDate: date) -> Optional[list[dict[str, Any]]]:
+
         data = self._api_client.get_pce_consumption(ConsumptionType.INFORMATIVE, startDate, endDate, [pceIdentifier])
 
         Logger.debug("Json meter data: %s", data)
@@ -275,14 +391,95 @@ class JsonWebDataSource(WebDataSource):  # pylint: disable=too-few-public-method
 
         Logger.debug("Json temperature data: %s", temperatures)
 
-        # Transform all the data into the target structure.
         if data is None or len(data) == 0:
-            return res
+            return None
 
-        daily = JsonParser.parse(json.dumps(data), json.dumps(temperatures), pceIdentifier)
+        daily = JsonParser.parse_data(data, temperatures, pceIdentifier)
 
         Logger.debug("Processed daily data: %s", daily)
 
+        return daily
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PublishedJsonWebDataSource(JsonWebDataSource):  # pylint: disable=too-few-public-methods
+    """JsonWebDataSource whose daily readings are annotated with their billing period (see BillingReconciler)."""
+
+    # ------------------------------------------------------
+    def _loadFromSession(
+        self, pceIdentifier: str, startDate: date, endDate: date, frequencies: Optional[list[Frequency]] = None
+    ) -> MeterReadingsByFrequency:
+
+        res = super()._loadFromSession(pceIdentifier, startDate, endDate, frequencies)
+
+        if Frequency.DAILY.value in res:
+            billing = self.load_published(pceIdentifier, startDate, endDate)
+            res[Frequency.DAILY.value] = BillingReconciler.merge(res[Frequency.DAILY.value], billing)
+
+        return res
+
+    # ------------------------------------------------------
+    def load_published(self, pceIdentifier: str, startDate: date, endDate: date) -> list[dict[str, Any]]:
+        """Loads the published consumption: one reading per billing period."""
+
+        if not self._api_client.is_logged_in():
+            self._api_client.login()
+
+        data = self._api_client.get_pce_consumption(ConsumptionType.PUBLISHED, startDate, endDate, [pceIdentifier])
+
+        Logger.debug("Json published data: %s", data)
+
+        if data is None or len(data) == 0:
+            return []
+
+        return JsonParser.parse_published_data(data, pceIdentifier)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class JsonFileDataSource(IDataSource):  # pylint: disable=too-few-public-methods
+
+    # ------------------------------------------------------
+    def __init__(self, consumptionJsonFile: str, temperatureJsonFile):
+
+        self.__consumptionJsonFile = consumptionJsonFile
+        self.__temperatureJsonFile = temperatureJsonFile
+
+    # ------------------------------------------------------
+    def login(self):
+        pass
+
+    # ------------------------------------------------------
+    def logout(self):
+        pass
+
+    # ------------------------------------------------------
+    def get_pce_identifiers(self) -> list[str]:
+
+        return ["0123456789"]
+
+    # ------------------------------------------------------
+    def load(
+        self, pceIdentifier: str, startDate: date, endDate: date, frequencies: Optional[list[Frequency]] = None
+    ) -> MeterReadingsByFrequency:
+
+        res = {}
+
+        # The daily consumption file cannot provide hourly readings: they are only empty in a default load.
+        if frequencies is not None and Frequency.HOURLY in frequencies:
+            raise ValueError(f"Hourly readings are not available from {type(self).__name__}")
+
+        with open(self.__consumptionJsonFile, mode="rb") as consumptionJsonFile:
+            with open(self.__temperatureJsonFile, mode="rb") as temperatureJsonFile:
+                daily = JsonParser.parse(consumptionJsonFile.read(), temperatureJsonFile.read(), pceIdentifier)
+
+        computeByFrequency = {
+            Frequency.HOURLY: FrequencyConverter.computeHourly,
+            Frequency.DAILY: FrequencyConverter.computeDaily,
+            Frequency.WEEKLY: FrequencyConverter.computeWeekly,
+            Frequency.MONTHLY: FrequencyConverter.computeMonthly,
+            Frequency.YEARLY: FrequencyConverter.computeYearly,
+        }
+
         if frequencies is None:
             # Transform Enum in List.
             frequencyList = list(Frequency)
@@ -297,13 +494,55 @@ class JsonWebDataSource(WebDataSource):  # pylint: disable=too-few-public-method
 
 
 # ------------------------------------------------------------------------------------------------------------
-class JsonFileDataSource(IDataSource):  # pylint: disable=too-few-public-methods
+class PublishedJsonFileDataSource(JsonFileDataSource):  # pylint: disable=too-few-public-methods
+    """JsonFileDataSource whose daily readings are annotated with their billing period (see BillingReconciler)."""
 
     # ------------------------------------------------------
-    def __init__(self, consumptionJsonFile: str, temperatureJsonFile):
+    def __init__(self, consumptionJsonFile: str, temperatureJsonFile, publishedJsonFile: str):
 
-        self.__consumptionJsonFile = consumptionJsonFile
-        self.__temperatureJsonFile = temperatureJsonFile
+        super().__init__(consumptionJsonFile, temperatureJsonFile)
+
+        self.__publishedJsonFile = publishedJsonFile
+
+    # ------------------------------------------------------
+    def load(
+        self, pceIdentifier: str, startDate: date, endDate: date, frequencies: Optional[list[Frequency]] = None
+    ) -> MeterReadingsByFrequency:
+
+        res = super().load(pceIdentifier, startDate, endDate, frequencies)
+
+        if Frequency.DAILY.value in res:
+            with open(self.__publishedJsonFile, mode="rb") as publishedJsonFile:
+                billing = JsonParser.parse_published(publishedJsonFile.read(), pceIdentifier)
+
+            res[Frequency.DAILY.value] = BillingReconciler.merge(res[Frequency.DAILY.value], billing)
+
+        return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+class DirectoryDataSource(IDataSource):  # pylint: disable=too-few-public-methods
+    """Data source of a directory of archived exports, for any number of PCEs: the Excel exports (of any
+    frequency) and the JSON consumption and temperature documents, in the directory and its sub-directories.
+
+    The files are parsed once, on first use, by a pool of processes. The readings of a PCE found in several files
+    are merged into a single history in date order: for a period found in several files, the file modified last
+    wins. The weekly, monthly and yearly readings are computed from the daily history when there is one.
+    """
+
+    FILENAME_PATTERNS = ["*.xlsx", "*.json"]
+
+    # A PCE identifier in a filename, for the Excel exports without it in their header.
+    PCE_IDENTIFIER_PATTERN = re.compile(r"(?<!\d)\d{14}(?!\d)")
+
+    # ------------------------------------------------------
+    def __init__(self, directory: str, maxWorkers: Optional[int] = None):
+
+        self.__directory = directory
+        # The number of processes (None: the number of CPUs, 0: no process pool).
+        self.__maxWorkers = maxWorkers
+        self.__lock = threading.Lock()
+        self.__histories: Optional[dict[str, dict[Frequency, Any]]] = None
 
     # ------------------------------------------------------
     def login(self):
@@ -316,7 +555,251 @@ class JsonFileDataSource(IDataSource):  # pylint: disable=too-few-public-methods
     # ------------------------------------------------------
     def get_pce_identifiers(self) -> list[str]:
 
-        return ["0123456789"]
+        return sorted(self.__load())
+
+    # ------------------------------------------------------
+    def refresh(self):
+        """Forgets the parsed files: the directory is read again on the next load."""
+
+        with self.__lock:
+            self.__histories = None
+
+    # ------------------------------------------------------
+    def load(
+        self, pceIdentifier: str, startDate: date, endDate: date, frequencies: Optional[list[Frequency]] = None
+    ) -> MeterReadingsByFrequency:
+
+        res = dict[str, Any]()
+
+        history = self.__load().get(pceIdentifier, {})
+
+        computeByFrequency = {
+            Frequency.DAILY: FrequencyConverter.computeDaily,
+            Frequency.WEEKLY: FrequencyConverter.computeWeekly,
+            Frequency.MONTHLY: FrequencyConverter.computeMonthly,
+            Frequency.YEARLY: FrequencyConverter.computeYearly,
+        }
+
+        if frequencies is None:
+            # Transform Enum in List.
+            frequencyList = list(Frequency)
+        else:
+            # Get unique values.
+            frequencyList = list(set(frequencies))
+
+        daily = TimePeriod.slice_daily(history.get(Frequency.DAILY, []), startDate, endDate)
+
+        for frequency in frequencyList:
+            if frequency == Frequency.HOURLY:
+                readings = history[frequency].between(startDate, endDate).to_readings() if frequency in history else []
+            elif len(daily) > 0:
+                readings = computeByFrequency[frequency](list(daily))
+            else:
+                # Weekly or monthly exports only.
+                readings = [
+                    reading
+                    for reading in history.get(frequency, [])
+                    if startDate <= TimePeriod.start_of(reading[PropertyName.TIME_PERIOD.value], frequency) <= endDate
+                ]
+
+            if len(readings) > 0:
+                res[frequency.value] = readings
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def parse_file(filename: str) -> tuple[dict[str, Any], list[tuple[str, Frequency, Any]]]:
+        """Parses a file of the directory (in a worker process): returns the temperatures it holds and its readings
+        by PCE and frequency, the hourly ones as HourlyReadings. A file which is not an export, or which cannot be
+        parsed, is ignored.
+        """
+
+        try:
+            return DirectoryDataSource.__parseFile(filename)
+        except Exception:  # pylint: disable=broad-exception-caught
+            Logger.warning(f"'{filename}' cannot be parsed: ignored", exc_info=True)
+            return {}, []
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __parseFile(filename: str) -> tuple[dict[str, Any], list[tuple[str, Frequency, Any]]]:
+
+        temperatures = dict[str, Any]()
+        res = list[tuple[str, Frequency, Any]]()
+
+        if filename.lower().endswith(".xlsx"):
+            pceIdentifier, frequency = ExcelParser.detect(filename)
+            if pceIdentifier is None:
+                match = DirectoryDataSource.PCE_IDENTIFIER_PATTERN.search(os.path.basename(filename))
+                pceIdentifier = match.group() if match is not None else None
+
+            if frequency is None:
+                Logger.debug(f"'{filename}' is not an export: ignored")
+            elif pceIdentifier is None:
+                Logger.warning(f"No PCE identifier found in '{filename}': ignored")
+            elif frequency == Frequency.HOURLY:
+                res.append((pceIdentifier, frequency, ExcelParser.parse_hourly(filename)))
+            else:
+                res.append((pceIdentifier, frequency, ExcelParser.parse(filename, frequency)))
+
+            return temperatures, res
+
+        with open(filename, mode="rb") as jsonFile:
+            data = JsonCodec.loads(jsonFile.read())
+
+        if not isinstance(data, dict):
+            Logger.debug(f"'{filename}' is not a consumption document: ignored")
+            return temperatures, res
+
+        for key, value in data.items():
+            if not isinstance(value, dict):
+                # Temperatures by gas day.
+                temperatures[key] = value
+                continue
+
+            releves = value.get("releves")
+            if not releves or releves[0].get("journeeGaziere") is None:
+                # Not any informative readings (e.g. published consumption).
+                continue
+
+            if releves[0].get("frequenceReleve") == APIClientFrequency.HOURLY.value:
+                res.append((key, Frequency.HOURLY, HourlyReadings.from_releves(releves)))
+            else:
+                res.append((key, Frequency.DAILY, JsonParser.parse_data(data, None, key)))
+
+        return temperatures, res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def merge(parts: list[list[dict[str, Any]]], frequency: Frequency) -> list[dict[str, Any]]:
+        """Merges the readings of several files in date order: for a period found in several parts, the last
+        part wins.
+        """
+
+        readingsByStart = dict[date, dict[str, Any]]()
+        for readings in parts:
+            for reading in readings:
+                readingsByStart[TimePeriod.start_of(reading[PropertyName.TIME_PERIOD.value], frequency)] = reading
+
+        return [readingsByStart[start] for start in sorted(readingsByStart)]
+
+    # ------------------------------------------------------
+    def __load(self) -> dict[str, dict[Frequency, Any]]:
+
+        with self.__lock:
+            if self.__histories is None:
+                self.__histories = self.__parseDirectory()
+
+            return self.__histories
+
+    # ------------------------------------------------------
+    def __parseDirectory(self) -> dict[str, dict[Frequency, Any]]:
+
+        filenames = [
+            filename
+            for pattern in DirectoryDataSource.FILENAME_PATTERNS
+            for filename in glob.glob(os.path.join(self.__directory, "**", pattern), recursive=True)
+        ]
+
+        # The files modified last win.
+        filenames.sort(key=lambda filename: (os.path.getmtime(filename), filename))
+
+        Logger.debug(f"Parsing {len(filenames)} files of '{self.__directory}'...")
+
+        if self.__maxWorkers == 0 or len(filenames) <= 1:
+            results = [DirectoryDataSource.parse_file(filename) for filename in filenames]
+        else:
+            # openpyxl parsing is CPU bound: the files are parsed by processes, not threads.
+            with ProcessPoolExecutor(max_workers=self.__maxWorkers) as executor:
+                results = list(executor.map(DirectoryDataSource.parse_file, filenames))
+
+        temperatures = dict[str, Any]()
+        parts = dict[str, dict[Frequency, list[Any]]]()
+        for fileTemperatures, readings in results:
+            temperatures.update(fileTemperatures)
+            for pceIdentifier, frequency, value in readings:
+                parts.setdefault(pceIdentifier, {}).setdefault(frequency, []).append(value)
+
+        res = dict[str, dict[Frequency, Any]]()
+        for pceIdentifier, partsByFrequency in parts.items():
+            history = dict[Frequency, Any]()
+            for frequency, values in partsByFrequency.items():
+                if frequency == Frequency.HOURLY:
+                    history[frequency] = HourlyReadings.concat(values)
+                else:
+                    history[frequency] = DirectoryDataSource.merge(values, frequency)
+
+            for reading in history.get(Frequency.DAILY, []) if len(temperatures) > 0 else []:
+                if reading.get(PropertyName.TEMPERATURE.value) is None:
+                    day = TimePeriod.day_of(reading)
+                    reading[PropertyName.TEMPERATURE.value] = temperatures.get(day.isoformat())
+
+            res[pceIdentifier] = history
+
+        Logger.debug(f"{len(filenames)} files parsed: {len(res)} PCEs found")
+
+        return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+class MemoryMappedDataSource(IDataSource):  # pylint: disable=too-few-public-methods
+
+    # The most recent days may not be published yet: they are never considered as absent.
+    PUBLICATION_DELAY_DAYS = 3
+
+    # ------------------------------------------------------
+    def __init__(self, directory: str, dataSource: Optional[IDataSource] = None):
+
+        self.__store = DailyReadingStore(directory)
+        self.__dataSource = dataSource
+
+    # ------------------------------------------------------
+    @property
+    def store(self) -> DailyReadingStore:
+
+        return self.__store
+
+    # ------------------------------------------------------
+    def login(self):
+
+        if self.__dataSource is not None:
+            self.__dataSource.login()
+
+    # ------------------------------------------------------
+    def logout(self):
+
+        if self.__dataSource is not None:
+            self.__dataSource.logout()
+
+    # ------------------------------------------------------
+    def get_pce_identifiers(self) -> list[str]:
+
+        if self.__dataSource is not None:
+            return self.__dataSource.get_pce_identifiers()
+
+        return self.__store.pce_identifiers()
+
+    # ------------------------------------------------------
+    def fill(self, pceIdentifier: str, startDate: date, endDate: date) -> int:
+
+        if self.__dataSource is None:
+            raise ValueError("No data source to fill the store from")
+
+        data = self.__dataSource.load(pceIdentifier, startDate, endDate, [Frequency.DAILY])
+
+        daily = data.get(Frequency.DAILY.value, [])
+
+        self.__store.write(pceIdentifier, daily)
+
+        # Days that are not returned by the data source are not loaded again.
+        lastPublishedDate = min(endDate, date.today() - timedelta(days=MemoryMappedDataSource.PUBLICATION_DELAY_DAYS))
+        if startDate <= lastPublishedDate:
+            self.__store.mark_absent(pceIdentifier, startDate, lastPublishedDate)
+
+        Logger.debug(f"{len(daily)} daily readings loaded into the store from {startDate} to {endDate}")
+
+        return len(daily)
 
     # ------------------------------------------------------
     def load(
@@ -325,9 +808,25 @@ class JsonFileDataSource(IDataSource):  # pylint: disable=too-few-public-methods
 
         res = {}
 
-        with open(self.__consumptionJsonFile, mode="r", encoding="utf-8") as consumptionJsonFile:
-            with open(self.__temperatureJsonFile, mode="r", encoding="utf-8") as temperatureJsonFile:
-                daily = JsonParser.parse(consumptionJsonFile.read(), temperatureJsonFile.read(), pceIdentifier)
+        # Only the daily readings are stored: the hourly ones come from the underlying data source, and are only
+        # empty in a default load.
+        if frequencies is not None and Frequency.HOURLY in frequencies:
+            if self.__dataSource is None:
+                raise ValueError(f"Hourly readings are not available from {type(self).__name__} without a data source")
+
+            hourly = self.__dataSource.load(pceIdentifier, startDate, endDate, [Frequency.HOURLY])
+            res[Frequency.HOURLY.value] = hourly.get(Frequency.HOURLY.value, [])
+
+            frequencies = [frequency for frequency in frequencies if frequency != Frequency.HOURLY]
+            if len(frequencies) == 0:
+                return res
+
+        if self.__dataSource is not None:
+            missingDays = self.__store.missing_days(pceIdentifier, startDate, endDate)
+            if len(missingDays) > 0:
+                self.fill(pceIdentifier, missingDays[0], missingDays[-1])
+
+        daily = self.__store.read(pceIdentifier, startDate, endDate)
 
         computeByFrequency = {
             Frequency.HOURLY: FrequencyConverter.computeHourly,
@@ -345,7 +844,7 @@ class JsonFileDataSource(IDataSource):  # pylint: disable=too-few-public-methods
             frequencyList = list(set(frequencies))
 
         for frequency in frequencyList:
-            res[frequency.value] = computeByFrequency[frequency](daily)
+            res[frequency.value] = computeByFrequency[frequency](daily) if len(daily) > 0 else []
 
         return res
 
@@ -400,8 +899,8 @@ class TestDataSource(IDataSource):  # pylint: disable=too-few-public-methods
                 f"{os.path.dirname(os.path.abspath(__file__))}/resources/{dataSampleFilenameByFrequency[frequency]}"
             )
 
-            with open(dataSampleFilename, mode="r", encoding="utf-8") as jsonFile:
-                res[frequency.value] = cast(list[dict[PropertyName, Any]], json.load(jsonFile))
+            with open(dataSampleFilename, mode="rb") as jsonFile:
+                res[frequency.value] = cast(list[dict[PropertyName, Any]], JsonCodec.loads(jsonFile.read()))
 
         return res
 
@@ -409,35 +908,26 @@ class TestDataSource(IDataSource):  # pylint: disable=too-few-public-methods
 # ------------------------------------------------------------------------------------------------------------
 class FrequencyConverter:
 
-    MONTHS = [
-        "Janvier",
-        "Février",
-        "Mars",
-        "Avril",
-        "Mai",
-        "Juin",
-        "Juillet",
-        "Août",
-        "Septembre",
-        "Octobre",
-        "Novembre",
-        "Décembre",
-    ]
+    MONTHS = TimePeriod.MONTHS
 
     # ------------------------------------------------------
     @staticmethod
+    @Profiler.timed("convert hourly")
     def computeHourly(daily: list[dict[str, Any]]) -> list[dict[str, Any]]:  # pylint: disable=unused-argument
+        """Hourly readings cannot be computed from the daily ones: the empty result of a default load."""
 
         return []
 
     # ------------------------------------------------------
     @staticmethod
+    @Profiler.timed("convert daily")
     def computeDaily(daily: list[dict[str, Any]]) -> list[dict[str, Any]]:
 
         return daily
 
     # ------------------------------------------------------
     @staticmethod
+    @Profiler.timed("convert weekly")
     def computeWeekly(daily: list[dict[str, Any]]) -> list[dict[str, Any]]:
 
         df = pd.DataFrame(daily)
@@ -445,11 +935,11 @@ class FrequencyConverter:
         # Trimming head and trailing spaces and convert to datetime.
         df["date_time"] = pd.to_datetime(df["time_period"].str.strip(), format=JsonWebDataSource.OUTPUT_DATE_FORMAT)
 
-        # Get the first day of week.
-        df["first_day_of_week"] = pd.to_datetime(df["date_time"].dt.strftime("%W %Y 1"), format="%W %Y %w")
+        # Get the first day of week (Monday).
+        df["first_day_of_week"] = df["date_time"] - pd.to_timedelta(df["date_time"].dt.weekday, unit="D")
 
-        # Get the last day of week.
-        df["last_day_of_week"] = pd.to_datetime(df["date_time"].dt.strftime("%W %Y 0"), format="%W %Y %w")
+        # Get the last day of week (Sunday).
+        df["last_day_of_week"] = df["first_day_of_week"] + pd.Timedelta(days=6)
 
         # Reformat the time period.
         df["time_period"] = (
@@ -500,6 +990,7 @@ class FrequencyConverter:
 
     # ------------------------------------------------------
     @staticmethod
+    @Profiler.timed("convert monthly")
     def computeMonthly(daily: list[dict[str, Any]]) -> list[dict[str, Any]]:
 
         df = pd.DataFrame(daily)
@@ -548,6 +1039,7 @@ class FrequencyConverter:
 
     # ------------------------------------------------------
     @staticmethod
+    @Profiler.timed("convert yearly")
     def computeYearly(daily: list[dict[str, Any]]) -> list[dict[str, Any]]:
 
         df = pd.DataFrame(daily)
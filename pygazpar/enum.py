@@ -12,6 +12,9 @@ class PropertyName(Enum):
     TEMPERATURE = "temperature_degC"
     TYPE = "type"
     TIMESTAMP = "timestamp"
+    BILLING_PERIOD = "billing_period"
+    BILLING_VOLUME_DIFFERENCE = "billing_volume_difference_m3"
+    BILLING_ENERGY_DIFFERENCE = "billing_energy_difference_kwh"
 
     def __str__(self):
         return self.value
@@ -1,15 +1,47 @@
 import logging
-from datetime import datetime
-from typing import Any
+import zipfile
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from xml.etree.ElementTree import ParseError
 
 from openpyxl import load_workbook
-from openpyxl.cell.cell import Cell
-from openpyxl.worksheet.worksheet import Worksheet
 
 from pygazpar.enum import Frequency, PropertyName
+from pygazpar.hourly import HOURLY_DATE_FORMAT, HourlyReadings
+from pygazpar.profiler import Profiler
+from pygazpar.xlsxreader import XlsxReader
 
 FIRST_DATA_LINE_NUMBER = 10
 
+# The data columns: B to I.
+FIRST_COLUMN = 2
+
+LAST_COLUMN = 9
+
+# The properties of the columns B, C, ... and whether they are numbers.
+DAILY_COLUMNS = [
+    (PropertyName.TIME_PERIOD.value, False),
+    (PropertyName.START_INDEX.value, True),
+    (PropertyName.END_INDEX.value, True),
+    (PropertyName.VOLUME.value, True),
+    (PropertyName.ENERGY.value, True),
+    (PropertyName.CONVERTER_FACTOR.value, True),
+    (PropertyName.TEMPERATURE.value, True),
+    (PropertyName.TYPE.value, False),
+]
+
+WEEKLY_COLUMNS = [
+    (PropertyName.TIME_PERIOD.value, False),
+    (PropertyName.VOLUME.value, True),
+    (PropertyName.ENERGY.value, True),
+]
+
+MONTHLY_COLUMNS = WEEKLY_COLUMNS
+
+HEADER_LINE_NUMBER = FIRST_DATA_LINE_NUMBER - 1
+
+PCE_LABEL = "N° PCE"
+
 Logger = logging.getLogger(__name__)
 
 
@@ -18,24 +50,31 @@ class ExcelParser:  # pylint: disable=too-few-public-methods
 
     # ------------------------------------------------------
     @staticmethod
-    def parse(dataFilename: str, dataReadingFrequency: Frequency) -> list[dict[str, Any]]:
+    @Profiler.timed("excel parse")
+    def parse(dataFilename: str, dataReadingFrequency: Frequency, useFastReader: bool = True) -> list[dict[str, Any]]:
 
         parseByFrequency = {
-            Frequency.HOURLY: ExcelParser.__parseHourly,
             Frequency.DAILY: ExcelParser.__parseDaily,
             Frequency.WEEKLY: ExcelParser.__parseWeekly,
             Frequency.MONTHLY: ExcelParser.__parseMonthly,
         }
 
-        Logger.debug(f"Loading Excel data file '{dataFilename}'...")
+        if dataReadingFrequency == Frequency.HOURLY:
+            return ExcelParser.parse_hourly(dataFilename).to_readings()
 
-        workbook = load_workbook(filename=dataFilename)
+        Logger.debug(f"Loading Excel data file '{dataFilename}'...")
 
-        worksheet = workbook.active
+        rows = None
+        if useFastReader:
+            try:
+                rows = list(XlsxReader.iter_rows(dataFilename, FIRST_DATA_LINE_NUMBER, FIRST_COLUMN, LAST_COLUMN))
+            except (ValueError, KeyError, IndexError, zipfile.BadZipFile, ParseError) as exception:
+                Logger.debug(f"Unexpected layout of '{dataFilename}' ({exception}): loaded with openpyxl")
 
-        res = parseByFrequency[dataReadingFrequency](worksheet)  # type: ignore
+        if rows is None:
+            rows = ExcelParser.__readRows(dataFilename)
 
-        workbook.close()
+        res = parseByFrequency[dataReadingFrequency](rows)
 
         Logger.debug("Processed Excel %s data: %s", dataReadingFrequency, res)
 
@@ -43,96 +82,182 @@ class ExcelParser:  # pylint: disable=too-few-public-methods
 
     # ------------------------------------------------------
     @staticmethod
-    def __fillRow(row: dict, propertyName: str, cell: Cell, isNumber: bool):
+    @Profiler.timed("excel parse hourly")
+    def parse_hourly(dataFilename: str) -> HourlyReadings:
+        """Parses the hourly export into compact columns. The rows are streamed from the file.
 
-        if cell.value is not None:
-            if isNumber:
-                if type(cell.value) is str:
-                    if len(cell.value.strip()) > 0:
-                        row[propertyName] = float(cell.value.replace(",", "."))
-                else:
-                    row[propertyName] = cell.value
-            else:
-                row[propertyName] = cell.value.strip() if type(cell.value) is str else cell.value
+        The hourly export has the same columns as the daily one, the time period (column B) being the start of
+        the hour: a date time or a 'dd/mm/yyyy HH:MM' text.
+        """
+
+        Logger.debug(f"Loading Excel hourly data file '{dataFilename}'...")
+
+        workbook = load_workbook(filename=dataFilename, read_only=True, data_only=True)
+
+        try:
+            worksheet = workbook.active
+
+            rows = (
+                (ExcelParser.__parseHour(row[0]), *row[1:7], row[7].strip() if type(row[7]) is str else row[7])
+                for row in worksheet.iter_rows(  # type: ignore
+                    min_row=FIRST_DATA_LINE_NUMBER, min_col=FIRST_COLUMN, max_col=LAST_COLUMN, values_only=True
+                )
+                if row[0] is not None
+            )
+
+            res = HourlyReadings.from_rows(rows)
+        finally:
+            workbook.close()
+
+        Logger.debug(f"{len(res)} hourly readings read successfully")
+
+        return res
 
     # ------------------------------------------------------
     @staticmethod
-    def __parseHourly(worksheet: Worksheet) -> list[dict[str, Any]]:  # pylint: disable=unused-argument
-        return []
+    def detect(dataFilename: str) -> tuple[Optional[str], Optional[Frequency]]:
+        """Reads the header of an export: returns its PCE identifier (None if not written in the file) and its
+        frequency (None if the file is not an export or has no data).
+        """
+
+        workbook = load_workbook(filename=dataFilename, read_only=True, data_only=True)
+
+        try:
+            rows = list(workbook.active.iter_rows(max_row=FIRST_DATA_LINE_NUMBER + 1, values_only=True))  # type: ignore
+        finally:
+            workbook.close()
+
+        pceIdentifier = None
+        for row in rows[: HEADER_LINE_NUMBER - 1]:
+            for index, value in enumerate(row):
+                if type(value) is str and value.strip().startswith(PCE_LABEL):
+                    # The identifier follows the label: in the same cell or in the next non empty one.
+                    candidates = [value.split(":", 1)[1] if ":" in value else ""] + [
+                        str(other) for other in row[index + 1 :] if other is not None
+                    ]
+                    pceIdentifier = next((text.strip() for text in candidates if len(text.strip()) > 0), None)
+
+        header: tuple[Any, ...] = rows[HEADER_LINE_NUMBER - 1] if len(rows) >= HEADER_LINE_NUMBER else ()
+        labels = [row[1] for row in rows[HEADER_LINE_NUMBER:] if len(row) > 1 and row[1] is not None]
+
+        if len(header) < 3 or type(header[1]) is not str or not header[1].startswith("Date") or len(labels) == 0:
+            return pceIdentifier, None
+
+        # Daily and hourly exports have the index columns, weekly and monthly ones have not.
+        if str(header[2]).strip().startswith("Index"):
+            if ExcelParser.__isHourly(labels):
+                return pceIdentifier, Frequency.HOURLY
+            return pceIdentifier, Frequency.DAILY
+
+        if str(labels[0]).strip().startswith("Du "):
+            return pceIdentifier, Frequency.WEEKLY
+
+        return pceIdentifier, Frequency.MONTHLY
 
     # ------------------------------------------------------
     @staticmethod
-    def __parseDaily(worksheet: Worksheet) -> list[dict[str, Any]]:
+    def __isHourly(labels: list[Any]) -> bool:
 
-        res = []
+        if not isinstance(labels[0], datetime):
+            return len(str(labels[0]).strip()) > len("dd/mm/yyyy")
 
-        # Timestamp of the data.
-        data_timestamp = datetime.now().isoformat()
+        if len(labels) > 1 and isinstance(labels[1], datetime):
+            return labels[1] - labels[0] < timedelta(days=1)
 
-        minRowNum = FIRST_DATA_LINE_NUMBER
-        maxRowNum = len(worksheet["B"])
-        for rownum in range(minRowNum, maxRowNum + 1):
-            row = dict[str, Any]()
-            if worksheet.cell(column=2, row=rownum).value is not None:
-                ExcelParser.__fillRow(row, PropertyName.TIME_PERIOD.value, worksheet.cell(column=2, row=rownum), False)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.START_INDEX.value, worksheet.cell(column=3, row=rownum), True)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.END_INDEX.value, worksheet.cell(column=4, row=rownum), True)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.VOLUME.value, worksheet.cell(column=5, row=rownum), True)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.ENERGY.value, worksheet.cell(column=6, row=rownum), True)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.CONVERTER_FACTOR.value, worksheet.cell(column=7, row=rownum), True)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.TEMPERATURE.value, worksheet.cell(column=8, row=rownum), True)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.TYPE.value, worksheet.cell(column=9, row=rownum), False)  # type: ignore
-                row[PropertyName.TIMESTAMP.value] = data_timestamp
-                res.append(row)
+        return (labels[0].hour, labels[0].minute) != (0, 0)
 
-        Logger.debug(f"Daily data read successfully between row #{minRowNum} and row #{maxRowNum}")
+    # ------------------------------------------------------
+    @staticmethod
+    def __parseHour(value: Any) -> datetime:
+
+        if isinstance(value, datetime):
+            return value
+
+        text = str(value).strip()
+
+        return datetime.strptime(text[:16], HOURLY_DATE_FORMAT)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __readRows(dataFilename: str) -> list[tuple[Any, ...]]:
+
+        workbook = load_workbook(filename=dataFilename)
+
+        try:
+            worksheet = workbook.active
+
+            maxRowNum = len(worksheet["B"])  # type: ignore
+            res = [
+                tuple(
+                    worksheet.cell(column=column, row=rownum).value  # type: ignore
+                    for column in range(FIRST_COLUMN, LAST_COLUMN + 1)
+                )
+                for rownum in range(FIRST_DATA_LINE_NUMBER, maxRowNum + 1)
+            ]
+        finally:
+            workbook.close()
 
         return res
 
     # ------------------------------------------------------
     @staticmethod
-    def __parseWeekly(worksheet: Worksheet) -> list[dict[str, Any]]:
+    def __fillRow(row: dict, propertyName: str, value: Any, isNumber: bool):
+
+        if value is not None:
+            if isNumber:
+                if type(value) is str:
+                    if len(value.strip()) > 0:
+                        row[propertyName] = float(value.replace(",", "."))
+                else:
+                    row[propertyName] = value
+            else:
+                row[propertyName] = value.strip() if type(value) is str else value
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __parseRows(rows: list[tuple[Any, ...]], columns: list[tuple[str, bool]]) -> list[dict[str, Any]]:
 
         res = []
 
         # Timestamp of the data.
         data_timestamp = datetime.now().isoformat()
 
-        minRowNum = FIRST_DATA_LINE_NUMBER
-        maxRowNum = len(worksheet["B"])
-        for rownum in range(minRowNum, maxRowNum + 1):
+        for values in rows:
             row = dict[str, Any]()
-            if worksheet.cell(column=2, row=rownum).value is not None:
-                ExcelParser.__fillRow(row, PropertyName.TIME_PERIOD.value, worksheet.cell(column=2, row=rownum), False)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.VOLUME.value, worksheet.cell(column=3, row=rownum), True)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.ENERGY.value, worksheet.cell(column=4, row=rownum), True)  # type: ignore
+            if values[0] is not None:
+                for (propertyName, isNumber), value in zip(columns, values):
+                    ExcelParser.__fillRow(row, propertyName, value, isNumber)
                 row[PropertyName.TIMESTAMP.value] = data_timestamp
                 res.append(row)
 
-        Logger.debug(f"Weekly data read successfully between row #{minRowNum} and row #{maxRowNum}")
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __parseDaily(rows: list[tuple[Any, ...]]) -> list[dict[str, Any]]:
+
+        res = ExcelParser.__parseRows(rows, DAILY_COLUMNS)
+
+        Logger.debug(f"Daily data read successfully from row #{FIRST_DATA_LINE_NUMBER}: {len(res)} readings")
 
         return res
 
     # ------------------------------------------------------
     @staticmethod
-    def __parseMonthly(worksheet: Worksheet) -> list[dict[str, Any]]:
+    def __parseWeekly(rows: list[tuple[Any, ...]]) -> list[dict[str, Any]]:
 
-        res = []
+        res = ExcelParser.__parseRows(rows, WEEKLY_COLUMNS)
 
-        # Timestamp of the data.
-        data_timestamp = datetime.now().isoformat()
+        Logger.debug(f"Weekly data read successfully from row #{FIRST_DATA_LINE_NUMBER}: {len(res)} readings")
 
-        minRowNum = FIRST_DATA_LINE_NUMBER
-        maxRowNum = len(worksheet["B"])
-        for rownum in range(minRowNum, maxRowNum + 1):
-            row = dict[str, Any]()
-            if worksheet.cell(column=2, row=rownum).value is not None:
-                ExcelParser.__fillRow(row, PropertyName.TIME_PERIOD.value, worksheet.cell(column=2, row=rownum), False)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.VOLUME.value, worksheet.cell(column=3, row=rownum), True)  # type: ignore
-                ExcelParser.__fillRow(row, PropertyName.ENERGY.value, worksheet.cell(column=4, row=rownum), True)  # type: ignore
-                row[PropertyName.TIMESTAMP.value] = data_timestamp
-                res.append(row)
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __parseMonthly(rows: list[tuple[Any, ...]]) -> list[dict[str, Any]]:
+
+        res = ExcelParser.__parseRows(rows, MONTHLY_COLUMNS)
 
-        Logger.debug(f"Monthly data read successfully between row #{minRowNum} and row #{maxRowNum}")
+        Logger.debug(f"Monthly data read successfully from row #{FIRST_DATA_LINE_NUMBER}: {len(res)} readings")
 
         return res
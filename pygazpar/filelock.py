@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # type: ignore
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FileLock:
+    """Exclusive lock of an open file, shared between processes: flock() on POSIX, msvcrt.locking() (on the first
+    byte) on Windows.
+    """
+
+    # ------------------------------------------------------
+    @staticmethod
+    def check_supported():
+        """Raises a RuntimeError if file locks are not supported on this platform."""
+
+        if fcntl is None and msvcrt is None:
+            raise RuntimeError("File locks are not supported on this platform")
+
+    # ------------------------------------------------------
+    @staticmethod
+    @contextmanager
+    def locked(file: IO[bytes]) -> Iterator[None]:
+        """Holds the lock of the file for the duration of the block (waiting for the other processes to release it)."""
+
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)  # type: ignore
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)  # type: ignore
@@ -0,0 +1,222 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from typing import Optional
+
+from pygazpar.client import DEFAULT_LAST_N_DAYS, Client
+from pygazpar.datasource import JsonWebDataSource, MeterReadingsByFrequency
+from pygazpar.enum import Frequency
+
+DEFAULT_MAX_WORKERS = 8
+
+DEFAULT_MAX_CONCURRENCY_PER_ACCOUNT = 2
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FleetError(Exception):
+
+    # ------------------------------------------------------
+    def __init__(self, errors: dict[str, Exception], results: dict[str, MeterReadingsByFrequency]):
+        super().__init__(f"{len(errors)} PCE(s) failed to load: {', '.join(sorted(errors))}")
+        self.errors = errors
+        self.results = results
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FleetClient:
+    """Loads the meter readings of many PCEs spread over many GrDF accounts.
+
+    Each account has its own Client. The loads are queued by account and dispatched in round robin,
+    so that an account with many PCEs does not starve the others, and with at most
+    max_concurrency_per_account loads running at the same time on an account.
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        clients: dict[str, Client],
+        max_concurrency_per_account: int = DEFAULT_MAX_CONCURRENCY_PER_ACCOUNT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+
+        if max_concurrency_per_account < 1:
+            raise ValueError(
+                f"Invalid max_concurrency_per_account: {max_concurrency_per_account} (at least 1 expected)"
+            )
+        if max_workers < 1:
+            raise ValueError(f"Invalid max_workers: {max_workers} (at least 1 expected)")
+
+        self.__clients = clients
+        self.__maxConcurrencyPerAccount = max_concurrency_per_account
+        self.__maxWorkers = max_workers
+        self.__lock = threading.Lock()
+        self.__accountByPce: Optional[dict[str, str]] = None
+
+    # ------------------------------------------------------
+    @staticmethod
+    def from_credentials(
+        credentials: dict[str, str],
+        max_concurrency_per_account: int = DEFAULT_MAX_CONCURRENCY_PER_ACCOUNT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> "FleetClient":
+        """Creates a FleetClient from a dictionary of passwords by username."""
+
+        clients = {
+            username: Client(
+                JsonWebDataSource(username, password, threadSafe=True, poolSize=max_concurrency_per_account)
+            )
+            for username, password in credentials.items()
+        }
+
+        return FleetClient(clients, max_concurrency_per_account, max_workers)
+
+    # ------------------------------------------------------
+    @property
+    def accounts(self) -> list[str]:
+
+        return list(self.__clients)
+
+    # ------------------------------------------------------
+    def client(self, account: str) -> Client:
+
+        return self.__clients[account]
+
+    # ------------------------------------------------------
+    def login(self):
+
+        for client in self.__clients.values():
+            client.login()
+
+    # ------------------------------------------------------
+    def logout(self):
+
+        for client in self.__clients.values():
+            client.logout()
+
+        with self.__lock:
+            self.__accountByPce = None
+
+    # ------------------------------------------------------
+    def get_pce_identifiers(self, refresh: bool = False) -> dict[str, str]:
+        """Returns the account of each PCE. The mapping is cached until refresh is requested."""
+
+        with self.__lock:
+            if self.__accountByPce is not None and not refresh:
+                return dict(self.__accountByPce)
+
+        accountByPce = dict[str, str]()
+
+        with ThreadPoolExecutor(max_workers=min(self.__maxWorkers, max(len(self.__clients), 1))) as executor:
+            futures = {
+                account: executor.submit(client.get_pce_identifiers) for account, client in self.__clients.items()
+            }
+            for account, future in futures.items():
+                for pce_identifier in future.result():
+                    accountByPce.setdefault(pce_identifier, account)
+
+        with self.__lock:
+            self.__accountByPce = accountByPce
+
+        return dict(accountByPce)
+
+    # ------------------------------------------------------
+    def account_of(self, pce_identifier: str) -> str:
+
+        accountByPce = self.get_pce_identifiers()
+
+        if pce_identifier not in accountByPce:
+            # The PCE may have been added to an account since the mapping has been cached.
+            accountByPce = self.get_pce_identifiers(refresh=True)
+
+        if pce_identifier not in accountByPce:
+            raise ValueError(f"PCE '{pce_identifier}' not found in any account")
+
+        return accountByPce[pce_identifier]
+
+    # ------------------------------------------------------
+    def load_since(
+        self,
+        pce_identifiers: Optional[list[str]] = None,
+        last_n_days: int = DEFAULT_LAST_N_DAYS,
+        frequencies: Optional[list[Frequency]] = None,
+    ) -> dict[str, MeterReadingsByFrequency]:
+
+        end_date = date.today()
+        start_date = end_date + timedelta(days=-last_n_days)
+
+        return self.load_date_range(pce_identifiers, start_date, end_date, frequencies)
+
+    # ------------------------------------------------------
+    def load_date_range(  # pylint: disable=too-many-locals
+        self,
+        pce_identifiers: Optional[list[str]],
+        start_date: date,
+        end_date: date,
+        frequencies: Optional[list[Frequency]] = None,
+    ) -> dict[str, MeterReadingsByFrequency]:
+        """Loads the given PCEs (all the PCEs of all the accounts if None) and returns their readings by PCE.
+
+        Raises a FleetError holding the errors and the partial results if any PCE fails to load.
+        """
+
+        if pce_identifiers is None:
+            pce_identifiers = list(self.get_pce_identifiers())
+
+        # Queue the PCEs by account.
+        queues = dict[str, deque[str]]()
+        for pce_identifier in dict.fromkeys(pce_identifiers):
+            queues.setdefault(self.account_of(pce_identifier), deque()).append(pce_identifier)
+
+        # Accounts having PCEs to load, in round robin order.
+        rotation = deque(queues)
+        running = {account: 0 for account in queues}
+
+        results = dict[str, MeterReadingsByFrequency]()
+        errors = dict[str, Exception]()
+        futures = dict[Future, tuple[str, str]]()
+
+        Logger.debug(f"Loading {len(pce_identifiers)} PCEs from {len(queues)} accounts...")
+
+        with ThreadPoolExecutor(max_workers=self.__maxWorkers) as executor:
+            while len(rotation) > 0 or len(futures) > 0:
+
+                # Dispatch one PCE per account in turn, skipping the accounts at their concurrency limit.
+                skipped = 0
+                while len(rotation) > 0 and len(futures) < self.__maxWorkers and skipped < len(rotation):
+                    account = rotation.popleft()
+
+                    if running[account] >= self.__maxConcurrencyPerAccount:
+                        rotation.append(account)
+                        skipped += 1
+                        continue
+
+                    pce_identifier = queues[account].popleft()
+                    future = executor.submit(
+                        self.__clients[account].load_date_range, pce_identifier, start_date, end_date, frequencies
+                    )
+                    futures[future] = (account, pce_identifier)
+                    running[account] += 1
+                    skipped = 0
+
+                    if len(queues[account]) > 0:
+                        rotation.append(account)
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    account, pce_identifier = futures.pop(future)
+                    running[account] -= 1
+                    try:
+                        results[pce_identifier] = future.result()
+                    except Exception as exception:  # pylint: disable=broad-exception-caught
+                        Logger.error(f"An error occurred while loading PCE '{pce_identifier}' of account '{account}'")
+                        errors[pce_identifier] = exception
+
+        if len(errors) > 0:
+            raise FleetError(errors, results)
+
+        return results
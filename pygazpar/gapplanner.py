@@ -0,0 +1,150 @@
+import logging
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from pygazpar.datasource import IDataSource, MeterReadings
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.timeperiod import TimePeriod
+
+# Two gaps separated by at most this number of days are fetched with a single request.
+DEFAULT_MAX_GAP_DAYS = 7
+
+# Large date ranges may end with HTTP 500 errors.
+DEFAULT_MAX_WINDOW_DAYS = 365
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class GapPlanner:
+    """Finds the missing and inconsistent gas days of a daily history and plans the minimal set of
+    date windows to fetch again.
+    """
+
+    # ------------------------------------------------------
+    @staticmethod
+    def find_missing_days(daily: MeterReadings, start_date: date, end_date: date) -> list[date]:
+
+        present = {TimePeriod.parse_day(reading[PropertyName.TIME_PERIOD.value]) for reading in daily}
+
+        res = []
+
+        day = start_date
+        while day <= end_date:
+            if day not in present:
+                res.append(day)
+            day += timedelta(days=1)
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def find_inconsistent_days(daily: MeterReadings) -> list[date]:
+        """Returns the days whose start index differs from the end index of the day before (both days are returned)."""
+
+        res = set[date]()
+
+        previousDay: Optional[date] = None
+        previousEndIndex: Any = None
+
+        dated = [(TimePeriod.parse_day(reading[PropertyName.TIME_PERIOD.value]), reading) for reading in daily]
+
+        for day, reading in sorted(dated, key=lambda item: item[0]):
+            startIndex = reading.get(PropertyName.START_INDEX.value)
+            if (
+                previousDay is not None
+                and day - previousDay == timedelta(days=1)
+                and startIndex is not None
+                and previousEndIndex is not None
+                and startIndex != previousEndIndex
+            ):
+                res.add(previousDay)
+                res.add(day)
+
+            previousDay = day
+            previousEndIndex = reading.get(PropertyName.END_INDEX.value)
+
+        return sorted(res)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def plan(
+        days: list[date], max_gap_days: int = DEFAULT_MAX_GAP_DAYS, max_window_days: int = DEFAULT_MAX_WINDOW_DAYS
+    ) -> list[tuple[date, date]]:
+        """Merges the given days into the smallest set of [start, end] windows (both inclusive).
+
+        Two days separated by at most max_gap_days days fall in the same window, and no window is larger than
+        max_window_days.
+        """
+
+        res: list[tuple[date, date]] = []
+
+        for day in sorted(set(days)):
+            if len(res) > 0:
+                start, end = res[-1]
+                if (day - end).days - 1 <= max_gap_days and (day - start).days < max_window_days:
+                    res[-1] = (start, day)
+                    continue
+            res.append((day, day))
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def plan_repair(
+        daily: MeterReadings,
+        start_date: date,
+        end_date: date,
+        max_gap_days: int = DEFAULT_MAX_GAP_DAYS,
+        max_window_days: int = DEFAULT_MAX_WINDOW_DAYS,
+    ) -> list[tuple[date, date]]:
+
+        days = GapPlanner.find_missing_days(daily, start_date, end_date) + GapPlanner.find_inconsistent_days(daily)
+
+        res = GapPlanner.plan(days, max_gap_days, max_window_days)
+
+        Logger.debug(f"{len(days)} days to repair between {start_date} and {end_date} in {len(res)} windows: {res}")
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def repair(
+        dataSource: IDataSource,
+        pce_identifier: str,
+        daily: MeterReadings,
+        start_date: date,
+        end_date: date,
+        max_gap_days: int = DEFAULT_MAX_GAP_DAYS,
+        max_window_days: int = DEFAULT_MAX_WINDOW_DAYS,
+    ) -> MeterReadings:
+        """Fetches again the planned windows and merges them with the given daily history.
+
+        Returns the repaired history sorted by date.
+        """
+
+        byDate = {TimePeriod.parse_day(reading[PropertyName.TIME_PERIOD.value]): reading for reading in daily}
+
+        for windowStart, windowEnd in GapPlanner.plan_repair(
+            daily, start_date, end_date, max_gap_days, max_window_days
+        ):
+            data = dataSource.load(pce_identifier, windowStart, windowEnd, [Frequency.DAILY])
+
+            for reading in data.get(Frequency.DAILY.value, []):
+                day = TimePeriod.parse_day(reading[PropertyName.TIME_PERIOD.value])
+                if day < windowStart or day > windowEnd:
+                    continue
+
+                previous = byDate.get(day)
+                if (
+                    previous is not None
+                    and reading.get(PropertyName.TEMPERATURE.value) is None
+                    and previous.get(PropertyName.TEMPERATURE.value) is not None
+                ):
+                    # Temperatures are not always available: keep the known one.
+                    reading = dict(reading)
+                    reading[PropertyName.TEMPERATURE.value] = previous[PropertyName.TEMPERATURE.value]
+
+                byDate[day] = reading
+
+        return [byDate[day] for day in sorted(byDate)]
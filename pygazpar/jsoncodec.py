@@ -0,0 +1,93 @@
+import json
+import logging
+from typing import Any, Optional, Union
+
+from pygazpar.profiler import Profiler
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+try:
+    import msgspec  # type: ignore
+except ImportError:
+    msgspec = None
+
+# Backends by order of preference: msgspec is able to decode straight into typed structs.
+BACKENDS = ["msgspec", "orjson", "json"]
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class JsonCodec:
+    """JSON decoding and encoding with the fastest installed backend: msgspec or orjson, otherwise the standard
+    library.
+    """
+
+    __backend: str = "json"
+
+    # ------------------------------------------------------
+    @staticmethod
+    def available_backends() -> list[str]:
+
+        installed = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+
+        return [backend for backend in BACKENDS if installed[backend]]
+
+    # ------------------------------------------------------
+    @staticmethod
+    def backend() -> str:
+
+        return JsonCodec.__backend
+
+    # ------------------------------------------------------
+    @staticmethod
+    def set_backend(backend: Optional[str] = None):
+        """Selects the given backend, or the fastest installed one if None."""
+
+        available = JsonCodec.available_backends()
+
+        if backend is None:
+            backend = available[0]
+        elif backend not in available:
+            raise ValueError(f"JSON backend '{backend}' is not available (available backends: {available})")
+
+        JsonCodec.__backend = backend
+
+        Logger.debug(f"JSON backend: {backend}")
+
+    # ------------------------------------------------------
+    @staticmethod
+    @Profiler.timed("json decode")
+    def loads(data: Union[str, bytes], type: Any = None) -> Any:  # pylint: disable=redefined-builtin
+        """Decodes the JSON document. If a type is given and msgspec is the backend, the document is decoded
+        and validated straight into this type (a msgspec Struct for instance).
+        """
+
+        if JsonCodec.__backend == "msgspec":
+            if type is not None:
+                return msgspec.json.decode(data, type=type)
+            return msgspec.json.decode(data)
+
+        if JsonCodec.__backend == "orjson":
+            return orjson.loads(data)
+
+        return json.loads(data)
+
+    # ------------------------------------------------------
+    @staticmethod
+    @Profiler.timed("json encode")
+    def dumps(obj: Any) -> str:
+
+        if JsonCodec.__backend == "msgspec":
+            return msgspec.json.encode(obj).decode("utf-8")
+
+        if JsonCodec.__backend == "orjson":
+            return orjson.dumps(obj).decode("utf-8")
+
+        return json.dumps(obj)
+
+
+JsonCodec.set_backend()
@@ -1,53 +1,232 @@
-import json
+import codecs
 import logging
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timedelta
+from operator import attrgetter, itemgetter
+from typing import Any, Iterable, Iterator, Optional, Union
 
 from pygazpar.enum import PropertyName
+from pygazpar.jsoncodec import JsonCodec, msgspec
+from pygazpar.jsonstream import ReleveScanner
+from pygazpar.profiler import Profiler
 
 INPUT_DATE_FORMAT = "%Y-%m-%d"
 
 OUTPUT_DATE_FORMAT = "%d/%m/%Y"
 
+# Fields of a 'releve' used to build a daily reading.
+RELEVE_FIELDS = (
+    "journeeGaziere",
+    "indexDebut",
+    "indexFin",
+    "volumeBrutConsomme",
+    "energieConsomme",
+    "coeffConversion",
+    "temperature",
+    "qualificationReleve",
+)
+
+# Fields of a published 'releve' (a billing period) used to build a billing reading.
+PUBLISHED_RELEVE_FIELDS = (
+    "dateDebutReleve",
+    "dateFinReleve",
+    "indexDebut",
+    "indexFin",
+    "volumeBrutConsomme",
+    "energieConsomme",
+    "coeffConversion",
+    "qualificationReleve",
+)
+
 Logger = logging.getLogger(__name__)
 
 
+if msgspec is not None:
+
+    # ------------------------------------------------------------------------------------------------------------
+    class Releve(msgspec.Struct):  # pylint: disable=too-few-public-methods
+        journeeGaziere: str
+        indexDebut: Any = None
+        indexFin: Any = None
+        volumeBrutConsomme: Any = None
+        energieConsomme: Any = None
+        coeffConversion: Any = None
+        temperature: Any = None
+        qualificationReleve: Any = None
+
+    # ------------------------------------------------------------------------------------------------------------
+    class PceConsumption(msgspec.Struct):  # pylint: disable=too-few-public-methods
+        releves: list[Releve] = msgspec.field(default_factory=list)
+
+
 # ------------------------------------------------------------------------------------------------------------
 class JsonParser:  # pylint: disable=too-few-public-methods
 
     # ------------------------------------------------------
     @staticmethod
-    def parse(jsonStr: str, temperaturesStr: str, pceIdentifier: str) -> list[dict[str, Any]]:
+    def parse(
+        jsonStr: Union[str, bytes], temperaturesStr: Union[str, bytes], pceIdentifier: str
+    ) -> list[dict[str, Any]]:
 
-        res = []
+        temperatures = JsonCodec.loads(temperaturesStr)
+
+        if JsonCodec.backend() == "msgspec":
+            # The releves are decoded straight into structs: the other fields are skipped. PceConsumption is
+            # defined whenever msgspec is the backend.
+            consumptions = JsonCodec.loads(
+                jsonStr, type=dict[str, PceConsumption]  # pylint: disable=possibly-used-before-assignment
+            )
+            return JsonParser.__parseReleves(
+                consumptions[pceIdentifier].releves, temperatures, attrgetter(*RELEVE_FIELDS)
+            )
+
+        data = JsonCodec.loads(jsonStr)
+
+        return JsonParser.parse_data(data, temperatures, pceIdentifier)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def parse_data(
+        data: dict[str, Any], temperatures: Optional[dict[str, Any]], pceIdentifier: str
+    ) -> list[dict[str, Any]]:
+        """Same as parse() with the already decoded consumption and temperature documents."""
+
+        return JsonParser.__parseReleves(data[pceIdentifier]["releves"], temperatures, itemgetter(*RELEVE_FIELDS))
 
-        data = json.loads(jsonStr)
+    # ------------------------------------------------------
+    @staticmethod
+    def parse_published(jsonStr: Union[str, bytes], pceIdentifier: str) -> list[dict[str, Any]]:
 
-        temperatures = json.loads(temperaturesStr)
+        return JsonParser.parse_published_data(JsonCodec.loads(jsonStr), pceIdentifier)
+
+    # ------------------------------------------------------
+    @staticmethod
+    @Profiler.timed("json parse published")
+    def parse_published_data(data: dict[str, Any], pceIdentifier: str) -> list[dict[str, Any]]:
+        """Parses the published consumption: one reading per billing period, whose time period is
+        'Du dd/mm/yyyy au dd/mm/yyyy' with the first and the last gas days of the period.
+        """
 
         # Timestamp of the data.
         data_timestamp = datetime.now().isoformat()
 
+        fields = itemgetter(*PUBLISHED_RELEVE_FIELDS)
+
+        res = []
         for releve in data[pceIdentifier]["releves"]:
-            temperature = releve["temperature"]
-            if temperature is None and temperatures is not None and len(temperatures) > 0:
-                temperature = temperatures.get(releve["journeeGaziere"])
+            dateDebut, dateFin, indexDebut, indexFin, volume, energie, coeff, qualification = fields(releve)
+
+            # The period ends at the start of its last day + 1 (06:00, the start of a gas day).
+            firstDay = datetime.strptime(dateDebut[:10], INPUT_DATE_FORMAT)
+            lastDay = datetime.strptime(dateFin[:10], INPUT_DATE_FORMAT) - timedelta(days=1)
 
-            item = {}
-            item[PropertyName.TIME_PERIOD.value] = datetime.strftime(
-                datetime.strptime(releve["journeeGaziere"], INPUT_DATE_FORMAT), OUTPUT_DATE_FORMAT
+            reading = {}
+            reading[PropertyName.TIME_PERIOD.value] = (
+                f"Du {firstDay.strftime(OUTPUT_DATE_FORMAT)} au {lastDay.strftime(OUTPUT_DATE_FORMAT)}"
             )
-            item[PropertyName.START_INDEX.value] = releve["indexDebut"]
-            item[PropertyName.END_INDEX.value] = releve["indexFin"]
-            item[PropertyName.VOLUME.value] = releve["volumeBrutConsomme"]
-            item[PropertyName.ENERGY.value] = releve["energieConsomme"]
-            item[PropertyName.CONVERTER_FACTOR.value] = releve["coeffConversion"]
-            item[PropertyName.TEMPERATURE.value] = temperature
-            item[PropertyName.TYPE.value] = releve["qualificationReleve"]
-            item[PropertyName.TIMESTAMP.value] = data_timestamp
+            reading[PropertyName.START_INDEX.value] = indexDebut
+            reading[PropertyName.END_INDEX.value] = indexFin
+            reading[PropertyName.VOLUME.value] = volume
+            reading[PropertyName.ENERGY.value] = energie
+            reading[PropertyName.CONVERTER_FACTOR.value] = coeff
+            reading[PropertyName.TYPE.value] = qualification
+            reading[PropertyName.TIMESTAMP.value] = data_timestamp
+            res.append(reading)
+
+        Logger.debug("Published data read successfully from Json")
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def iter_parse(
+        chunks: Iterable[Union[str, bytes]], temperatures: Optional[dict[str, Any]], pceIdentifier: str
+    ) -> Iterator[dict[str, Any]]:
+        """Streaming version of parse(): the consumption document is read by chunks (of a file or of an HTTP
+        response body) and the daily readings are yielded one by one, as soon as their releve is complete.
+        """
+
+        # Timestamp of the data.
+        data_timestamp = datetime.now().isoformat()
+
+        hasTemperatures = temperatures is not None and len(temperatures) > 0
+        fields = itemgetter(*RELEVE_FIELDS)
+
+        for releve in JsonParser.iter_releves(chunks, pceIdentifier):
+            yield JsonParser.__toReading(fields(releve), temperatures if hasTemperatures else None, data_timestamp)
+
+        Logger.debug("Daily data streamed successfully from Json")
+
+    # ------------------------------------------------------
+    @staticmethod
+    def iter_releves(chunks: Iterable[Union[str, bytes]], pceIdentifier: str) -> Iterator[dict[str, Any]]:
+        """Yields the raw releves of the PCE from the chunks of a consumption document."""
+
+        scanner = ReleveScanner()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+
+        for chunk in chunks:
+            text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            for pce, releve in scanner.feed(text):
+                if pce == pceIdentifier:
+                    yield releve
+
+        for pce, releve in scanner.close():
+            if pce == pceIdentifier:
+                yield releve
+
+        if pceIdentifier not in scanner.pce_identifiers:
+            raise KeyError(pceIdentifier)
+
+    # ------------------------------------------------------
+    @staticmethod
+    @Profiler.timed("json parse")
+    def __parseReleves(releves: list[Any], temperatures: Optional[dict[str, Any]], fields) -> list[dict[str, Any]]:
 
-            res.append(item)
+        # Timestamp of the data.
+        data_timestamp = datetime.now().isoformat()
+
+        if temperatures is not None and len(temperatures) == 0:
+            temperatures = None
+
+        res = [JsonParser.__toReading(fields(releve), temperatures, data_timestamp) for releve in releves]
 
         Logger.debug("Daily data read successfully from Json")
 
         return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __toReading(values: tuple, temperatures: Optional[dict[str, Any]], data_timestamp: str) -> dict[str, Any]:
+
+        journee, indexDebut, indexFin, volume, energie, coeff, temperature, qualification = values
+
+        if temperature is None and temperatures is not None:
+            temperature = temperatures.get(journee)
+
+        res = {}
+        res[PropertyName.TIME_PERIOD.value] = JsonParser.__formatDate(journee)
+        res[PropertyName.START_INDEX.value] = indexDebut
+        res[PropertyName.END_INDEX.value] = indexFin
+        res[PropertyName.VOLUME.value] = volume
+        res[PropertyName.ENERGY.value] = energie
+        res[PropertyName.CONVERTER_FACTOR.value] = coeff
+        res[PropertyName.TEMPERATURE.value] = temperature
+        res[PropertyName.TYPE.value] = qualification
+        res[PropertyName.TIMESTAMP.value] = data_timestamp
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __formatDate(journeeGaziere: str) -> str:
+
+        # Fast path for the usual 'yyyy-mm-dd' dates: strptime() is a large share of the parsing time.
+        if (
+            len(journeeGaziere) == 10
+            and journeeGaziere[4] == "-"
+            and journeeGaziere[7] == "-"
+            and journeeGaziere.replace("-", "").isdigit()
+        ):
+            return f"{journeeGaziere[8:10]}/{journeeGaziere[5:7]}/{journeeGaziere[0:4]}"
+
+        return datetime.strftime(datetime.strptime(journeeGaziere, INPUT_DATE_FORMAT), OUTPUT_DATE_FORMAT)
@@ -0,0 +1,150 @@
+import logging
+import re
+from typing import Any, Iterator, Optional
+
+from pygazpar.jsoncodec import JsonCodec
+
+# Whitespaces between the tokens.
+WHITESPACES = re.compile(r"\s*")
+
+# A complete string, a structural character or a scalar (number, true, false, null).
+TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]:,]|[^\s{}\[\]:,"]+')
+
+# Anything but braces (complete strings included) inside a releve.
+RELEVE_CONTENT = re.compile(r'(?:[^"{}]+|"(?:[^"\\]|\\.)*")*')
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _Container:  # pylint: disable=too-few-public-methods
+
+    __slots__ = ("kind", "key", "expect_key")
+
+    # ------------------------------------------------------
+    def __init__(self, kind: str):
+
+        self.kind = kind
+        self.key: Optional[str] = None
+        self.expect_key = kind == "{"
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ReleveScanner:
+    """Incremental scanner of a consumption document: {"<pce>": {..., "releves": [{...}, ...]}, ...}.
+
+    The document is fed by chunks of text and the releves are returned one by one with their PCE identifier,
+    as soon as they are complete. Only the releve being read is kept in memory, besides the current chunk.
+    """
+
+    # ------------------------------------------------------
+    def __init__(self):
+
+        self.__buffer = ""
+        self.__pos = 0
+        self.__containers = list[_Container]()
+        self.__pce_identifiers = list[str]()
+
+        # Start offset and brace depth of the releve being read (-1 if none).
+        self.__releveStart = -1
+        self.__releveDepth = 0
+
+    # ------------------------------------------------------
+    @property
+    def pce_identifiers(self) -> list[str]:
+        """PCE identifiers met so far."""
+
+        return self.__pce_identifiers
+
+    # ------------------------------------------------------
+    def feed(self, chunk: str) -> Iterator[tuple[str, dict[str, Any]]]:
+
+        # Drop the text already consumed.
+        cut = self.__releveStart if self.__releveStart >= 0 else self.__pos
+        self.__buffer = self.__buffer[cut:] + chunk
+        self.__pos -= cut
+        self.__releveStart = min(self.__releveStart, 0)
+
+        return self.__scan(final=False)
+
+    # ------------------------------------------------------
+    def close(self) -> Iterator[tuple[str, dict[str, Any]]]:
+
+        yield from self.__scan(final=True)
+
+        if self.__releveStart >= 0 or len(self.__containers) > 0:
+            raise ValueError("Truncated JSON document")
+
+    # ------------------------------------------------------
+    def __scan(  # pylint: disable=too-many-branches,too-many-statements
+        self, final: bool
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+
+        buffer = self.__buffer
+        containers = self.__containers
+
+        while True:
+            pos = self.__pos
+
+            if self.__releveStart >= 0:
+                # Inside a releve, only the braces matter to find its end.
+                pos = RELEVE_CONTENT.match(buffer, pos).end()  # type: ignore
+                if pos >= len(buffer) or buffer[pos] == '"':
+                    # Incomplete: wait for the next chunk.
+                    break
+
+                self.__pos = pos + 1
+                if buffer[pos] == "{":
+                    self.__releveDepth += 1
+                    continue
+
+                self.__releveDepth -= 1
+                if self.__releveDepth == 0:
+                    text = buffer[self.__releveStart : self.__pos]
+                    self.__releveStart = -1
+                    yield str(containers[0].key), JsonCodec.loads(text)
+                continue
+
+            pos = WHITESPACES.match(buffer, pos).end()  # type: ignore
+            self.__pos = pos
+            if pos >= len(buffer):
+                break
+
+            match = TOKEN.match(buffer, pos)
+            if match is None:
+                if final:
+                    raise ValueError(f"Invalid JSON document at offset {pos}: '{buffer[pos:pos + 20]}'")
+                break
+
+            token = match.group()
+            if match.end() == len(buffer) and not final and token[0] not in '{}[]:,"':
+                # A scalar may continue in the next chunk.
+                break
+
+            self.__pos = match.end()
+
+            if token == "{":
+                if (
+                    len(containers) == 3
+                    and containers[2].kind == "["
+                    and containers[1].key == "releves"
+                    and containers[0].kind == "{"
+                ):
+                    self.__releveStart = pos
+                    self.__releveDepth = 1
+                else:
+                    containers.append(_Container("{"))
+            elif token == "[":
+                containers.append(_Container("["))
+            elif token in ("}", "]"):
+                if len(containers) == 0:
+                    raise ValueError(f"Invalid JSON document at offset {pos}: unexpected '{token}'")
+                containers.pop()
+            elif token == ",":
+                if len(containers) > 0 and containers[-1].kind == "{":
+                    containers[-1].expect_key = True
+            elif token[0] == '"' and len(containers) > 0 and containers[-1].expect_key:
+                containers[-1].key = JsonCodec.loads(token)
+                containers[-1].expect_key = False
+                if len(containers) == 1:
+                    self.__pce_identifiers.append(str(containers[0].key))
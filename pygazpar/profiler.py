@@ -0,0 +1,259 @@
+import cProfile
+import functools
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+@dataclass
+class StageStats:
+    """Wall-clock time and allocation peak of a stage, summed over its calls."""
+
+    name: str
+    calls: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    # Highest memory allocated during one call, above the memory allocated at its start (in bytes).
+    peak_memory: int = 0
+
+
+# ------------------------------------------------------------------------------------------------------------
+@dataclass
+class _Frame:
+
+    name: str
+    start: float
+    startMemory: int
+    peakMemory: int
+
+
+# ------------------------------------------------------------------------------------------------------------
+class Profiler:
+    """Records the wall-clock time and the allocation peak of the stages of a run (login, HTTP calls, parsing,
+    frequency conversions, serialisation...).
+
+    The stages are recorded while the profiler is active (see activate()) in the current context: the threads
+    started by a pool run in a context of their own and are not recorded. The allocation peaks are tracked with
+    tracemalloc, the call stacks with cProfile when withCProfile is set.
+    """
+
+    __current: ContextVar[Optional["Profiler"]] = ContextVar("pygazpar_profiler", default=None)
+
+    __frames: ContextVar[tuple[_Frame, ...]] = ContextVar("pygazpar_profiler_frames", default=())
+
+    # ------------------------------------------------------
+    def __init__(self, traceMemory: bool = True, withCProfile: bool = False):
+
+        self.__traceMemory = traceMemory
+        self.__cProfile = cProfile.Profile() if withCProfile else None
+        self.__stats = dict[str, StageStats]()
+        # Speedscope events by thread: (open/close, stage name, time).
+        self.__events = dict[int, list[tuple[str, str, float]]]()
+        self.__origin = time.perf_counter()
+        self.__lock = threading.Lock()
+        self.__depth = 0
+        self.__startedTracemalloc = False
+
+    # ------------------------------------------------------
+    @staticmethod
+    def current() -> Optional["Profiler"]:
+        """Returns the profiler active in the current context, if any."""
+
+        return Profiler.__current.get()
+
+    # ------------------------------------------------------
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        """Makes the profiler the active one in the current context. It may be activated again while active."""
+
+        token = Profiler.__current.set(self)
+
+        with self.__lock:
+            self.__depth += 1
+            if self.__depth == 1:
+                if self.__traceMemory and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self.__startedTracemalloc = True
+                if self.__cProfile is not None:
+                    self.__cProfile.enable()
+
+        try:
+            yield self
+        finally:
+            with self.__lock:
+                self.__depth -= 1
+                if self.__depth == 0:
+                    if self.__cProfile is not None:
+                        self.__cProfile.disable()
+                    if self.__startedTracemalloc:
+                        tracemalloc.stop()
+                        self.__startedTracemalloc = False
+
+            Profiler.__current.reset(token)
+
+    # ------------------------------------------------------
+    @staticmethod
+    @contextmanager
+    def stage(name: str) -> Iterator[None]:
+        """Records the time spent in the block under the given stage name. Does nothing without an active profiler."""
+
+        profiler = Profiler.__current.get()
+        if profiler is None:
+            yield
+            return
+
+        frames = Profiler.__frames.get()
+
+        tracing = tracemalloc.is_tracing()
+        memory = 0
+        if tracing:
+            memory, peak = tracemalloc.get_traced_memory()
+            # The peak is reset for the new stage: the enclosing one keeps the peak reached so far.
+            if len(frames) > 0:
+                frames[-1].peakMemory = max(frames[-1].peakMemory, peak)
+            tracemalloc.reset_peak()
+
+        frame = _Frame(name, time.perf_counter(), memory, memory)
+        Profiler.__event(profiler, "O", name, frame.start)
+
+        token = Profiler.__frames.set(frames + (frame,))
+        try:
+            yield
+        finally:
+            Profiler.__frames.reset(token)
+
+            end = time.perf_counter()
+            Profiler.__event(profiler, "C", name, end)
+
+            peakMemory = 0
+            if tracing and tracemalloc.is_tracing():
+                frame.peakMemory = max(frame.peakMemory, tracemalloc.get_traced_memory()[1])
+                peakMemory = frame.peakMemory - frame.startMemory
+
+            Profiler.__record(profiler, name, end - frame.start, peakMemory)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """Decorator recording each call of the function as a stage."""
+
+        def decorator(func: Callable[..., T]) -> Callable[..., T]:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs) -> T:
+
+                # Inactive: the cost of a context variable lookup.
+                if Profiler.__current.get() is None:
+                    return func(*args, **kwargs)
+
+                with Profiler.stage(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    # ------------------------------------------------------
+    @property
+    def stages(self) -> list[StageStats]:
+        """The stages in the order their first call ended."""
+
+        with self.__lock:
+            return [StageStats(**vars(stats)) for stats in self.__stats.values()]
+
+    # ------------------------------------------------------
+    def summary(self) -> str:
+        """Returns the stages as a text table, the most expensive first."""
+
+        stages = sorted(self.stages, key=lambda stats: stats.total, reverse=True)
+
+        width = max([len("Stage")] + [len(stats.name) for stats in stages])
+
+        lines = [f"{'Stage':<{width}}  {'Calls':>6}  {'Total (ms)':>11}  {'Max (ms)':>10}  {'Peak (KiB)':>11}"]
+        lines.append("-" * len(lines[0]))
+        for stats in stages:
+            lines.append(
+                f"{stats.name:<{width}}  {stats.calls:>6}  {stats.total * 1000:>11.1f}  {stats.max * 1000:>10.1f}"
+                f"  {stats.peak_memory / 1024:>11.1f}"
+            )
+
+        return "\n".join(lines)
+
+    # ------------------------------------------------------
+    def dump_stats(self, filename: str):
+        """Writes the cProfile statistics to a pstats file (the profiler must be created withCProfile)."""
+
+        if self.__cProfile is None:
+            raise ValueError("The profiler has been created without cProfile")
+
+        self.__cProfile.dump_stats(filename)
+
+    # ------------------------------------------------------
+    def dump_speedscope(self, filename: str):
+        """Writes the stages as an evented profile per thread, viewable with https://www.speedscope.app."""
+
+        with self.__lock:
+            events = {thread: list(threadEvents) for thread, threadEvents in self.__events.items()}
+
+        frames = dict[str, int]()
+        profiles = list[dict[str, Any]]()
+        for thread, threadEvents in events.items():
+            profiles.append(
+                {
+                    "type": "evented",
+                    "name": f"Thread {thread}",
+                    "unit": "milliseconds",
+                    "startValue": threadEvents[0][2],
+                    "endValue": threadEvents[-1][2],
+                    "events": [
+                        {"type": eventType, "frame": frames.setdefault(name, len(frames)), "at": at}
+                        for eventType, name, at in threadEvents
+                    ],
+                }
+            )
+
+        document = {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": "PyGazpar",
+            "exporter": "pygazpar",
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": profiles,
+        }
+
+        with open(filename, mode="w", encoding="utf-8") as speedscopeFile:
+            json.dump(document, speedscopeFile)
+
+    # ------------------------------------------------------
+    def __event(self, eventType: str, name: str, at: float):
+
+        with self.__lock:
+            self.__events.setdefault(threading.get_ident(), []).append(
+                (eventType, name, round((at - self.__origin) * 1000, 3))
+            )
+
+    # ------------------------------------------------------
+    def __record(self, name: str, elapsed: float, peakMemory: int):
+
+        with self.__lock:
+            stats = self.__stats.get(name)
+            if stats is None:
+                stats = self.__stats[name] = StageStats(name)
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.peak_memory = max(stats.peak_memory, peakMemory)
+
+        Logger.debug(f"Stage '{name}': {elapsed * 1000:.1f} ms")
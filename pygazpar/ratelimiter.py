@@ -0,0 +1,214 @@
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+from urllib.parse import urlsplit
+
+from pygazpar.filelock import FileLock
+
+# Default steady request rate (requests per second) and burst size by host.
+DEFAULT_RATE = 2.0
+
+DEFAULT_CAPACITY = 5.0
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ITokenBucket(ABC):
+
+    # ------------------------------------------------------
+    def __init__(self, rate: float, capacity: float):
+
+        ITokenBucket.validate(rate, capacity)
+
+        self._rate = rate
+        self._capacity = capacity
+
+    # ------------------------------------------------------
+    @staticmethod
+    def validate(rate: float, capacity: float):
+
+        if rate <= 0:
+            raise ValueError(f"Invalid rate: {rate} (strictly positive value expected)")
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity: {capacity} (at least 1 expected)")
+
+    # ------------------------------------------------------
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Blocks until the tokens are available. Returns False if the timeout expires before."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            time.sleep(wait)
+
+    # ------------------------------------------------------
+    @abstractmethod
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Consumes the tokens if available and returns 0, otherwise returns the number of seconds to wait."""
+
+    # ------------------------------------------------------
+    def _refill(self, available: float, elapsed: float, tokens: float) -> tuple[float, float]:
+        """Returns the available tokens after the refill and consumption, and the time to wait (0 if consumed)."""
+
+        available = min(self._capacity, available + max(elapsed, 0.0) * self._rate)
+
+        if available >= tokens:
+            return available - tokens, 0.0
+
+        return available, (tokens - available) / self._rate
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TokenBucket(ITokenBucket):
+    """Token bucket shared between the threads of a process."""
+
+    # ------------------------------------------------------
+    def __init__(self, rate: float, capacity: float):
+
+        super().__init__(rate, capacity)
+
+        self.__lock = threading.Lock()
+        self.__available = capacity
+        self.__last = time.monotonic()
+
+    # ------------------------------------------------------
+    def try_acquire(self, tokens: float = 1.0) -> float:
+
+        with self.__lock:
+            now = time.monotonic()
+            self.__available, wait = self._refill(self.__available, now - self.__last, tokens)
+            self.__last = now
+
+        return wait
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FileTokenBucket(ITokenBucket):
+    """Token bucket shared between processes: its state is stored in a small file protected by a file lock."""
+
+    STATE_FORMAT = "<dd"
+
+    # ------------------------------------------------------
+    def __init__(self, path: str, rate: float, capacity: float):
+
+        super().__init__(rate, capacity)
+
+        FileLock.check_supported()
+
+        self.__path = path
+        self.__lock = threading.Lock()
+
+        # Create the state file if it does not exist yet (a full bucket).
+        if not os.path.isfile(path):
+            with open(path, "ab"):
+                pass
+
+    # ------------------------------------------------------
+    def try_acquire(self, tokens: float = 1.0) -> float:
+
+        size = struct.calcsize(FileTokenBucket.STATE_FORMAT)
+
+        with self.__lock, open(self.__path, "r+b") as file, FileLock.locked(file):
+            content = file.read(size)
+
+            # Wall clock time is the only clock shared between processes.
+            now = time.time()
+
+            if len(content) == size:
+                available, last = struct.unpack(FileTokenBucket.STATE_FORMAT, content)
+            else:
+                available, last = self._capacity, now
+
+            available, wait = self._refill(available, now - last, tokens)
+
+            file.seek(0)
+            file.write(struct.pack(FileTokenBucket.STATE_FORMAT, available, now))
+            file.flush()
+
+        return wait
+
+
+# ------------------------------------------------------------------------------------------------------------
+class RateLimiter:
+    """Token bucket rate limiter by host and endpoint.
+
+    Each rule is a regular expression matched against 'host/path' of the request URL with its own rate
+    (requests per second) and capacity (burst size). Requests that do not match any rule share the bucket
+    of their host. If a directory is given, the buckets are stored in files so that several processes of
+    the same machine share them.
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        capacity: float = DEFAULT_CAPACITY,
+        rules: Optional[dict[str, tuple[float, float]]] = None,
+        directory: Optional[str] = None,
+    ):
+
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__rules = [(re.compile(pattern), limits) for pattern, limits in (rules or {}).items()]
+        self.__directory = directory
+        self.__lock = threading.Lock()
+        self.__buckets = dict[str, ITokenBucket]()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        for rateLimit, capacityLimit in [(rate, capacity)] + [limits for _, limits in self.__rules]:
+            ITokenBucket.validate(rateLimit, capacityLimit)
+
+    # ------------------------------------------------------
+    def bucket(self, url: str) -> ITokenBucket:
+
+        parts = urlsplit(url)
+        target = f"{parts.hostname}{parts.path}"
+
+        key, rate, capacity = str(parts.hostname), self.__rate, self.__capacity
+        for pattern, (ruleRate, ruleCapacity) in self.__rules:
+            if pattern.search(target) is not None:
+                key, rate, capacity = f"{parts.hostname} {pattern.pattern}", ruleRate, ruleCapacity
+                break
+
+        with self.__lock:
+            res = self.__buckets.get(key)
+            if res is None:
+                if self.__directory is not None:
+                    filename = re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+                    res = FileTokenBucket(os.path.join(self.__directory, f"{filename}.bucket"), rate, capacity)
+                else:
+                    res = TokenBucket(rate, capacity)
+                self.__buckets[key] = res
+
+        return res
+
+    # ------------------------------------------------------
+    def acquire(self, url: str, timeout: Optional[float] = None) -> bool:
+
+        start = time.monotonic()
+
+        res = self.bucket(url).acquire(timeout=timeout)
+
+        waited = time.monotonic() - start
+        if waited > 0.1:
+            Logger.debug(f"Request to '{url}' delayed {waited:.2f}s by the rate limiter")
+
+        return res
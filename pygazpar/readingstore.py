@@ -0,0 +1,351 @@
+import logging
+import math
+import os
+import threading
+from datetime import date, timedelta
+from typing import Any, Optional
+
+import numpy as np
+
+from pygazpar.enum import PropertyName
+from pygazpar.timeperiod import TimePeriod
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class DailyReadingStore:
+    """Binary store of daily meter readings: one file per PCE, one fixed-width record per gas day.
+
+    Record #i holds the gas day (first day ordinal + i) so that a date range is a slice of the
+    memory-mapped file, without any parsing.
+    """
+
+    MAGIC = b"PYGAZPAR"
+
+    VERSION = 1
+
+    HEADER_SIZE = 64
+
+    FILE_EXTENSION = ".dat"
+
+    # Record states.
+    EMPTY = 0  # Never loaded.
+    PRESENT = 1  # Loaded.
+    ABSENT = 2  # Loaded but not available at the data source.
+
+    RECORD_DTYPE = np.dtype(
+        [
+            ("state", "u1"),
+            (PropertyName.START_INDEX.value, "f8"),
+            (PropertyName.END_INDEX.value, "f8"),
+            (PropertyName.VOLUME.value, "f8"),
+            (PropertyName.ENERGY.value, "f8"),
+            (PropertyName.CONVERTER_FACTOR.value, "f8"),
+            (PropertyName.TEMPERATURE.value, "f8"),
+            (PropertyName.TYPE.value, "S32"),
+            (PropertyName.TIMESTAMP.value, "S32"),
+        ]
+    )
+
+    HEADER_DTYPE = np.dtype(
+        [
+            ("magic", "S8"),
+            ("version", "<u4"),
+            ("record_size", "<u4"),
+            ("first_ordinal", "<i8"),
+            ("reserved", "V40"),
+        ]
+    )
+
+    # Those properties are integer values in the GrDF data.
+    INTEGER_PROPERTIES = [
+        PropertyName.START_INDEX.value,
+        PropertyName.END_INDEX.value,
+        PropertyName.VOLUME.value,
+        PropertyName.ENERGY.value,
+    ]
+
+    FLOAT_PROPERTIES = INTEGER_PROPERTIES + [
+        PropertyName.CONVERTER_FACTOR.value,
+        PropertyName.TEMPERATURE.value,
+    ]
+
+    STRING_PROPERTIES = [
+        PropertyName.TYPE.value,
+        PropertyName.TIMESTAMP.value,
+    ]
+
+    # ------------------------------------------------------
+    def __init__(self, directory: str):
+
+        self.__directory = directory
+
+        self.__lock = threading.RLock()
+
+        # Memory maps by PCE identifier: (first ordinal, records).
+        self.__records = dict[str, tuple[int, np.memmap]]()
+
+        os.makedirs(directory, exist_ok=True)
+
+    # ------------------------------------------------------
+    def path(self, pce_identifier: str) -> str:
+
+        return os.path.join(self.__directory, f"{pce_identifier}{DailyReadingStore.FILE_EXTENSION}")
+
+    # ------------------------------------------------------
+    def pce_identifiers(self) -> list[str]:
+
+        return sorted(
+            filename[: -len(DailyReadingStore.FILE_EXTENSION)]
+            for filename in os.listdir(self.__directory)
+            if filename.endswith(DailyReadingStore.FILE_EXTENSION)
+        )
+
+    # ------------------------------------------------------
+    def date_range(self, pce_identifier: str) -> Optional[tuple[date, date]]:
+        """Returns the first and the last gas days of the file (whatever their state) or None."""
+
+        with self.__lock:
+            mapping = self.__open(pce_identifier)
+            if mapping is None:
+                return None
+
+            first_ordinal, records = mapping
+
+            return date.fromordinal(first_ordinal), date.fromordinal(first_ordinal + len(records) - 1)
+
+    # ------------------------------------------------------
+    def read(self, pce_identifier: str, start_date: date, end_date: date) -> list[dict[str, Any]]:
+
+        with self.__lock:
+            records, first_ordinal = self.__slice(pce_identifier, start_date, end_date)
+
+            res = []
+
+            for offset in np.flatnonzero(records["state"] == DailyReadingStore.PRESENT):
+                res.append(DailyReadingStore.__toReading(records[offset], first_ordinal + int(offset)))
+
+        Logger.debug(f"{len(res)} daily readings read from the store between {start_date} and {end_date}")
+
+        return res
+
+    # ------------------------------------------------------
+    def read_columns(self, pce_identifier: str, start_date: date, end_date: date, names: list[str]) -> np.ndarray:
+        """Returns the values of the given float properties as a (len(names), days) array, one column per day of the
+        range: NaN for the days that are not loaded or not present.
+        """
+
+        res = np.full((len(names), end_date.toordinal() - start_date.toordinal() + 1), np.nan)
+
+        with self.__lock:
+            records, first_ordinal = self.__slice(pce_identifier, start_date, end_date)
+
+            if len(records) > 0:
+                offset = first_ordinal - start_date.toordinal()
+                present = records["state"] == DailyReadingStore.PRESENT
+                for row, name in enumerate(names):
+                    res[row, offset : offset + len(records)] = np.where(present, records[name], np.nan)
+
+        return res
+
+    # ------------------------------------------------------
+    def missing_days(self, pce_identifier: str, start_date: date, end_date: date) -> list[date]:
+        """Returns the days of the range that have never been loaded."""
+
+        with self.__lock:
+            records, first_ordinal = self.__slice(pce_identifier, start_date, end_date)
+
+            loaded = np.zeros(end_date.toordinal() - start_date.toordinal() + 1, dtype=bool)
+            if len(records) > 0:
+                offset = first_ordinal - start_date.toordinal()
+                loaded[offset : offset + len(records)] = records["state"] != DailyReadingStore.EMPTY
+
+        return [start_date + timedelta(days=int(i)) for i in np.flatnonzero(~loaded)]
+
+    # ------------------------------------------------------
+    def write(self, pce_identifier: str, daily: list[dict[str, Any]]):
+
+        if len(daily) == 0:
+            return
+
+        days = [TimePeriod.parse_day(reading[PropertyName.TIME_PERIOD.value]).toordinal() for reading in daily]
+
+        with self.__lock:
+            first_ordinal, records = self.__reserve(pce_identifier, min(days), max(days))
+
+            for ordinal, reading in zip(days, daily):
+                DailyReadingStore.__fromReading(records[ordinal - first_ordinal], reading)
+
+            records.flush()
+
+        Logger.debug(f"{len(daily)} daily readings written into the store")
+
+    # ------------------------------------------------------
+    def mark_absent(self, pce_identifier: str, start_date: date, end_date: date):
+        """Marks the never loaded days of the range as not available at the data source."""
+
+        with self.__lock:
+            first_ordinal, records = self.__reserve(pce_identifier, start_date.toordinal(), end_date.toordinal())
+
+            view = records[start_date.toordinal() - first_ordinal : end_date.toordinal() - first_ordinal + 1]
+            view["state"][view["state"] == DailyReadingStore.EMPTY] = DailyReadingStore.ABSENT
+
+            records.flush()
+
+    # ------------------------------------------------------
+    def close(self):
+
+        with self.__lock:
+            for _, records in self.__records.values():
+                records.flush()
+            self.__records.clear()
+
+    # ------------------------------------------------------
+    def __slice(self, pce_identifier: str, start_date: date, end_date: date) -> tuple[np.ndarray, int]:
+
+        mapping = self.__open(pce_identifier)
+        if mapping is None:
+            return np.empty(0, dtype=DailyReadingStore.RECORD_DTYPE), start_date.toordinal()
+
+        first_ordinal, records = mapping
+
+        start = max(start_date.toordinal() - first_ordinal, 0)
+        end = min(end_date.toordinal() - first_ordinal + 1, len(records))
+
+        if start >= end:
+            return np.empty(0, dtype=DailyReadingStore.RECORD_DTYPE), start_date.toordinal()
+
+        return records[start:end], first_ordinal + start
+
+    # ------------------------------------------------------
+    def __open(self, pce_identifier: str) -> Optional[tuple[int, np.memmap]]:
+
+        mapping = self.__records.get(pce_identifier)
+        if mapping is not None:
+            return mapping
+
+        path = self.path(pce_identifier)
+        if not os.path.isfile(path):
+            return None
+
+        header = np.fromfile(path, dtype=DailyReadingStore.HEADER_DTYPE, count=1)[0]
+        if header["magic"] != DailyReadingStore.MAGIC or header["version"] != DailyReadingStore.VERSION:
+            raise ValueError(f"Invalid reading store file: '{path}'")
+        if header["record_size"] != DailyReadingStore.RECORD_DTYPE.itemsize:
+            raise ValueError(f"Invalid record size in reading store file: '{path}'")
+
+        count = (os.path.getsize(path) - DailyReadingStore.HEADER_SIZE) // DailyReadingStore.RECORD_DTYPE.itemsize
+
+        records = np.memmap(
+            path, dtype=DailyReadingStore.RECORD_DTYPE, mode="r+", offset=DailyReadingStore.HEADER_SIZE, shape=(count,)
+        )
+
+        mapping = (int(header["first_ordinal"]), records)
+
+        self.__records[pce_identifier] = mapping
+
+        return mapping
+
+    # ------------------------------------------------------
+    def __reserve(self, pce_identifier: str, first_ordinal: int, last_ordinal: int) -> tuple[int, np.memmap]:
+
+        mapping = self.__open(pce_identifier)
+
+        previous = None
+
+        if mapping is not None:
+            current_first_ordinal, records = mapping
+            current_last_ordinal = current_first_ordinal + len(records) - 1
+
+            if first_ordinal >= current_first_ordinal and last_ordinal <= current_last_ordinal:
+                return mapping
+
+            if first_ordinal < current_first_ordinal:
+                # The file is rewritten: keep a copy of the current records.
+                previous = np.array(records)
+
+            first_ordinal = min(first_ordinal, current_first_ordinal)
+            last_ordinal = max(last_ordinal, current_last_ordinal)
+
+            # Release the memory map before resizing the file.
+            del records
+            mapping = None
+            self.__records.pop(pce_identifier, None)
+        else:
+            current_first_ordinal = first_ordinal
+
+        path = self.path(pce_identifier)
+
+        if first_ordinal == current_first_ordinal and os.path.isfile(path):
+            # Append: grow the file in place.
+            with open(path, "r+b") as file:
+                file.truncate(
+                    DailyReadingStore.HEADER_SIZE
+                    + (last_ordinal - first_ordinal + 1) * DailyReadingStore.RECORD_DTYPE.itemsize
+                )
+        else:
+            # Create or prepend: write the whole file with the new first ordinal.
+            header = np.zeros(1, dtype=DailyReadingStore.HEADER_DTYPE)
+            header["magic"] = DailyReadingStore.MAGIC
+            header["version"] = DailyReadingStore.VERSION
+            header["record_size"] = DailyReadingStore.RECORD_DTYPE.itemsize
+            header["first_ordinal"] = first_ordinal
+
+            content = np.zeros(last_ordinal - first_ordinal + 1, dtype=DailyReadingStore.RECORD_DTYPE)
+            if previous is not None:
+                offset = current_first_ordinal - first_ordinal
+                content[offset : offset + len(previous)] = previous
+
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(header.tobytes())
+                file.write(content.tobytes())
+            os.replace(temporary_path, path)
+
+        res = self.__open(pce_identifier)
+
+        if res is None:
+            raise FileNotFoundError(f"Reading store file not found: '{path}'")
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __fromReading(record: np.void, reading: dict[str, Any]):
+
+        record["state"] = DailyReadingStore.PRESENT
+
+        for propertyName in DailyReadingStore.FLOAT_PROPERTIES:
+            value = reading.get(propertyName)
+            record[propertyName] = math.nan if value is None else value
+
+        for propertyName in DailyReadingStore.STRING_PROPERTIES:
+            value = reading.get(propertyName)
+            record[propertyName] = b"" if value is None else str(value).encode("utf-8")
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __toReading(record: np.void, ordinal: int) -> dict[str, Any]:
+
+        res: dict[str, Any] = {
+            PropertyName.TIME_PERIOD.value: date.fromordinal(ordinal).strftime(TimePeriod.DAILY_FORMAT),
+        }
+
+        for propertyName in DailyReadingStore.FLOAT_PROPERTIES:
+            value = float(record[propertyName])
+            if math.isnan(value):
+                res[propertyName] = None
+            elif propertyName in DailyReadingStore.INTEGER_PROPERTIES and value.is_integer():
+                res[propertyName] = int(value)
+            else:
+                res[propertyName] = value
+
+        for propertyName in DailyReadingStore.STRING_PROPERTIES:
+            text = bytes(record[propertyName]).decode("utf-8")
+            res[propertyName] = text if len(text) > 0 else None
+
+        # Keep the same property order as the parsers.
+        return {
+            propertyName.value: res[propertyName.value] for propertyName in PropertyName if propertyName.value in res
+        }
@@ -0,0 +1,91 @@
+import logging
+import threading
+from datetime import date
+from typing import Any, Callable, Generic, Optional, TypeVar, cast
+
+T = TypeVar("T")
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _Flight(Generic[T]):  # pylint: disable=too-few-public-methods
+
+    # ------------------------------------------------------
+    def __init__(self, start_date: date, end_date: date):
+
+        self.start_date = start_date
+        self.end_date = end_date
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+# ------------------------------------------------------------------------------------------------------------
+class SingleFlight(Generic[T]):
+    """Coalesces the concurrent fetches of the same key.
+
+    A caller whose date range is contained in the range of a fetch in flight for the same key waits for it and
+    shares its result (or its error) instead of fetching again. The result covers the range of the fetch in
+    flight: the caller has to narrow it to its own range.
+    """
+
+    # ------------------------------------------------------
+    def __init__(self):
+
+        self.__lock = threading.Lock()
+        self.__flights = dict[Any, list[_Flight[T]]]()
+
+    # ------------------------------------------------------
+    def do(self, key: Any, start_date: date, end_date: date, fetch: Callable[[], T]) -> tuple[T, date, date]:
+        """Returns the result of the fetch and the date range it covers."""
+
+        with self.__lock:
+            leader = True
+            for flight in self.__flights.get(key, []):
+                if flight.start_date <= start_date and end_date <= flight.end_date:
+                    flight.followers += 1
+                    leader = False
+                    break
+            else:
+                flight = _Flight[T](start_date, end_date)
+                self.__flights.setdefault(key, []).append(flight)
+
+        if leader:
+            return self.__lead(key, flight, fetch), start_date, end_date
+
+        Logger.debug(f"Waiting for the fetch in flight of '{key}' from {flight.start_date} to {flight.end_date}")
+
+        flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+
+        return cast(T, flight.result), flight.start_date, flight.end_date
+
+    # ------------------------------------------------------
+    def in_flight(self, key: Any) -> int:
+
+        with self.__lock:
+            return len(self.__flights.get(key, []))
+
+    # ------------------------------------------------------
+    def __lead(self, key: Any, flight: _Flight[T], fetch: Callable[[], T]) -> T:
+
+        try:
+            flight.result = fetch()
+            return flight.result
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self.__lock:
+                flights = self.__flights[key]
+                flights.remove(flight)
+                if len(flights) == 0:
+                    del self.__flights[key]
+            flight.done.set()
+
+            if flight.followers > 0:
+                Logger.debug(f"Fetch of '{key}' shared with {flight.followers} waiting caller(s)")
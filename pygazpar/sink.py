@@ -0,0 +1,498 @@
+import calendar
+import csv
+import itertools
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import IO, Any, Iterable, Optional, Union
+
+from requests import Session
+
+from pygazpar.datasource import MeterReading, MeterReadings, MeterReadingsByFrequency
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.hourly import HOURLY_DATE_FORMAT
+from pygazpar.jsoncodec import JsonCodec
+from pygazpar.timeperiod import TimePeriod
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Maximum number of seconds the readings stay in the buffer of a batching sink. Only checked when writing: an idle
+# sink keeps its buffer until flush() or close().
+DEFAULT_FLUSH_INTERVAL = 10.0
+
+# Number of readings taken at once from the streams written by ISink.write_stream().
+STREAM_CHUNK_SIZE = 1000
+
+# The properties written by the tabular sinks, in column order.
+SINK_PROPERTIES = [
+    PropertyName.TIME_PERIOD,
+    PropertyName.START_INDEX,
+    PropertyName.END_INDEX,
+    PropertyName.VOLUME,
+    PropertyName.ENERGY,
+    PropertyName.CONVERTER_FACTOR,
+    PropertyName.TEMPERATURE,
+    PropertyName.TYPE,
+    PropertyName.TIMESTAMP,
+]
+
+NUMERIC_PROPERTIES = [
+    PropertyName.START_INDEX,
+    PropertyName.END_INDEX,
+    PropertyName.VOLUME,
+    PropertyName.ENERGY,
+    PropertyName.CONVERTER_FACTOR,
+    PropertyName.TEMPERATURE,
+]
+
+SinkRow = tuple[str, Frequency, MeterReading]
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ISink(ABC):
+    """Destination of the meter readings emitted by the polling daemon."""
+
+    # ------------------------------------------------------
+    @abstractmethod
+    def write(self, pceIdentifier: str, frequency: Frequency, readings: MeterReadings):
+        pass
+
+    # ------------------------------------------------------
+    def write_all(self, pceIdentifier: str, data: MeterReadingsByFrequency):
+        """Writes the readings of all the frequencies, as returned by Client.load_date_range()."""
+
+        for frequency in Frequency:
+            readings = data.get(frequency.value)
+            if readings:
+                self.write(pceIdentifier, frequency, readings)
+
+    # ------------------------------------------------------
+    def write_stream(self, pceIdentifier: str, frequency: Frequency, readings: Iterable[MeterReading]) -> int:
+        """Writes the readings of a stream (Client.iter_readings() for instance) chunk by chunk and returns their
+        number.
+        """
+
+        res = 0
+
+        iterator = iter(readings)
+        while True:
+            chunk = list(itertools.islice(iterator, STREAM_CHUNK_SIZE))
+            if len(chunk) == 0:
+                break
+            self.write(pceIdentifier, frequency, chunk)
+            res += len(chunk)
+
+        return res
+
+    # ------------------------------------------------------
+    def flush(self):
+        pass
+
+    # ------------------------------------------------------
+    def close(self):
+
+        self.flush()
+
+
+# ------------------------------------------------------------------------------------------------------------
+class BatchingSink(ISink):
+    """Sink buffering the readings and writing them by batches.
+
+    The buffer is written when it holds batchSize readings, or at the first write flushInterval seconds after the
+    previous batch, and at each flush() or close(). The batches are written by the thread of the write or the
+    flush: no background thread uses the underlying connection.
+
+    The flush interval is checked only when writing. When no more readings come, the buffered ones stay in memory
+    until flush() or close() is called (the polling daemon flushes its sink after each poll).
+    """
+
+    # ------------------------------------------------------
+    def __init__(self, batchSize: int = DEFAULT_BATCH_SIZE, flushInterval: Optional[float] = DEFAULT_FLUSH_INTERVAL):
+
+        if batchSize < 1:
+            raise ValueError(f"Invalid batchSize: {batchSize} (at least 1 expected)")
+        if flushInterval is not None and flushInterval < 0:
+            raise ValueError(f"Invalid flushInterval: {flushInterval} (positive value expected)")
+
+        self.__batchSize = batchSize
+        self.__flushInterval = flushInterval
+        self.__buffer = list[SinkRow]()
+        self.__lastFlush = time.monotonic()
+        self.__lock = threading.RLock()
+
+    # ------------------------------------------------------
+    @abstractmethod
+    def _writeBatch(self, rows: list[SinkRow]):
+        pass
+
+    # ------------------------------------------------------
+    def write(self, pceIdentifier: str, frequency: Frequency, readings: MeterReadings):
+
+        with self.__lock:
+            self.__buffer.extend((pceIdentifier, frequency, reading) for reading in readings)
+
+            while len(self.__buffer) >= self.__batchSize:
+                self.__writeBuffer(self.__batchSize)
+
+            if self.__flushInterval is not None and time.monotonic() - self.__lastFlush >= self.__flushInterval:
+                self.__writeBuffer(len(self.__buffer))
+
+    # ------------------------------------------------------
+    def flush(self):
+
+        with self.__lock:
+            self.__writeBuffer(len(self.__buffer))
+
+    # ------------------------------------------------------
+    def __writeBuffer(self, count: int):
+
+        if count > 0:
+            rows = self.__buffer[:count]
+            self._writeBatch(rows)
+            del self.__buffer[:count]
+
+            Logger.debug(f"{len(rows)} readings written by {type(self).__name__}")
+
+        self.__lastFlush = time.monotonic()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def start_time(reading: MeterReading, frequency: Frequency) -> datetime:
+        """Returns the start of the time period of a reading: the hour of an hourly reading, else the first day."""
+
+        timePeriod = reading[PropertyName.TIME_PERIOD.value].strip()
+
+        if frequency == Frequency.HOURLY:
+            return datetime.strptime(timePeriod[:16], HOURLY_DATE_FORMAT)
+
+        return datetime.combine(TimePeriod.start_of(timePeriod, frequency), datetime.min.time())
+
+
+# ------------------------------------------------------------------------------------------------------------
+class JsonLinesSink(ISink):
+    """Writes each reading as a JSON object on its own line, with its PCE identifier and its frequency.
+
+    The output is either a filename, opened in append mode, or a text stream (left open by close()).
+    """
+
+    PCE_IDENTIFIER_FIELD = "pce_identifier"
+
+    FREQUENCY_FIELD = "frequency"
+
+    # ------------------------------------------------------
+    def __init__(self, output: Union[str, IO[str]]):
+
+        if isinstance(output, str):
+            self.__stream: IO[str] = open(output, mode="a", encoding="utf-8")  # pylint: disable=consider-using-with
+            self.__owned = True
+        else:
+            self.__stream = output
+            self.__owned = False
+
+        self.__lock = threading.Lock()
+
+    # ------------------------------------------------------
+    def write(self, pceIdentifier: str, frequency: Frequency, readings: MeterReadings):
+
+        lines = "".join(
+            JsonCodec.dumps(
+                {
+                    JsonLinesSink.PCE_IDENTIFIER_FIELD: pceIdentifier,
+                    JsonLinesSink.FREQUENCY_FIELD: frequency.value,
+                    **reading,
+                }
+            )
+            + "\n"
+            for reading in readings
+        )
+
+        with self.__lock:
+            self.__stream.write(lines)
+
+        Logger.debug(f"{len(readings)} {frequency} readings of PCE '{pceIdentifier}' written")
+
+    # ------------------------------------------------------
+    def flush(self):
+
+        with self.__lock:
+            self.__stream.flush()
+
+    # ------------------------------------------------------
+    def close(self):
+
+        if self.__owned:
+            with self.__lock:
+                self.__stream.close()
+        else:
+            self.flush()
+
+
+# ------------------------------------------------------------------------------------------------------------
+class InfluxLineProtocolSink(BatchingSink):
+    """Writes the readings in InfluxDB line protocol, to a file or to the write endpoint of an InfluxDB server.
+
+    One point per reading: the PCE identifier and the frequency are tags, the numeric properties are float fields
+    and the type a string field. The timestamp, in nanoseconds, is the start of the time period taken as UTC.
+    The output is a filename (appended), a text stream or an http(s) URL, like
+    'http://localhost:8086/api/v2/write?org=home&bucket=gas', the batches being POSTed with the given headers
+    (an 'Authorization' token for instance).
+    """
+
+    DEFAULT_MEASUREMENT = "gas"
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        output: Union[str, IO[str]],
+        measurement: str = DEFAULT_MEASUREMENT,
+        headers: Optional[dict[str, str]] = None,
+        batchSize: int = DEFAULT_BATCH_SIZE,
+        flushInterval: Optional[float] = DEFAULT_FLUSH_INTERVAL,
+        timeout: float = 30.0,
+    ):
+
+        super().__init__(batchSize, flushInterval)
+
+        self.__measurement = InfluxLineProtocolSink.__escape(measurement, ", ")
+        self.__url: Optional[str] = None
+        self.__session: Optional[Session] = None
+        self.__stream: Optional[IO[str]] = None
+        self.__owned = False
+        self.__timeout = timeout
+
+        if isinstance(output, str) and output.startswith(("http://", "https://")):
+            self.__url = output
+            self.__session = Session()
+            self.__session.headers.update({"Content-Type": "text/plain; charset=utf-8", **(headers or {})})
+        elif isinstance(output, str):
+            self.__stream = open(output, mode="a", encoding="utf-8")  # pylint: disable=consider-using-with
+            self.__owned = True
+        else:
+            self.__stream = output
+
+    # ------------------------------------------------------
+    def _writeBatch(self, rows: list[SinkRow]):
+
+        lines = "".join(line + "\n" for line in (self.to_line(*row) for row in rows) if line is not None)
+
+        if self.__session is not None:
+            response = self.__session.post(str(self.__url), data=lines.encode("utf-8"), timeout=self.__timeout)
+            response.raise_for_status()
+        elif self.__stream is not None:
+            self.__stream.write(lines)
+            self.__stream.flush()
+
+    # ------------------------------------------------------
+    def to_line(self, pceIdentifier: str, frequency: Frequency, reading: MeterReading) -> Optional[str]:
+        """Returns the line of a reading, or None if it has no field."""
+
+        fields = list[str]()
+        for propertyName in NUMERIC_PROPERTIES:
+            value = reading.get(propertyName.value)
+            if value is not None:
+                fields.append(f"{InfluxLineProtocolSink.__escape(propertyName.value, ',= ')}={float(value)!r}")
+
+        readingType = reading.get(PropertyName.TYPE.value)
+        if readingType is not None:
+            escaped = str(readingType).replace("\\", "\\\\").replace('"', '\\"')
+            fields.append(f'{PropertyName.TYPE.value}="{escaped}"')
+
+        if len(fields) == 0:
+            return None
+
+        startTime = BatchingSink.start_time(reading, frequency)
+        timestamp = calendar.timegm(startTime.timetuple()) * 1_000_000_000
+
+        return (
+            f"{self.__measurement},pce_identifier={InfluxLineProtocolSink.__escape(pceIdentifier, ',= ')}"
+            f",frequency={frequency.value} {','.join(fields)} {timestamp}"
+        )
+
+    # ------------------------------------------------------
+    def close(self):
+
+        super().close()
+
+        if self.__session is not None:
+            self.__session.close()
+        if self.__stream is not None and self.__owned:
+            self.__stream.close()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __escape(text: str, characters: str) -> str:
+
+        for character in characters:
+            text = text.replace(character, f"\\{character}")
+
+        return text
+
+
+# ------------------------------------------------------------------------------------------------------------
+class SqlSink(BatchingSink):
+    """Upserts the readings into a table with executemany(), through a DB-API 2 connection (sqlite3, psycopg...).
+
+    The table has one row per PCE, frequency and time period. The statement, INSERT ... ON CONFLICT DO UPDATE,
+    is understood by SQLite (3.24+) and PostgreSQL: a corrected reading replaces the previous one. The placeholder
+    depends on the driver: '?' for sqlite3, '%s' for psycopg.
+    """
+
+    DEFAULT_TABLE = "meter_readings"
+
+    KEY_COLUMNS = ["pce_identifier", "frequency", "time_period"]
+
+    # SQL column name and type of the properties.
+    PROPERTY_COLUMNS = {
+        PropertyName.TIME_PERIOD: ("time_period", "TEXT NOT NULL"),
+        PropertyName.START_INDEX: ("start_index_m3", "DOUBLE PRECISION"),
+        PropertyName.END_INDEX: ("end_index_m3", "DOUBLE PRECISION"),
+        PropertyName.VOLUME: ("volume_m3", "DOUBLE PRECISION"),
+        PropertyName.ENERGY: ("energy_kwh", "DOUBLE PRECISION"),
+        PropertyName.CONVERTER_FACTOR: ("converter_factor_kwh_per_m3", "DOUBLE PRECISION"),
+        PropertyName.TEMPERATURE: ("temperature_degc", "DOUBLE PRECISION"),
+        PropertyName.TYPE: ("type", "TEXT"),
+        PropertyName.TIMESTAMP: ("timestamp", "TEXT"),
+    }
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        connection: Any,
+        table: str = DEFAULT_TABLE,
+        placeholder: str = "?",
+        createTable: bool = True,
+        batchSize: int = DEFAULT_BATCH_SIZE,
+        flushInterval: Optional[float] = DEFAULT_FLUSH_INTERVAL,
+    ):
+
+        super().__init__(batchSize, flushInterval)
+
+        self.__connection = connection
+        self.__table = table
+
+        columns = ["pce_identifier", "frequency", "period_start"] + [
+            SqlSink.PROPERTY_COLUMNS[propertyName][0] for propertyName in SINK_PROPERTIES
+        ]
+        updates = [f"{column} = excluded.{column}" for column in columns if column not in SqlSink.KEY_COLUMNS]
+
+        self.__statement = (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})"
+            f" ON CONFLICT ({', '.join(SqlSink.KEY_COLUMNS)}) DO UPDATE SET {', '.join(updates)}"
+        )
+
+        if createTable:
+            self.create_table()
+
+    # ------------------------------------------------------
+    def create_table(self):
+
+        columns = ["pce_identifier TEXT NOT NULL", "frequency TEXT NOT NULL", "period_start TEXT NOT NULL"] + [
+            f"{column} {columnType}" for column, columnType in (SqlSink.PROPERTY_COLUMNS[p] for p in SINK_PROPERTIES)
+        ]
+
+        cursor = self.__connection.cursor()
+        try:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.__table} ({', '.join(columns)},"
+                f" PRIMARY KEY ({', '.join(SqlSink.KEY_COLUMNS)}))"
+            )
+        finally:
+            cursor.close()
+
+        self.__connection.commit()
+
+    # ------------------------------------------------------
+    def _writeBatch(self, rows: list[SinkRow]):
+
+        parameters = [SqlSink.__parameters(*row) for row in rows]
+
+        cursor = self.__connection.cursor()
+        try:
+            cursor.executemany(self.__statement, parameters)
+        except Exception:
+            self.__connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        self.__connection.commit()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __parameters(pceIdentifier: str, frequency: Frequency, reading: MeterReading) -> tuple[Any, ...]:
+
+        startTime = BatchingSink.start_time(reading, frequency)
+
+        values: list[Any] = [
+            pceIdentifier,
+            frequency.value,
+            (
+                startTime.isoformat(sep=" ", timespec="minutes")
+                if frequency == Frequency.HOURLY
+                else startTime.date().isoformat()
+            ),
+        ]
+        for propertyName in SINK_PROPERTIES:
+            value = reading.get(propertyName.value)
+            if value is not None and propertyName in NUMERIC_PROPERTIES:
+                value = float(value)
+            values.append(value)
+
+        return tuple(values)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class CsvSink(BatchingSink):
+    """Writes the readings as CSV rows: the PCE identifier, the frequency and the properties of SINK_PROPERTIES.
+
+    The output is a filename, appended, or a text stream. The header is written in an empty file, or at the start
+    of a stream if header is set.
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        output: Union[str, IO[str]],
+        header: bool = True,
+        batchSize: int = DEFAULT_BATCH_SIZE,
+        flushInterval: Optional[float] = DEFAULT_FLUSH_INTERVAL,
+    ):
+
+        super().__init__(batchSize, flushInterval)
+
+        if isinstance(output, str):
+            header = header and (not os.path.isfile(output) or os.path.getsize(output) == 0)
+            self.__stream: IO[str] = open(  # pylint: disable=consider-using-with
+                output, mode="a", encoding="utf-8", newline=""
+            )
+            self.__owned = True
+        else:
+            self.__stream = output
+            self.__owned = False
+
+        self.__writer = csv.writer(self.__stream)
+
+        if header:
+            self.__writer.writerow(["pce_identifier", "frequency"] + [p.value for p in SINK_PROPERTIES])
+
+    # ------------------------------------------------------
+    def _writeBatch(self, rows: list[SinkRow]):
+
+        self.__writer.writerows(
+            [pceIdentifier, frequency.value] + [reading.get(p.value) for p in SINK_PROPERTIES]
+            for pceIdentifier, frequency, reading in rows
+        )
+        self.__stream.flush()
+
+    # ------------------------------------------------------
+    def close(self):
+
+        super().close()
+
+        if self.__owned:
+            self.__stream.close()
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, Optional
+
+from pygazpar.datasource import MeterReadings
+from pygazpar.enum import PropertyName
+from pygazpar.jsoncodec import JsonCodec
+from pygazpar.timeperiod import TimePeriod
+
+# Snapshot of the daily readings of a PCE: its version and, by time period, the version of the last change of the
+# day, the fingerprint of the reading and the reading itself.
+Snapshot = dict[str, Any]
+
+# Days kept in a snapshot, counted back from its most recent day.
+DEFAULT_RETENTION_DAYS = 365
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ISnapshotStore(ABC):
+    """Last known daily readings of each PCE, with the version at which each day has last changed.
+
+    The version of a PCE is incremented by each update that adds or changes days: it is the watermark returned to
+    the consumers of Client.load_changes(), who get the days changed since the watermark of their last sync.
+
+    Only the last retention_days days of each PCE are kept (all of them if None).
+    """
+
+    # ------------------------------------------------------
+    def __init__(self, retention_days: Optional[int] = DEFAULT_RETENTION_DAYS):
+
+        self._lock = threading.Lock()
+
+        self.__retentionDays = retention_days
+
+    # ------------------------------------------------------
+    @abstractmethod
+    def _read(self, pce_identifier: str) -> Optional[Snapshot]:
+        pass
+
+    # ------------------------------------------------------
+    @abstractmethod
+    def _write(self, pce_identifier: str, snapshot: Snapshot):
+        pass
+
+    # ------------------------------------------------------
+    def version(self, pce_identifier: str) -> int:
+
+        with self._lock:
+            snapshot = self._read(pce_identifier)
+
+        return snapshot["version"] if snapshot is not None else 0
+
+    # ------------------------------------------------------
+    def update(self, pce_identifier: str, readings: MeterReadings) -> int:
+        """Records the readings and returns the new version of the PCE. The version is unchanged if no day has
+        been added or changed (the timestamps of the readings are ignored).
+
+        A missing temperature (the weather request has failed) keeps the known temperature of the day: it is not a
+        change.
+        """
+
+        with self._lock:
+            current = self._read(pce_identifier) or {"version": 0, "days": {}}
+
+            # The current snapshot is left unchanged until the new one is written.
+            days = dict(current["days"])
+            version = current["version"] + 1
+            changes = 0
+            for reading in readings:
+                timePeriod = reading[PropertyName.TIME_PERIOD.value]
+
+                day = days.get(timePeriod)
+                if day is not None and reading.get(PropertyName.TEMPERATURE.value) is None:
+                    knownTemperature = day["reading"].get(PropertyName.TEMPERATURE.value)
+                    if knownTemperature is not None:
+                        reading = {**reading, PropertyName.TEMPERATURE.value: knownTemperature}
+
+                fingerprint = ISnapshotStore.fingerprint(reading)
+
+                if day is None or day["fingerprint"] != fingerprint:
+                    days[timePeriod] = {"version": version, "fingerprint": fingerprint, "reading": dict(reading)}
+                    changes += 1
+
+            pruned = self.__prune(days)
+
+            if changes == 0:
+                if pruned > 0:
+                    self._write(pce_identifier, {"version": current["version"], "days": days})
+                return current["version"]
+
+            self._write(pce_identifier, {"version": version, "days": days})
+
+        Logger.debug(f"PCE '{pce_identifier}': {changes} days added or changed (version {version})")
+
+        return version
+
+    # ------------------------------------------------------
+    def changes(self, pce_identifier: str, since_version: Optional[int] = None) -> MeterReadings:
+        """Returns the readings of the days added or changed after the given version, in date order.
+
+        All the days are returned if since_version is None or ahead of the PCE version (the store has been reset).
+        """
+
+        with self._lock:
+            snapshot = self._read(pce_identifier)
+
+        if snapshot is None:
+            return []
+
+        if since_version is not None and since_version > snapshot["version"]:
+            Logger.warning(
+                f"PCE '{pce_identifier}': watermark {since_version} ahead of the snapshot version {snapshot['version']}"
+            )
+            since_version = None
+
+        res = [
+            (TimePeriod.parse_day(timePeriod), day["reading"])
+            for timePeriod, day in snapshot["days"].items()
+            if since_version is None or day["version"] > since_version
+        ]
+        res.sort(key=lambda item: item[0])
+
+        # Copies: the snapshot is left unchanged by the callers.
+        return [dict(reading) for _, reading in res]
+
+    # ------------------------------------------------------
+    @staticmethod
+    def fingerprint(reading: dict[str, Any]) -> str:
+
+        # The timestamp is the time of the load: it changes at each load.
+        content = {key: value for key, value in reading.items() if key != PropertyName.TIMESTAMP.value}
+
+        # Canonical encoding: the same reading has the same fingerprint whatever the order of its keys.
+        encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+        return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+    # ------------------------------------------------------
+    def __prune(self, days: dict[str, Any]) -> int:
+        """Removes the days older than the retention and returns their number."""
+
+        if self.__retentionDays is None or len(days) == 0:
+            return 0
+
+        dates = {timePeriod: TimePeriod.parse_day(timePeriod) for timePeriod in days}
+        firstDay = max(dates.values()) - timedelta(days=self.__retentionDays - 1)
+
+        expired = [timePeriod for timePeriod, day in dates.items() if day < firstDay]
+        for timePeriod in expired:
+            del days[timePeriod]
+
+        return len(expired)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class MemorySnapshotStore(ISnapshotStore):
+    """In-process snapshots: the watermarks are only valid for the lifetime of the process."""
+
+    # ------------------------------------------------------
+    def __init__(self, retention_days: Optional[int] = DEFAULT_RETENTION_DAYS):
+
+        super().__init__(retention_days)
+
+        self.__snapshots = dict[str, Snapshot]()
+
+    # ------------------------------------------------------
+    def _read(self, pce_identifier: str) -> Optional[Snapshot]:
+
+        return self.__snapshots.get(pce_identifier)
+
+    # ------------------------------------------------------
+    def _write(self, pce_identifier: str, snapshot: Snapshot):
+
+        self.__snapshots[pce_identifier] = snapshot
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FileSnapshotStore(ISnapshotStore):
+    """Snapshots persisted as one JSON file per PCE, replaced atomically at each change."""
+
+    FILE_EXTENSION = ".snapshot.json"
+
+    # ------------------------------------------------------
+    def __init__(self, directory: str, retention_days: Optional[int] = DEFAULT_RETENTION_DAYS):
+
+        super().__init__(retention_days)
+
+        self.__directory = directory
+
+        # Last snapshot read or written by PCE: the files are only read once.
+        self.__snapshots = dict[str, Snapshot]()
+
+        os.makedirs(directory, exist_ok=True)
+
+    # ------------------------------------------------------
+    def path(self, pce_identifier: str) -> str:
+
+        return os.path.join(self.__directory, f"{pce_identifier}{FileSnapshotStore.FILE_EXTENSION}")
+
+    # ------------------------------------------------------
+    def _read(self, pce_identifier: str) -> Optional[Snapshot]:
+
+        snapshot = self.__snapshots.get(pce_identifier)
+        if snapshot is None and os.path.isfile(self.path(pce_identifier)):
+            with open(self.path(pce_identifier), mode="rb") as snapshotFile:
+                snapshot = self.__snapshots[pce_identifier] = JsonCodec.loads(snapshotFile.read())
+
+        return snapshot
+
+    # ------------------------------------------------------
+    def _write(self, pce_identifier: str, snapshot: Snapshot):
+
+        path = self.path(pce_identifier)
+
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, mode="w", encoding="utf-8") as snapshotFile:
+            snapshotFile.write(JsonCodec.dumps(snapshot))
+        os.replace(temporary_path, path)
+
+        self.__snapshots[pce_identifier] = snapshot
@@ -0,0 +1,122 @@
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.hourly import GAS_DAY_START_HOUR, HOURLY_DATE_FORMAT
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TimePeriod:
+    """Parses the time periods of the meter readings, as formatted by the data sources for each frequency:
+    'dd/mm/yyyy' (daily), 'Du dd/mm/yyyy au dd/mm/yyyy' (weekly), 'Mois yyyy' (monthly) or 'yyyy' (yearly).
+    """
+
+    DAILY_FORMAT = "%d/%m/%Y"
+
+    MONTHS = [
+        "Janvier",
+        "Février",
+        "Mars",
+        "Avril",
+        "Mai",
+        "Juin",
+        "Juillet",
+        "Août",
+        "Septembre",
+        "Octobre",
+        "Novembre",
+        "Décembre",
+    ]
+
+    # ------------------------------------------------------
+    @staticmethod
+    def parse_day(time_period: str) -> date:
+
+        # Fast path for the usual 'dd/mm/yyyy' days: strptime() is slow on long histories.
+        if len(time_period) == 10 and time_period[2] == "/" and time_period[5] == "/":
+            try:
+                return date(int(time_period[6:10]), int(time_period[3:5]), int(time_period[0:2]))
+            except ValueError:
+                pass
+
+        return datetime.strptime(time_period.strip(), TimePeriod.DAILY_FORMAT).date()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def start_of(time_period: str, frequency: Frequency) -> date:
+        """Returns the first day of the time period."""
+
+        text = time_period.strip()
+
+        if frequency == Frequency.WEEKLY:
+            return TimePeriod.parse_day(text.split(" ")[1])
+
+        if frequency == Frequency.MONTHLY:
+            month, year = text.rsplit(" ", 1)
+            return date(int(year), TimePeriod.MONTHS.index(month.strip()) + 1, 1)
+
+        if frequency == Frequency.YEARLY:
+            return date(int(text), 1, 1)
+
+        if frequency == Frequency.HOURLY:
+            # The gas day of the hour: the hours before 06:00 belong to the day before.
+            hour = datetime.strptime(text[:16], HOURLY_DATE_FORMAT)
+            return (hour - timedelta(hours=GAS_DAY_START_HOUR)).date()
+
+        return TimePeriod.parse_day(text[:10])
+
+    # ------------------------------------------------------
+    @staticmethod
+    def first_day(day: date, frequency: Frequency) -> date:
+        """Returns the first day of the period of the given frequency containing the day."""
+
+        if frequency == Frequency.WEEKLY:
+            return day - timedelta(days=day.weekday())
+
+        if frequency == Frequency.MONTHLY:
+            return day.replace(day=1)
+
+        if frequency == Frequency.YEARLY:
+            return date(day.year, 1, 1)
+
+        return day
+
+    # ------------------------------------------------------
+    @staticmethod
+    def last_day(day: date, frequency: Frequency) -> date:
+        """Returns the last day of the period of the given frequency containing the day."""
+
+        if frequency == Frequency.WEEKLY:
+            return day + timedelta(days=6 - day.weekday())
+
+        if frequency == Frequency.MONTHLY:
+            return date(day.year + day.month // 12, day.month % 12 + 1, 1) - timedelta(days=1)
+
+        if frequency == Frequency.YEARLY:
+            return date(day.year, 12, 31)
+
+        return day
+
+    # ------------------------------------------------------
+    @staticmethod
+    def day_of(reading: dict[str, Any]) -> date:
+
+        return TimePeriod.parse_day(reading[PropertyName.TIME_PERIOD.value])
+
+    # ------------------------------------------------------
+    @staticmethod
+    def slice_hourly(hourly: list[dict[str, Any]], start_date: date, end_date: date) -> list[dict[str, Any]]:
+        """Returns the hourly readings of the gas days between start_date and end_date (both included)."""
+
+        return [
+            reading
+            for reading in hourly
+            if start_date <= TimePeriod.start_of(reading[PropertyName.TIME_PERIOD.value], Frequency.HOURLY) <= end_date
+        ]
+
+    # ------------------------------------------------------
+    @staticmethod
+    def slice_daily(daily: list[dict[str, Any]], start_date: date, end_date: date) -> list[dict[str, Any]]:
+        """Returns the daily readings between start_date and end_date (both included)."""
+
+        return [reading for reading in daily if start_date <= TimePeriod.day_of(reading) <= end_date]
@@ -0,0 +1,310 @@
+import logging
+import posixpath
+import re
+import zipfile
+from html import unescape
+from typing import IO, Any, Iterator
+from xml.etree.ElementTree import fromstring, iterparse
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+RELATIONSHIPS_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+PACKAGE_RELATIONSHIPS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# The sheet XML is read by chunks of this size.
+CHUNK_SIZE = 256 * 1024
+
+ROOT_ELEMENT = re.compile(rb"<(\w+)[\s>]")
+
+# A cell with a content (the empty cells, '<c .../>', are skipped): its column letters, its row number, its other
+# attributes and either its value alone or its whole content.
+CELL = re.compile(rb'<c r="([A-Z]+)(\d+)"([^>/]*)>(?:<v>([^<]*)</v>|(.*?))</c>', re.S)
+
+# A shared string: either its plain text or its whole content.
+SHARED_STRING = re.compile(rb"<si>(?:<t>([^<]*)</t>|(.*?))</si>", re.S)
+
+CELL_TYPE = re.compile(rb'\bt="(\w+)"')
+
+CELL_STYLE = re.compile(rb'\bs="(\d+)"')
+
+CELL_VALUE = re.compile(rb"<v(?:\s[^>]*)?>([^<]*)</v>")
+
+CELL_FORMULA = re.compile(rb"<f[\s/>]")
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class XlsxReader:  # pylint: disable=too-few-public-methods
+    """Minimal reader of the values of an xlsx worksheet: the sheet XML is parsed straight from the zip file,
+    row by row, without building a workbook.
+
+    The values are the ones openpyxl reads (numbers, shared and inline strings, booleans). Anything else (dates,
+    formulas) raises a ValueError: the caller is expected to fall back to openpyxl.
+    """
+
+    # ------------------------------------------------------
+    @staticmethod
+    def iter_rows(  # pylint: disable=too-many-branches
+        filename: str, minRow: int, minCol: int, maxCol: int
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yields the values of the columns minCol to maxCol (1-based, both included) of the rows of the active
+        worksheet from minRow. The rows without any value in those columns are skipped.
+        """
+
+        with zipfile.ZipFile(filename) as archive:
+            sheetPath = XlsxReader.__activeSheetPath(archive)
+            sharedStrings = XlsxReader.__readSharedStrings(archive)
+            dateStyles = XlsxReader.__readDateStyles(archive)
+
+            width = maxCol - minCol + 1
+
+            # Column numbers by column letters and cell types by cell attributes: a few distinct values.
+            columns = dict[bytes, int]()
+            cellTypes = dict[bytes, tuple[bytes, bool]]()
+
+            values: list[Any] = [None] * width
+            currentRow = -1
+
+            with archive.open(sheetPath) as sheet:
+                for block in XlsxReader.__iterRowBlocks(sheet):
+                    cells = CELL.findall(block)
+                    if len(cells) != block.count(b"</c>"):
+                        raise ValueError("Unexpected cell XML")
+
+                    for letters, rowText, attributes, text, content in cells:
+                        colNum = columns.get(letters)
+                        if colNum is None:
+                            colNum = columns[letters] = XlsxReader.__columnOf(letters)
+                        if colNum < minCol or colNum > maxCol:
+                            continue
+
+                        rowNum = int(rowText)
+                        if rowNum < minRow:
+                            continue
+
+                        if rowNum != currentRow:
+                            if currentRow >= 0:
+                                yield tuple(values)
+                                values = [None] * width
+                            currentRow = rowNum
+
+                        cellType = cellTypes.get(attributes)
+                        if cellType is None:
+                            cellType = cellTypes[attributes] = XlsxReader.__cellTypeOf(attributes, dateStyles)
+
+                        # Fast path for the plain shared strings and numbers.
+                        if len(text) == 0 or cellType[1]:
+                            value = XlsxReader.__valueOf(
+                                cellType, content if len(text) == 0 else b"<v>" + text + b"</v>", sharedStrings
+                            )
+                        elif cellType[0] == b"s":
+                            value = sharedStrings[int(text)]
+                        elif cellType[0] == b"n":
+                            value = float(text) if b"." in text or b"E" in text or b"e" in text else int(text)
+                        else:
+                            value = XlsxReader.__valueOf(cellType, b"<v>" + text + b"</v>", sharedStrings)
+
+                        values[colNum - minCol] = value
+
+            if currentRow >= 0:
+                yield tuple(values)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __iterRowBlocks(sheet: IO[bytes]) -> Iterator[bytes]:
+        """Yields the sheet XML by blocks of complete rows: only the rows of the current block are in memory."""
+
+        buffer = b""
+        checked = False
+        while True:
+            chunk = sheet.read(CHUNK_SIZE)
+            buffer += chunk
+
+            if not checked:
+                # The regular expressions expect the main namespace as the default one (no tag prefix).
+                root = ROOT_ELEMENT.search(buffer)
+                if root is None and len(chunk) > 0:
+                    continue
+                if root is None or root.group(1) != b"worksheet":
+                    raise ValueError("Unexpected worksheet XML")
+                checked = True
+
+            if len(chunk) == 0:
+                yield buffer
+                break
+
+            end = buffer.rfind(b"</row>")
+            if end >= 0:
+                end += len(b"</row>")
+                yield buffer[:end]
+                buffer = buffer[end:]
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __columnOf(letters: bytes) -> int:
+
+        res = 0
+        for letter in letters:
+            res = res * 26 + letter - 64  # ord("A") - 1
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __cellTypeOf(attributes: bytes, dateStyles: set[int]) -> tuple[bytes, bool]:
+        """Returns the type of a cell and whether it has a date format."""
+
+        dataType = CELL_TYPE.search(attributes)
+        style = CELL_STYLE.search(attributes)
+
+        return (
+            dataType.group(1) if dataType is not None else b"n",
+            style is not None and int(style.group(1)) in dateStyles,
+        )
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __valueOf(  # pylint: disable=too-many-return-statements
+        cellType: tuple[bytes, bool], content: bytes, sharedStrings: list[str]
+    ) -> Any:
+
+        dataType, isDate = cellType
+
+        if CELL_FORMULA.search(content) is not None:
+            raise ValueError("Formula in a cell")
+
+        if dataType == b"inlineStr":
+            inline = XlsxReader.__parseElement(b"c", content).find(f"{MAIN_NS}is")
+            return XlsxReader.__textOf(inline) if inline is not None else None
+
+        value = CELL_VALUE.search(content)
+        if value is None or len(value.group(1)) == 0:
+            return None
+
+        text = value.group(1)
+
+        if dataType == b"n":
+            if isDate:
+                raise ValueError("Date in a cell")
+            if b"." in text or b"E" in text or b"e" in text:
+                return float(text)
+            return int(text)
+
+        if dataType == b"s":
+            return sharedStrings[int(text)]
+
+        if dataType == b"b":
+            return bool(int(text))
+
+        if dataType in (b"str", b"e"):
+            return XlsxReader.__unescape(text)
+
+        raise ValueError(f"Unsupported cell type: '{dataType.decode()}'")
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __parseElement(tag: bytes, content: bytes):
+
+        return fromstring(b"<" + tag + b' xmlns="' + MAIN_NS[1:-1].encode() + b'">' + content + b"</" + tag + b">")
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __textOf(element) -> str:
+
+        # Plain text or rich text runs; the phonetic runs are ignored.
+        res = element.findtext(f"{MAIN_NS}t") or ""
+        for run in element.iterfind(f"{MAIN_NS}r"):
+            res += run.findtext(f"{MAIN_NS}t") or ""
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __activeSheetPath(archive: zipfile.ZipFile) -> str:
+
+        with archive.open("xl/workbook.xml") as workbookFile:
+            sheetIds = list[str]()
+            activeTab = None
+            for _, element in iterparse(workbookFile):
+                if element.tag == f"{MAIN_NS}sheet":
+                    sheetIds.append(str(element.get(f"{RELATIONSHIPS_NS}id")))
+                elif element.tag == f"{MAIN_NS}workbookView" and activeTab is None:
+                    activeTab = int(element.get("activeTab", 0))
+
+        with archive.open("xl/_rels/workbook.xml.rels") as relsFile:
+            targets = {
+                element.get("Id"): str(element.get("Target"))
+                for _, element in iterparse(relsFile)
+                if element.tag == f"{PACKAGE_RELATIONSHIPS_NS}Relationship"
+            }
+
+        target = targets[sheetIds[activeTab or 0]]
+
+        return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __readSharedStrings(archive: zipfile.ZipFile) -> list[str]:
+
+        res = list[str]()
+
+        if "xl/sharedStrings.xml" not in archive.namelist():
+            return res
+
+        data = archive.read("xl/sharedStrings.xml")
+
+        strings = SHARED_STRING.findall(data)
+        if len(strings) != data.count(b"</si>"):
+            raise ValueError("Unexpected shared strings XML")
+
+        for text, content in strings:
+            if len(content) > 0:
+                # Rich text or text with attributes.
+                res.append(XlsxReader.__textOf(XlsxReader.__parseElement(b"si", content)).replace("x005F_", ""))
+            else:
+                res.append(XlsxReader.__unescape(text).replace("x005F_", ""))
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __unescape(text: bytes) -> str:
+
+        # As an XML parser does: the line ends are normalized, then the entities are replaced.
+        if b"\r" in text:
+            text = text.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        return unescape(text.decode("utf-8"))
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __readDateStyles(archive: zipfile.ZipFile) -> set[int]:
+        """Returns the indexes of the cell styles with a date format: openpyxl turns their numbers into dates."""
+
+        res = set[int]()
+
+        if "xl/styles.xml" not in archive.namelist():
+            return res
+
+        with archive.open("xl/styles.xml") as stylesFile:
+            formats = dict[int, str](BUILTIN_FORMATS)
+            cellFormatIds = list[int]()
+            inCellXfs = False
+            for event, element in iterparse(stylesFile, events=("start", "end")):
+                if element.tag == f"{MAIN_NS}cellXfs":
+                    inCellXfs = event == "start"
+                elif event == "end" and element.tag == f"{MAIN_NS}numFmt":
+                    formats[int(element.get("numFmtId", 0))] = str(element.get("formatCode"))
+                elif event == "end" and element.tag == f"{MAIN_NS}xf" and inCellXfs:
+                    cellFormatIds.append(int(element.get("numFmtId", 0)))
+
+        for index, formatId in enumerate(cellFormatIds):
+            formatCode = formats.get(formatId)
+            if formatCode is not None and is_date_format(formatCode):
+                res.add(index)
+
+        return res
@@ -0,0 +1,245 @@
+import json
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+import pytest
+
+from pygazpar.api_client import ConsumptionType
+from pygazpar.api_client import Frequency as APIClientFrequency
+from pygazpar.datasource import (
+    FrequencyConverter,
+    IDataSource,
+    MeterReadingsByFrequency,
+    WebDataSource,
+)
+from pygazpar.enum import Frequency, PropertyName
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ConsumptionRequest(NamedTuple):
+    consumption_type: ConsumptionType
+    start_date: date
+    end_date: date
+    pce_list: list[str]
+    frequency: Optional[APIClientFrequency]
+    streamed: bool
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FakeAPIClient:
+    """Offline stand-in for APIClient: serves the given documents whatever the date range and records the requests.
+
+    The published consumption is served for the PUBLISHED consumption type, the hourly one for the HOURLY
+    frequency and the informative one otherwise.
+    """
+
+    # ------------------------------------------------------
+    def __init__(
+        self,
+        consumption: Optional[dict[str, Any]] = None,
+        temperatures: Optional[dict[str, Any]] = None,
+        published: Optional[dict[str, Any]] = None,
+        hourly: Optional[dict[str, Any]] = None,
+        delay: float = 0.0,
+    ):
+
+        self.consumption = consumption if consumption is not None else {}
+        self.temperatures = temperatures if temperatures is not None else {}
+        self.published = published if published is not None else {}
+        self.hourly = hourly if hourly is not None else {}
+        # Duration of each consumption request, in seconds.
+        self.delay = delay
+        self.consumption_requests = list[ConsumptionRequest]()
+        self.meteo_requests = list[tuple[date, int, str]]()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def from_resources(delay: float = 0.0) -> "FakeAPIClient":
+        """The informative consumption and the temperatures of tests/resources."""
+
+        with open("tests/resources/donnees_informatives.json", mode="r", encoding="utf-8") as jsonFile:
+            consumption = json.load(jsonFile)
+
+        with open("tests/resources/temperatures.json", mode="r", encoding="utf-8") as jsonFile:
+            temperatures = json.load(jsonFile)
+
+        return FakeAPIClient(consumption, temperatures, delay=delay)
+
+    # ------------------------------------------------------
+    def is_logged_in(self) -> bool:
+
+        return True
+
+    # ------------------------------------------------------
+    def get_pce_consumption(
+        self,
+        consumption_type: ConsumptionType,
+        start_date: date,
+        end_date: date,
+        pce_list: list[str],
+        frequency: Optional[APIClientFrequency] = None,
+    ) -> dict[str, Any]:
+
+        self.consumption_requests.append(
+            ConsumptionRequest(consumption_type, start_date, end_date, pce_list, frequency, False)
+        )
+        time.sleep(self.delay)
+
+        return self.__document(consumption_type, frequency)
+
+    # ------------------------------------------------------
+    def iter_pce_consumption(
+        self,
+        consumption_type: ConsumptionType,
+        start_date: date,
+        end_date: date,
+        pce_list: list[str],
+        frequency: Optional[APIClientFrequency] = None,
+        chunk_size: int = 1024,
+    ) -> Iterator[bytes]:
+
+        self.consumption_requests.append(
+            ConsumptionRequest(consumption_type, start_date, end_date, pce_list, frequency, True)
+        )
+        time.sleep(self.delay)
+
+        content = json.dumps(self.__document(consumption_type, frequency)).encode("utf-8")
+
+        for index in range(0, len(content), chunk_size):
+            yield content[index : index + chunk_size]
+
+    # ------------------------------------------------------
+    def get_pce_meteo(self, end_date: date, days: int, pce: str) -> dict[str, Any]:
+
+        self.meteo_requests.append((end_date, days, pce))
+
+        return self.temperatures
+
+    # ------------------------------------------------------
+    def __document(self, consumption_type: ConsumptionType, frequency: Optional[APIClientFrequency]) -> dict[str, Any]:
+
+        if consumption_type == ConsumptionType.PUBLISHED:
+            return self.published
+
+        if frequency == APIClientFrequency.HOURLY:
+            return self.hourly
+
+        return self.consumption
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FakeDataSource(IDataSource):
+    """Offline data source: serves the daily readings of daily_readings() (and the other frequencies computed
+    from them) and records the loads, as (PCE identifier, start date, end date), and their concurrency.
+
+    Each load takes delay seconds. When failure is set, it is raised by the loads and by get_pce_identifiers().
+    """
+
+    COMPUTE_BY_FREQUENCY = {
+        Frequency.DAILY: FrequencyConverter.computeDaily,
+        Frequency.WEEKLY: FrequencyConverter.computeWeekly,
+        Frequency.MONTHLY: FrequencyConverter.computeMonthly,
+        Frequency.YEARLY: FrequencyConverter.computeYearly,
+    }
+
+    # ------------------------------------------------------
+    def __init__(self, pce_identifiers: Optional[list[str]] = None, delay: float = 0.0):
+
+        self.pce_identifiers = pce_identifiers if pce_identifiers is not None else ["22423299474865"]
+        self.delay = delay
+        self.failure: Optional[Exception] = None
+        self.loads = list[tuple[str, date, date]]()
+        self.pce_list_count = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    # ------------------------------------------------------
+    def login(self):
+        pass
+
+    # ------------------------------------------------------
+    def logout(self):
+        pass
+
+    # ------------------------------------------------------
+    def get_pce_identifiers(self) -> list[str]:
+
+        self.pce_list_count += 1
+
+        if self.failure is not None:
+            raise self.failure
+
+        return self.pce_identifiers
+
+    # ------------------------------------------------------
+    def load(
+        self, pceIdentifier: str, startDate: date, endDate: date, frequencies: Optional[list[Frequency]] = None
+    ) -> MeterReadingsByFrequency:
+
+        with self.lock:
+            self.loads.append((pceIdentifier, startDate, endDate))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        try:
+            if self.failure is not None:
+                raise self.failure
+
+            daily = self.daily_readings(pceIdentifier, startDate, endDate)
+
+            time.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+        return {
+            frequency.value: FakeDataSource.COMPUTE_BY_FREQUENCY[frequency](daily)
+            for frequency in (frequencies if frequencies is not None else [Frequency.DAILY])
+        }
+
+    # ------------------------------------------------------
+    def daily_readings(  # pylint: disable=unused-argument
+        self, pceIdentifier: str, startDate: date, endDate: date
+    ) -> list[dict[str, Any]]:
+        """The daily readings of a load: one per day, with the day of the month as volume."""
+
+        res = list[dict[str, Any]]()
+
+        day = startDate
+        while day <= endDate:
+            res.append({PropertyName.TIME_PERIOD.value: day.strftime("%d/%m/%Y"), PropertyName.VOLUME.value: day.day})
+            day += timedelta(days=1)
+
+        return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+@pytest.fixture
+def without_timestamp() -> Callable[[list[dict[str, Any]]], list[dict[str, Any]]]:
+    """Blanks the load timestamp of readings, to compare the readings of several loads."""
+
+    def blank(readings: list[dict[str, Any]]) -> list[dict[str, Any]]:
+
+        return [{**reading, PropertyName.TIMESTAMP.value: None} for reading in readings]
+
+    return blank
+
+
+# ------------------------------------------------------------------------------------------------------------
+@pytest.fixture
+def fake_api_client(monkeypatch) -> Callable[..., FakeAPIClient]:
+    """Installs a FakeAPIClient in a web data source: fake_api_client(dataSource, apiClient=None, **documents)
+    returns the fake (a new one built from the documents if none is given).
+    """
+
+    def install(dataSource: WebDataSource, apiClient: Optional[FakeAPIClient] = None, **kwargs) -> FakeAPIClient:
+
+        apiClient = apiClient if apiClient is not None else FakeAPIClient(**kwargs)
+        monkeypatch.setattr(dataSource, "_api_client", apiClient)
+
+        return apiClient
+
+    return install
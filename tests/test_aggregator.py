@@ -0,0 +1,76 @@
+import copy
+
+from pygazpar.aggregator import FrequencyAggregator
+from pygazpar.datasource import FrequencyConverter
+from pygazpar.enum import Frequency
+from pygazpar.jsonparser import JsonParser
+
+
+class TestFrequencyAggregator:
+
+    # ------------------------------------------------------
+    @classmethod
+    def setup_class(cls):
+        """setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        with open("tests/resources/donnees_informatives.json", mode="r", encoding="utf-8") as consumptionJsonFile:
+            with open("tests/resources/temperatures.json", mode="r", encoding="utf-8") as temperatureJsonFile:
+                cls._daily = JsonParser.parse(consumptionJsonFile.read(), temperatureJsonFile.read(), "22423299474865")
+
+    # ------------------------------------------------------
+    def test_same_as_converter(self):
+
+        aggregator = FrequencyAggregator(TestFrequencyAggregator._daily)
+
+        assert aggregator.computeWeekly() == FrequencyConverter.computeWeekly(TestFrequencyAggregator._daily)
+        assert aggregator.computeMonthly() == FrequencyConverter.computeMonthly(TestFrequencyAggregator._daily)
+        assert aggregator.computeYearly() == FrequencyConverter.computeYearly(TestFrequencyAggregator._daily)
+
+    # ------------------------------------------------------
+    def test_incremental_append(self):
+
+        daily = TestFrequencyAggregator._daily
+
+        aggregator = FrequencyAggregator(daily[:400])
+
+        for i in range(400, len(daily)):
+            modified = aggregator.update([daily[i]])
+            assert len(modified[Frequency.WEEKLY]) == 1
+            assert len(modified[Frequency.MONTHLY]) == 1
+            assert len(modified[Frequency.YEARLY]) == 1
+
+        assert aggregator.get(Frequency.DAILY) == daily
+        assert aggregator.computeWeekly() == FrequencyConverter.computeWeekly(daily)
+        assert aggregator.computeMonthly() == FrequencyConverter.computeMonthly(daily)
+        assert aggregator.computeYearly() == FrequencyConverter.computeYearly(daily)
+
+    # ------------------------------------------------------
+    def test_correction(self):
+
+        daily = copy.deepcopy(TestFrequencyAggregator._daily)
+
+        aggregator = FrequencyAggregator(daily)
+
+        # Correct the first day of a month (it holds the minimum start index of its buckets).
+        correction = dict(daily[32])
+        correction["start_index_m3"] = correction["start_index_m3"] - 5
+        correction["volume_m3"] = correction["volume_m3"] + 5
+        correction["energy_kwh"] = correction["energy_kwh"] + 50
+        daily[32] = correction
+
+        modified = aggregator.update([correction])
+
+        assert modified[Frequency.MONTHLY] == ["Janvier 2020"]
+        assert aggregator.computeWeekly() == FrequencyConverter.computeWeekly(daily)
+        assert aggregator.computeMonthly() == FrequencyConverter.computeMonthly(daily)
+        assert aggregator.computeYearly() == FrequencyConverter.computeYearly(daily)
+
+    # ------------------------------------------------------
+    def test_empty(self):
+
+        aggregator = FrequencyAggregator()
+
+        assert len(aggregator.computeWeekly()) == 0
+        assert len(aggregator.computeMonthly()) == 0
+        assert len(aggregator.computeYearly()) == 0
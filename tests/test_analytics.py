@@ -0,0 +1,188 @@
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+import pytest
+
+from pygazpar.analytics import ConsumptionAnalytics
+from pygazpar.enum import PropertyName
+from pygazpar.readingstore import DailyReadingStore
+
+START_DATE = date(2020, 1, 1)
+
+END_DATE = date(2023, 12, 31)
+
+DAYS = (END_DATE - START_DATE).days + 1
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _temperatures(pceCount: int, seed: int = 0) -> np.ndarray:
+
+    dayOfYear = np.arange(DAYS) % 365
+
+    return (
+        11.0
+        - 8.0 * np.cos(2 * np.pi * (dayOfYear - 15) / 365)
+        + np.random.default_rng(seed).normal(0.0, 3.0, (pceCount, DAYS))
+    )
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _daily(energy: np.ndarray, temperature: np.ndarray, firstDay: int = 0) -> list[dict[str, Any]]:
+
+    return [
+        {
+            PropertyName.TIME_PERIOD.value: (START_DATE + timedelta(days=firstDay + day)).strftime("%d/%m/%Y"),
+            PropertyName.ENERGY.value: None if np.isnan(energy[day]) else float(energy[day]),
+            PropertyName.TEMPERATURE.value: None if np.isnan(temperature[day]) else float(temperature[day]),
+        }
+        for day in range(len(energy))
+    ]
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestConsumptionAnalytics:
+
+    # ------------------------------------------------------
+    def test_degree_days(self):
+
+        analytics = ConsumptionAnalytics(
+            ["1", "2"], START_DATE, np.zeros((2, 3)), np.array([[20.0, 18.0, 5.5], [np.nan, -2.0, 10.0]])
+        )
+
+        np.testing.assert_array_equal(analytics.degree_days, [[0.0, 0.0, 12.5], [np.nan, 20.0, 8.0]])
+
+        analytics = ConsumptionAnalytics(["1"], START_DATE, np.zeros((1, 2)), np.array([[14.0, 20.0]]), 16.0)
+
+        np.testing.assert_array_equal(analytics.degree_days, [[2.0, 0.0]])
+        assert analytics.end_date == date(2020, 1, 2)
+
+        with pytest.raises(ValueError):
+            ConsumptionAnalytics(["1", "2"], START_DATE, np.zeros((1, 3)), np.zeros((1, 3)))
+
+    # ------------------------------------------------------
+    def test_energy_signature(self):
+
+        temperature = _temperatures(3)
+        degreeDays = np.maximum(18.0 - temperature, 0.0)
+
+        slope = np.array([[2.0], [5.0], [8.0]])
+        baseLoad = np.array([[4.0], [10.0], [0.0]])
+        energy = baseLoad + slope * degreeDays + np.random.default_rng(1).normal(0.0, 0.5, degreeDays.shape)
+
+        # Missing days.
+        energy[0, 100:200] = np.nan
+        temperature[1, 300:320] = np.nan
+
+        analytics = ConsumptionAnalytics(["1", "2", "3"], START_DATE, energy, temperature)
+
+        kwhPerDegreeDay, base = analytics.energy_signature()
+
+        np.testing.assert_allclose(kwhPerDegreeDay, slope[:, 0], atol=0.02)
+        np.testing.assert_allclose(base, baseLoad[:, 0], atol=0.2)
+
+        # On a range.
+        np.testing.assert_allclose(
+            analytics.kwh_per_degree_day(date(2022, 1, 1), date(2022, 12, 31)), slope[:, 0], atol=0.05
+        )
+
+        # Not enough days.
+        assert np.isnan(analytics.kwh_per_degree_day(date(2022, 1, 1), date(2022, 1, 10))).all()
+
+    # ------------------------------------------------------
+    def test_normalised_consumption(self):
+
+        # The same PCE, through a cold year and a mild year.
+        temperature = np.tile(11.0 - 8.0 * np.cos(2 * np.pi * (np.arange(DAYS) % 365 - 15) / 365), (1, 1))
+        temperature[0, 366:731] -= 3.0
+        temperature[0, 731:1096] += 3.0
+        energy = 5.0 + 4.0 * np.maximum(18.0 - temperature, 0.0)
+
+        analytics = ConsumptionAnalytics(["1"], START_DATE, energy, temperature)
+
+        comparison = analytics.year_over_year()
+
+        assert comparison.years.tolist() == [2020, 2021, 2022, 2023]
+        np.testing.assert_array_equal(comparison.coverage, [[1.0, 1.0, 1.0, 1.0]])
+
+        # The raw consumption changes with the weather, not the normalised one.
+        assert comparison.energy[0, 1] > comparison.energy[0, 0] > comparison.energy[0, 2]
+        assert np.isnan(comparison.change[0, 0])
+        np.testing.assert_allclose(comparison.change[0, 1:], 0.0, atol=0.01)
+        np.testing.assert_allclose(
+            comparison.degree_days[0],
+            [
+                analytics.degree_days[0, start:end].sum()
+                for start, end in [(0, 366), (366, 731), (731, 1096), (1096, DAYS)]
+            ],
+        )
+
+        # The rolling mean is flat once the window is full.
+        rolling = analytics.rolling_normalised(30)
+
+        assert np.isnan(rolling[0, :14]).all()
+        np.testing.assert_allclose(rolling[0, 400], analytics.normalised_energy()[0, 371:401].mean())
+
+        with pytest.raises(ValueError):
+            analytics.rolling_normalised(0)
+
+    # ------------------------------------------------------
+    def test_normal_degree_days(self):
+
+        temperature = np.full((1, DAYS), np.nan)
+
+        # 29/02/2020 and 01/03 of every year.
+        temperature[0, 59] = 8.0
+        for year in range(2020, 2024):
+            temperature[0, (date(year, 3, 1) - START_DATE).days] = 10.0 + year - 2020
+
+        normal = ConsumptionAnalytics(["1"], START_DATE, np.zeros((1, DAYS)), temperature).normal_degree_days()
+
+        assert normal.shape == (1, 366)
+        assert normal[0, 59] == 10.0
+        assert normal[0, 60] == 6.5
+        assert np.isnan(normal[0, 0])
+
+    # ------------------------------------------------------
+    def test_from_readings(self):
+
+        temperature = _temperatures(2)
+        energy = 5.0 + 4.0 * np.maximum(18.0 - temperature, 0.0)
+        energy[1, :10] = np.nan
+
+        # The second PCE starts later: the arrays cover the days of all the PCEs.
+        analytics = ConsumptionAnalytics.from_readings(
+            {"1": _daily(energy[0], temperature[0]), "2": _daily(energy[1, 5:], temperature[1, 5:], 5)}
+        )
+
+        assert analytics.pce_identifiers == ["1", "2"]
+        assert (analytics.start_date, analytics.end_date) == (START_DATE, END_DATE)
+        np.testing.assert_array_equal(analytics.energy[0], energy[0])
+        assert np.isnan(analytics.temperature[1, :5]).all()
+        np.testing.assert_array_equal(analytics.temperature[1, 5:], temperature[1, 5:])
+
+        # Unusual time periods.
+        analytics = ConsumptionAnalytics.from_readings(
+            {"1": [{PropertyName.TIME_PERIOD.value: " 02/01/2020", PropertyName.ENERGY.value: 1}]}
+        )
+
+        assert analytics.start_date == date(2020, 1, 2)
+
+        with pytest.raises(ValueError):
+            ConsumptionAnalytics.from_readings({"1": [{PropertyName.TIME_PERIOD.value: "31/02/2020"}]})
+
+    # ------------------------------------------------------
+    def test_from_store(self, tmp_path):
+
+        temperature = _temperatures(1)
+        energy = 5.0 + 4.0 * np.maximum(18.0 - temperature, 0.0)
+
+        store = DailyReadingStore(str(tmp_path))
+        store.write("1", _daily(energy[0], temperature[0])[10:])
+
+        analytics = ConsumptionAnalytics.from_store(store, None, START_DATE, END_DATE)
+
+        assert analytics.pce_identifiers == ["1"]
+        assert np.isnan(analytics.energy[0, :10]).all()
+        np.testing.assert_array_equal(analytics.energy[0, 10:], energy[0, 10:])
+        np.testing.assert_allclose(analytics.kwh_per_degree_day(), [4.0])
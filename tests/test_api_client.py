@@ -1,11 +1,29 @@
+import io
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 
 import pytest
+from requests import Response, Session
 
 from pygazpar.api_client import APIClient, ConsumptionType, Frequency, ServerError
 
 
+# ------------------------------------------------------------------------------------------------------------
+class _OfflineAPIClient(APIClient):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.login_count = 0
+        self.__countLock = threading.Lock()
+
+    def _authenticate(self, session: Session):
+        with self.__countLock:
+            self.login_count += 1
+
+
 class TestAPIClient:
 
     # ------------------------------------------------------
@@ -130,3 +148,177 @@ class TestAPIClient:
 
         with pytest.raises(ServerError, match="Le pce InvalidPceIdentifier n'existe pas !"):
             TestAPIClient._client.get_pce_meteo(end_date, 7, "InvalidPceIdentifier")
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _response(status_code: int, content_type: str, content: bytes, url: str) -> Response:
+
+    res = Response()
+    res.status_code = status_code
+    res.headers["Content-Type"] = content_type
+    res._content = content  # pylint: disable=protected-access
+    res.raw = io.BytesIO(content)
+    res.url = url
+
+    return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _ExpiringSession(Session):
+
+    # The first created session is already expired on the server side.
+    created_count = 0
+
+    def __init__(self):
+        super().__init__()
+        _ExpiringSession.created_count += 1
+        self.expired = _ExpiringSession.created_count == 1
+        self.responses = list[Response]()
+
+    def request(self, method, url, *_args, **_kwargs):  # type: ignore # pylint: disable=arguments-differ
+        if self.expired:
+            response = _response(
+                200,
+                "text/html; charset=utf-8",
+                b'<html><script>var oktaData = {"stateToken":"00abc"};</script></html>',
+                "https://connexion.grdf.fr/login",
+            )
+        else:
+            response = _response(200, "application/json", b'[{"idObject": "0123456789"}]', url)
+        self.responses.append(response)
+        return response
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _CountingSession(Session):
+
+    request_count = 0
+
+    def request(self, method, url, *_args, **_kwargs):  # type: ignore # pylint: disable=arguments-differ
+        _CountingSession.request_count += 1
+        return _response(200, "application/json", b"[]", url)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _CountingAPIClient(_OfflineAPIClient):
+
+    def _new_session(self) -> Session:
+        return _CountingSession()
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _ExpiringAPIClient(_OfflineAPIClient):
+
+    def _new_session(self) -> Session:
+        return _ExpiringSession()
+
+
+class TestAPIClientSession:
+
+    # ------------------------------------------------------
+    def test_pool_size(self):
+
+        client = _OfflineAPIClient("username", "password", pool_size=32)
+
+        client.login()
+
+        adapter = client._session.get_adapter("https://monespace.grdf.fr/api")  # type: ignore # pylint: disable=protected-access
+
+        assert adapter._pool_maxsize == 32  # type: ignore # pylint: disable=protected-access
+        assert client._session.headers["Accept-Encoding"] == "gzip, deflate"  # type: ignore # pylint: disable=protected-access
+
+        client.logout()
+
+        assert client.is_logged_in() is False
+
+    # ------------------------------------------------------
+    def test_concurrent_relogin(self):
+
+        client = _OfflineAPIClient("username", "password", thread_safe=True)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: client.login(), range(8)))
+
+        assert client.login_count == 1
+
+        expired_session = client._session  # pylint: disable=protected-access
+
+        closed_sessions = list[Session]()
+        expired_session.close = lambda: closed_sessions.append(expired_session)  # type: ignore
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: client.relogin(expired_session), range(8)))
+
+        # Only the first thread logs in again, the others reuse its session.
+        assert client.login_count == 2
+        assert client._session is not expired_session  # pylint: disable=protected-access
+
+        # The previous session is closed once, by the thread that replaced it.
+        assert closed_sessions == [expired_session]
+
+        client.relogin()
+
+        assert client.login_count == 3
+
+    # ------------------------------------------------------
+    def test_session_expired(self):
+
+        _ExpiringSession.created_count = 0
+
+        client = _ExpiringAPIClient("username", "password")
+
+        client.login()
+
+        expired_session = client._session  # pylint: disable=protected-access
+
+        # The request is replayed with a new session instead of being retried.
+        pce_list = client.get_pce_list()
+
+        assert pce_list == [{"idObject": "0123456789"}]
+        assert client.login_count == 2
+
+        # The rejected response has been closed.
+        assert expired_session.responses[0].raw.closed  # type: ignore
+
+    # ------------------------------------------------------
+    def test_session_expired_detection(self):
+
+        api_url = "https://monespace.grdf.fr/api/e-conso/pce"
+
+        assert APIClient._is_session_expired(  # pylint: disable=protected-access
+            _response(401, "application/json", b"{}", api_url)
+        )
+        assert APIClient._is_session_expired(  # pylint: disable=protected-access
+            _response(200, "text/html", b"<html></html>", "https://connexion.grdf.fr/oauth2/authorize")
+        )
+        assert not APIClient._is_session_expired(  # pylint: disable=protected-access
+            _response(200, "application/json", b"[]", api_url)
+        )
+        assert not APIClient._is_session_expired(  # pylint: disable=protected-access
+            _response(200, "text/html", b"<html>Error</html>", api_url)
+        )
+
+    # ------------------------------------------------------
+    def test_keep_alive(self):
+
+        _CountingSession.request_count = 0
+
+        client = _CountingAPIClient("username", "password", keep_alive_interval=0.02, session_max_age=0.15)
+
+        client.login()
+
+        time.sleep(0.4)
+
+        keep_alive = client._keep_alive  # pylint: disable=protected-access
+
+        assert keep_alive is not None and keep_alive.is_alive()
+
+        # Periodic calls and proactive login before the maximum age.
+        assert _CountingSession.request_count > 0
+        assert client.login_count >= 2
+        assert client.session_age() < 0.15
+
+        client.logout()
+
+        assert not keep_alive.is_alive()
+        assert client.is_logged_in() is False
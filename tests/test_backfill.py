@@ -0,0 +1,166 @@
+from datetime import date, timedelta
+from typing import Any, Optional
+
+import pytest
+
+from pygazpar.backfill import BackfillCheckpoint, BackfillEngine, BackfillError
+from pygazpar.datasource import MemoryMappedDataSource
+from tests.conftest import FakeDataSource
+
+PCE_IDENTIFIERS = ["22423299474865", "22423299474866"]
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _HistoryDataSource(FakeDataSource):
+    """Daily readings of every day, failing on ranges larger than maxDays days and on the given days."""
+
+    # ------------------------------------------------------
+    def __init__(self, maxDays: int = 10000):
+
+        super().__init__(PCE_IDENTIFIERS)
+
+        self.maxDays = maxDays
+        self.failingDays = set[date]()
+
+    # ------------------------------------------------------
+    def daily_readings(self, pceIdentifier: str, startDate: date, endDate: date) -> list[dict[str, Any]]:
+
+        if (endDate - startDate).days >= self.maxDays:
+            raise ConnectionError("500 Server Error")
+        if any(startDate <= day <= endDate for day in self.failingDays):
+            raise ConnectionError("Unavailable")
+
+        return super().daily_readings(pceIdentifier, startDate, endDate)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestBackfillEngine:
+
+    START_DATE = date(2015, 1, 1)
+
+    END_DATE = date(2024, 12, 31)
+
+    # ------------------------------------------------------
+    def test_run(self, tmp_path):
+
+        dataSource = _HistoryDataSource()
+        checkpoint = BackfillCheckpoint(str(tmp_path / "backfill.json"))
+        engine = BackfillEngine(
+            MemoryMappedDataSource(str(tmp_path / "store"), dataSource), checkpoint, window_days=365, max_workers=3
+        )
+
+        days = (self.END_DATE - self.START_DATE).days + 1
+
+        assert engine.run(None, self.START_DATE, self.END_DATE) == 2 * days
+
+        # 11 windows per PCE, the most recent first, at most 3 at a time.
+        assert len(dataSource.loads) == 22
+        assert sorted(dataSource.loads[:2]) == [(pce, date(2024, 1, 2), self.END_DATE) for pce in PCE_IDENTIFIERS]
+        assert dataSource.max_running <= 3
+
+        for pce_identifier in PCE_IDENTIFIERS:
+            assert checkpoint.ranges(pce_identifier) == [(self.START_DATE, self.END_DATE)]
+            assert len(engine.checkpoint.ranges(pce_identifier)) == 1
+
+        store = MemoryMappedDataSource(str(tmp_path / "store")).store
+        assert store.missing_days(PCE_IDENTIFIERS[0], self.START_DATE, self.END_DATE) == []
+
+        # Nothing left to do.
+        assert engine.run(None, self.START_DATE, self.END_DATE) == 0
+        assert len(dataSource.loads) == 22
+
+    # ------------------------------------------------------
+    def test_resume(self, tmp_path):
+
+        dataSource = _HistoryDataSource()
+        dataSource.failingDays.add(date(2020, 6, 1))
+
+        engine = BackfillEngine(
+            MemoryMappedDataSource(str(tmp_path / "store"), dataSource),
+            BackfillCheckpoint(str(tmp_path / "backfill.json")),
+            max_attempts=2,
+            min_window_days=400,
+            retry_delay=0,
+        )
+
+        with pytest.raises(BackfillError) as error:
+            engine.run(PCE_IDENTIFIERS[:1], self.START_DATE, self.END_DATE)
+
+        failedWindow = (PCE_IDENTIFIERS[0], date(2020, 1, 3), date(2021, 1, 1))
+        assert list(error.value.errors) == [failedWindow]
+
+        # Restarted from the checkpoint file: only the failed window is loaded again.
+        dataSource.failingDays.clear()
+        dataSource.loads.clear()
+
+        engine = BackfillEngine(
+            MemoryMappedDataSource(str(tmp_path / "store"), dataSource),
+            BackfillCheckpoint(str(tmp_path / "backfill.json")),
+        )
+
+        assert engine.run(PCE_IDENTIFIERS[:1], self.START_DATE, self.END_DATE) == 365
+        assert dataSource.loads == [failedWindow]
+        assert engine.checkpoint.ranges(PCE_IDENTIFIERS[0]) == [(self.START_DATE, self.END_DATE)]
+
+    # ------------------------------------------------------
+    def test_unpublished_days(self, tmp_path):
+
+        dataSource = _HistoryDataSource()
+        checkpoint = BackfillCheckpoint(str(tmp_path / "backfill.json"))
+        engine = BackfillEngine(MemoryMappedDataSource(str(tmp_path / "store"), dataSource), checkpoint)
+
+        endDate = date.today()
+        startDate = endDate - timedelta(days=99)
+        lastPublishedDate = endDate - timedelta(days=MemoryMappedDataSource.PUBLICATION_DELAY_DAYS)
+
+        engine.run(PCE_IDENTIFIERS[:1], startDate, endDate)
+
+        # The days not published yet are not checkpointed: the window is loaded again by the next run.
+        assert checkpoint.ranges(PCE_IDENTIFIERS[0]) == [(startDate, lastPublishedDate)]
+        assert engine.plan(PCE_IDENTIFIERS[:1], startDate, endDate) == [(PCE_IDENTIFIERS[0], startDate, endDate)]
+
+        # A window of unpublished days only is never checkpointed.
+        engine.run(PCE_IDENTIFIERS[:1], lastPublishedDate + timedelta(days=1), endDate)
+        assert checkpoint.ranges(PCE_IDENTIFIERS[0]) == [(startDate, lastPublishedDate)]
+
+    # ------------------------------------------------------
+    def test_split(self, tmp_path):
+
+        # Ranges of more than 100 days fail: the windows are split until they load.
+        dataSource = _HistoryDataSource(maxDays=100)
+
+        engine = BackfillEngine(
+            MemoryMappedDataSource(str(tmp_path / "store"), dataSource),
+            BackfillCheckpoint(str(tmp_path / "backfill.json")),
+            window_days=366,
+            max_workers=1,
+            retry_delay=0,
+        )
+
+        assert engine.run(PCE_IDENTIFIERS[:1], date(2024, 1, 1), self.END_DATE) == 366
+
+        assert [(end - start).days + 1 for _, start, end in dataSource.loads] == [366, 183, 183, 92, 91, 92, 91]
+
+    # ------------------------------------------------------
+    def test_stop(self, tmp_path):
+
+        dataSource = _HistoryDataSource()
+        engine: Optional[BackfillEngine] = None
+
+        # Stopped during the first window.
+        class _StoppingDataSource(MemoryMappedDataSource):
+
+            def fill(self, pceIdentifier: str, startDate: date, endDate: date) -> int:
+
+                assert engine is not None
+                engine.stop()
+                return super().fill(pceIdentifier, startDate, endDate)
+
+        engine = BackfillEngine(
+            _StoppingDataSource(str(tmp_path / "store"), dataSource),
+            BackfillCheckpoint(str(tmp_path / "backfill.json")),
+            max_workers=1,
+        )
+
+        assert engine.run(PCE_IDENTIFIERS, self.START_DATE, self.END_DATE) == 365
+        assert len(engine.plan(PCE_IDENTIFIERS, self.START_DATE, self.END_DATE)) == 21
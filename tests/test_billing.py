@@ -0,0 +1,185 @@
+import json
+from datetime import date, timedelta
+from typing import Any
+
+from pygazpar.api_client import ConsumptionType
+from pygazpar.billing import BillingReconciler
+from pygazpar.datasource import PublishedJsonFileDataSource, PublishedJsonWebDataSource
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.jsonparser import JsonParser
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _daily(firstDay: date, volumes: list[float]) -> list[dict[str, Any]]:
+
+    return [
+        {
+            PropertyName.TIME_PERIOD.value: (firstDay + timedelta(days=day)).strftime("%d/%m/%Y"),
+            PropertyName.VOLUME.value: volume,
+            PropertyName.ENERGY.value: volume * 11,
+        }
+        for day, volume in enumerate(volumes)
+    ]
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _billing(timePeriod: str, volume: float) -> dict[str, Any]:
+
+    return {
+        PropertyName.TIME_PERIOD.value: timePeriod,
+        PropertyName.VOLUME.value: volume,
+        PropertyName.ENERGY.value: volume * 11,
+    }
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestBilling:
+
+    # ------------------------------------------------------
+    def test_parse_published(self):
+
+        with open("tests/resources/donnees_publiees.json", mode="rb") as jsonFile:
+            billing = JsonParser.parse_published(jsonFile.read(), PCE_IDENTIFIER)
+
+        assert len(billing) == 87
+        assert billing[0][PropertyName.TIME_PERIOD.value] == "Du 10/10/2017 au 08/04/2018"
+        assert billing[0][PropertyName.START_INDEX.value] == 5089
+        assert billing[0][PropertyName.END_INDEX.value] == 7114
+        assert billing[0][PropertyName.VOLUME.value] == 2025
+        assert billing[0][PropertyName.ENERGY.value] == 22417
+        assert billing[-1][PropertyName.TIME_PERIOD.value] == "Du 01/11/2022 au 02/11/2022"
+        assert BillingReconciler.period_of(billing[-1]) == (
+            date(2022, 11, 1).toordinal(),
+            date(2022, 11, 2).toordinal(),
+        )
+
+    # ------------------------------------------------------
+    def test_merge(self):
+
+        daily = _daily(date(2022, 1, 1), [1, 2, 3, 4, 5, 6])
+
+        billing = [
+            # Not sorted.
+            _billing("Du 04/01/2022 au 05/01/2022", 10),
+            _billing("Du 30/12/2021 au 02/01/2022", 5),
+            _billing("Du 02/01/2022 au 03/01/2022", 6),
+        ]
+
+        merged = BillingReconciler.merge(list(reversed(daily)), billing)
+
+        assert [reading[PropertyName.TIME_PERIOD.value] for reading in merged] == [
+            reading[PropertyName.TIME_PERIOD.value] for reading in daily
+        ]
+        assert [reading[PropertyName.BILLING_PERIOD.value] for reading in merged] == [
+            "Du 30/12/2021 au 02/01/2022",
+            "Du 30/12/2021 au 02/01/2022",
+            "Du 02/01/2022 au 03/01/2022",
+            "Du 04/01/2022 au 05/01/2022",
+            "Du 04/01/2022 au 05/01/2022",
+            None,
+        ]
+
+        # Incomplete coverage: no difference.
+        assert merged[0][PropertyName.BILLING_VOLUME_DIFFERENCE.value] is None
+
+        # Overlapping period: its first day already belongs to the period before.
+        assert merged[2][PropertyName.BILLING_VOLUME_DIFFERENCE.value] is None
+
+        assert merged[3][PropertyName.BILLING_VOLUME_DIFFERENCE.value] == 1
+        assert merged[3][PropertyName.BILLING_ENERGY_DIFFERENCE.value] == 11
+        assert merged[5][PropertyName.BILLING_VOLUME_DIFFERENCE.value] is None
+
+        # The input readings are left unchanged.
+        assert PropertyName.BILLING_PERIOD.value not in daily[0]
+
+        assert BillingReconciler.merge(daily, []) == [
+            {
+                **reading,
+                PropertyName.BILLING_PERIOD.value: None,
+                PropertyName.BILLING_VOLUME_DIFFERENCE.value: None,
+                PropertyName.BILLING_ENERGY_DIFFERENCE.value: None,
+            }
+            for reading in daily
+        ]
+
+    # ------------------------------------------------------
+    def test_multi_year(self):
+
+        # 10 years of daily readings billed every 2 months.
+        firstDay = date(2013, 1, 1)
+        daily = _daily(firstDay, [1.0] * 3653)
+
+        billing = []
+        day = firstDay
+        while day < firstDay + timedelta(days=3653):
+            lastDay = min(day + timedelta(days=60), firstDay + timedelta(days=3652))
+            timePeriod = f"Du {day.strftime('%d/%m/%Y')} au {lastDay.strftime('%d/%m/%Y')}"
+            billing.append(_billing(timePeriod, (lastDay - day).days + 1))
+            day = lastDay + timedelta(days=1)
+
+        merged = BillingReconciler.merge(daily, billing)
+
+        assert len(merged) == 3653
+        assert all(reading[PropertyName.BILLING_PERIOD.value] is not None for reading in merged)
+        assert all(reading[PropertyName.BILLING_VOLUME_DIFFERENCE.value] == 0 for reading in merged)
+
+    # ------------------------------------------------------
+    def test_json_file_data_source(self):
+
+        dataSource = PublishedJsonFileDataSource(
+            "tests/resources/donnees_informatives.json",
+            "tests/resources/temperatures.json",
+            "tests/resources/donnees_publiees.json",
+        )
+
+        data = dataSource.load(
+            PCE_IDENTIFIER, date(2019, 11, 30), date(2022, 11, 29), [Frequency.DAILY, Frequency.MONTHLY]
+        )
+
+        daily = data[Frequency.DAILY.value]
+
+        assert len(daily) == 1096
+
+        october = [reading for reading in daily if reading[PropertyName.TIME_PERIOD.value].endswith("10/2022")]
+
+        assert october[0][PropertyName.BILLING_PERIOD.value] == "Du 01/10/2022 au 02/10/2022"
+        assert october[-1][PropertyName.BILLING_PERIOD.value] == "Du 03/10/2022 au 31/10/2022"
+
+        # Published volume minus the sum of the daily volumes of the period.
+        volume = sum(reading[PropertyName.VOLUME.value] for reading in october[2:])
+        assert october[-1][PropertyName.BILLING_VOLUME_DIFFERENCE.value] == 42 - volume
+
+        # The first billing period starts before the daily readings.
+        assert daily[0][PropertyName.BILLING_PERIOD.value] is not None
+        assert daily[0][PropertyName.BILLING_VOLUME_DIFFERENCE.value] is None
+
+        # The other frequencies are not annotated.
+        assert PropertyName.BILLING_PERIOD.value not in data[Frequency.MONTHLY.value][0]
+
+    # ------------------------------------------------------
+    def test_json_data_source(self, fake_api_client):
+
+        with open("tests/resources/donnees_informatives.json", mode="r", encoding="utf-8") as jsonFile:
+            consumption = json.load(jsonFile)
+
+        with open("tests/resources/donnees_publiees.json", mode="r", encoding="utf-8") as jsonFile:
+            published = json.load(jsonFile)
+
+        dataSource = PublishedJsonWebDataSource("username", "password")
+        apiClient = fake_api_client(dataSource, consumption=consumption, published=published)
+
+        data = dataSource.load(PCE_IDENTIFIER, date(2019, 11, 30), date(2022, 11, 29), [Frequency.DAILY])
+
+        assert [request.consumption_type for request in apiClient.consumption_requests] == [
+            ConsumptionType.INFORMATIVE,
+            ConsumptionType.PUBLISHED,
+        ]
+        assert len(data[Frequency.DAILY.value]) == 1096
+        assert data[Frequency.DAILY.value][-1][PropertyName.BILLING_PERIOD.value] is None
+
+        # No published data.
+        apiClient.published = {}
+
+        assert dataSource.load_published(PCE_IDENTIFIER, date(2019, 11, 30), date(2022, 11, 29)) == []
@@ -0,0 +1,326 @@
+import multiprocessing
+import time
+from datetime import date
+from typing import Optional
+
+import pytest
+
+from pygazpar.cache import MemoryResultCache, SharedMemoryResultCache
+from pygazpar.client import Client
+from pygazpar.datasource import (
+    FrequencyConverter,
+    JsonFileDataSource,
+    MeterReadingsByFrequency,
+)
+from pygazpar.enum import Frequency, PropertyName
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _CountingDataSource(JsonFileDataSource):
+
+    # ------------------------------------------------------
+    def __init__(self):
+
+        super().__init__("tests/resources/donnees_informatives.json", "tests/resources/temperatures.json")
+        self.load_count = 0
+
+    # ------------------------------------------------------
+    def load(
+        self, pceIdentifier: str, startDate: date, endDate: date, frequencies: Optional[list[Frequency]] = None
+    ) -> MeterReadingsByFrequency:
+
+        self.load_count += 1
+
+        return super().load(pceIdentifier, startDate, endDate, frequencies)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestMemoryResultCache:
+
+    # ------------------------------------------------------
+    def test_hit_and_miss(self):
+
+        dataSource = _CountingDataSource()
+        client = Client(dataSource, MemoryResultCache())
+
+        first = client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY])
+        second = client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY])
+
+        assert dataSource.load_count == 1
+        assert second == first
+        assert client.cache is not None
+        assert (client.cache.hits, client.cache.misses) == (1, 1)
+
+        # The callers get copies of the cached readings.
+        volume = first[Frequency.DAILY.value][0][PropertyName.VOLUME.value]
+        first[Frequency.DAILY.value][0][PropertyName.VOLUME.value] = -1
+        second[Frequency.DAILY.value][0][PropertyName.VOLUME.value] = -1
+        third = client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY])
+
+        assert third[Frequency.DAILY.value][0][PropertyName.VOLUME.value] == volume
+
+        # Another PCE is not served from the cache.
+        assert client.cache.get("other", date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY]) is None
+
+    # ------------------------------------------------------
+    def test_sub_range(self):
+
+        dataSource = _CountingDataSource()
+        client = Client(dataSource, MemoryResultCache())
+
+        client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2021, 12, 31))
+
+        res = client.load_date_range(
+            PCE_IDENTIFIER, date(2021, 3, 1), date(2021, 5, 31), [Frequency.DAILY, Frequency.MONTHLY]
+        )
+
+        assert dataSource.load_count == 1
+
+        assert len(res[Frequency.DAILY.value]) == 92
+        assert res[Frequency.DAILY.value][0][PropertyName.TIME_PERIOD.value] == "01/03/2021"
+        assert res[Frequency.DAILY.value][-1][PropertyName.TIME_PERIOD.value] == "31/05/2021"
+        assert [reading[PropertyName.TIME_PERIOD.value] for reading in res[Frequency.MONTHLY.value]] == [
+            "Mars 2021",
+            "Avril 2021",
+            "Mai 2021",
+        ]
+        assert res[Frequency.MONTHLY.value] == FrequencyConverter.computeMonthly(res[Frequency.DAILY.value])
+
+        # A range overlapping the cached one goes to the data source.
+        client.load_date_range(PCE_IDENTIFIER, date(2021, 12, 1), date(2022, 1, 31), [Frequency.DAILY])
+
+        assert dataSource.load_count == 2
+
+    # ------------------------------------------------------
+    def test_sub_range_without_daily(self):
+
+        dataSource = _CountingDataSource()
+        client = Client(dataSource, MemoryResultCache())
+
+        client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2021, 12, 31), [Frequency.MONTHLY])
+        client.load_date_range(PCE_IDENTIFIER, date(2021, 1, 1), date(2021, 12, 31), [Frequency.MONTHLY])
+
+        assert dataSource.load_count == 2
+
+    # ------------------------------------------------------
+    def test_ttl(self):
+
+        dataSource = _CountingDataSource()
+        client = Client(dataSource, MemoryResultCache(ttl=0.05))
+
+        client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 1, 31), [Frequency.DAILY])
+        time.sleep(0.1)
+        client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 1, 31), [Frequency.DAILY])
+
+        assert dataSource.load_count == 2
+
+    # ------------------------------------------------------
+    def test_lru_eviction(self):
+
+        cache = MemoryResultCache(max_entries=2)
+        client = Client(_CountingDataSource(), cache)
+
+        january = (date(2020, 1, 1), date(2020, 1, 31))
+        february = (date(2020, 2, 1), date(2020, 2, 29))
+        march = (date(2020, 3, 1), date(2020, 3, 31))
+
+        client.load_date_range(PCE_IDENTIFIER, *january, [Frequency.DAILY])
+        client.load_date_range(PCE_IDENTIFIER, *february, [Frequency.DAILY])
+        client.load_date_range(PCE_IDENTIFIER, *january, [Frequency.DAILY])
+        client.load_date_range(PCE_IDENTIFIER, *march, [Frequency.DAILY])
+
+        # February is the least recently used.
+        assert cache.evictions == 1
+        assert cache.get(PCE_IDENTIFIER, *january, [Frequency.DAILY]) is not None
+        assert cache.get(PCE_IDENTIFIER, *february, [Frequency.DAILY]) is None
+        assert cache.get(PCE_IDENTIFIER, *march, [Frequency.DAILY]) is not None
+
+    # ------------------------------------------------------
+    def test_memory_bound(self):
+
+        dataSource = _CountingDataSource()
+        data = dataSource.load(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 1, 31), [Frequency.DAILY])
+        size = MemoryResultCache.estimate_size(data)
+
+        cache = MemoryResultCache(max_bytes=size * 2)
+
+        for month in range(1, 4):
+            start = date(2020, month, 1)
+            cache.put(PCE_IDENTIFIER, start, start.replace(day=28), [Frequency.DAILY], data)
+
+        assert len(cache) == 2
+        assert cache.size <= size * 2
+        assert cache.stats()["evictions"] == 1
+
+        # A result larger than the bound is not cached.
+        cache = MemoryResultCache(max_bytes=size // 2)
+        cache.put(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 1, 31), [Frequency.DAILY], data)
+
+        assert len(cache) == 0
+
+    # ------------------------------------------------------
+    def test_invalid_parameters(self):
+
+        with pytest.raises(ValueError):
+            MemoryResultCache(max_entries=0)
+
+        with pytest.raises(ValueError):
+            MemoryResultCache(ttl=0)
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _readShared(path: str, queue: multiprocessing.Queue):
+
+    cache = SharedMemoryResultCache(path, max_entries=8, max_bytes=1024 * 1024)
+    data = cache.get(PCE_IDENTIFIER, date(2020, 3, 1), date(2020, 3, 31), [Frequency.DAILY])
+
+    queue.put((len(data[Frequency.DAILY.value]) if data is not None else None, cache.hits))
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _writeShared(path: str, count: int):
+
+    cache = SharedMemoryResultCache(path, max_entries=4, max_bytes=16 * 1024)
+
+    for version in range(count):
+        startDay = version % 3 + 1
+        readings = [
+            {PropertyName.TIME_PERIOD.value: f"{day:02d}/01/2020", PropertyName.VOLUME.value: version}
+            for day in range(startDay, 32)
+        ]
+        cache.put(
+            PCE_IDENTIFIER,
+            date(2020, 1, startDay),
+            date(2020, 1, 31),
+            [Frequency.DAILY],
+            {Frequency.DAILY.value: readings},
+        )
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestSharedMemoryResultCache:
+
+    # ------------------------------------------------------
+    def test_shared_between_processes(self, tmp_path):
+
+        path = str(tmp_path / "cache.bin")
+
+        dataSource = _CountingDataSource()
+        client = Client(dataSource, SharedMemoryResultCache(path, max_entries=8, max_bytes=1024 * 1024))
+
+        first = client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY])
+        second = client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY])
+
+        assert dataSource.load_count == 1
+        assert second == first
+
+        # Another process reads the entry (a sub-range).
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_readShared, args=(path, queue))
+        process.start()
+        process.join(30)
+
+        assert queue.get(timeout=5) == (31, 1)
+
+    # ------------------------------------------------------
+    def test_sub_range(self, tmp_path):
+
+        dataSource = _CountingDataSource()
+        client = Client(dataSource, SharedMemoryResultCache(str(tmp_path / "cache.bin")))
+
+        client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2021, 12, 31))
+
+        res = client.load_date_range(
+            PCE_IDENTIFIER, date(2021, 3, 1), date(2021, 5, 31), [Frequency.DAILY, Frequency.MONTHLY]
+        )
+
+        assert dataSource.load_count == 1
+        assert len(res[Frequency.DAILY.value]) == 92
+        assert res[Frequency.MONTHLY.value] == FrequencyConverter.computeMonthly(res[Frequency.DAILY.value])
+
+    # ------------------------------------------------------
+    def test_eviction(self, tmp_path):
+
+        dataSource = _CountingDataSource()
+        data = dataSource.load(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 1, 31), [Frequency.DAILY])
+
+        months = [(date(2020, month, 1), date(2020, month, 28)) for month in range(1, 5)]
+
+        # Evicted as the oldest entry.
+        cache = SharedMemoryResultCache(str(tmp_path / "slots.bin"), max_entries=2)
+        for month in months[:3]:
+            cache.put(PCE_IDENTIFIER, *month, [Frequency.DAILY], data)
+
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.get(PCE_IDENTIFIER, *months[0], [Frequency.DAILY]) is None
+        assert cache.get(PCE_IDENTIFIER, *months[2], [Frequency.DAILY]) == data
+
+        # Evicted as its readings are overwritten.
+        cache = SharedMemoryResultCache(str(tmp_path / "arena.bin"), max_bytes=int(cache.size * 0.75))
+        for month in months:
+            cache.put(PCE_IDENTIFIER, *month, [Frequency.DAILY], data)
+
+        assert len(cache) == 1
+        assert cache.evictions == 3
+        assert cache.get(PCE_IDENTIFIER, *months[3], [Frequency.DAILY]) == data
+
+        # The same key replaces its entry.
+        cache.put(PCE_IDENTIFIER, *months[3], [Frequency.DAILY], {Frequency.DAILY.value: []})
+
+        assert cache.get(PCE_IDENTIFIER, *months[3], [Frequency.DAILY]) == {Frequency.DAILY.value: []}
+
+        cache.clear()
+
+        assert len(cache) == 0
+
+    # ------------------------------------------------------
+    def test_ttl(self, tmp_path):
+
+        dataSource = _CountingDataSource()
+        client = Client(dataSource, SharedMemoryResultCache(str(tmp_path / "cache.bin"), ttl=0.05))
+
+        client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 1, 31), [Frequency.DAILY])
+        time.sleep(0.1)
+        client.load_date_range(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 1, 31), [Frequency.DAILY])
+
+        assert dataSource.load_count == 2
+
+    # ------------------------------------------------------
+    def test_concurrent_writer(self, tmp_path):
+
+        path = str(tmp_path / "cache.bin")
+        cache = SharedMemoryResultCache(path, max_entries=4, max_bytes=16 * 1024)
+
+        # The writer overwrites the arena over and over while the entries are read.
+        context = multiprocessing.get_context("spawn")
+        writer = context.Process(target=_writeShared, args=(path, 2000))
+        writer.start()
+
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            data = cache.get(PCE_IDENTIFIER, date(2020, 1, 3), date(2020, 1, 31), [Frequency.DAILY])
+            if data is not None:
+                # Never a mix of two writes.
+                assert len(data[Frequency.DAILY.value]) == 29
+                assert len({reading[PropertyName.VOLUME.value] for reading in data[Frequency.DAILY.value]}) == 1
+                reads += 1
+
+        writer.join()
+
+        assert writer.exitcode == 0
+        assert reads > 0
+
+    # ------------------------------------------------------
+    def test_invalid_parameters(self, tmp_path):
+
+        SharedMemoryResultCache(str(tmp_path / "cache.bin"), max_entries=8)
+
+        with pytest.raises(ValueError):
+            SharedMemoryResultCache(str(tmp_path / "cache.bin"), max_entries=16)
+
+        with pytest.raises(ValueError):
+            SharedMemoryResultCache(str(tmp_path / "other.bin"), ttl=0)
@@ -1,10 +1,19 @@
 import os
+from datetime import date
+from typing import Any
 
 import pytest
 
 from pygazpar.client import Client
-from pygazpar.datasource import ExcelWebDataSource, JsonWebDataSource, TestDataSource
-from pygazpar.enum import Frequency
+from pygazpar.datasource import (
+    ExcelWebDataSource,
+    JsonFileDataSource,
+    JsonWebDataSource,
+    TestDataSource,
+)
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.timeperiod import TimePeriod
+from tests.conftest import FakeDataSource
 
 
 class TestClient:  # pylint: disable=too-many-public-methods
@@ -64,7 +73,9 @@ class TestClient:  # pylint: disable=too-many-public-methods
     def test_hourly_live(self):
         data = TestClient._jsonClient.load_since(TestClient._pceIdentifier, 365, [Frequency.HOURLY])
 
-        assert len(data[Frequency.HOURLY.value]) == 0
+        # Hourly readings are available for some meters only.
+        for reading in data.get(Frequency.HOURLY.value, []):
+            assert len(reading[PropertyName.TIME_PERIOD.value]) == len("dd/mm/yyyy HH:MM")
 
     def test_one_day_jsonweb(self):
         data = TestClient._jsonClient.load_since(TestClient._pceIdentifier, 1, [Frequency.DAILY])
@@ -141,3 +152,76 @@ class TestClient:  # pylint: disable=too-many-public-methods
         data = TestClient._testClient.load_since(TestClient._pceIdentifier, 365, [Frequency.YEARLY])
 
         assert len(data[Frequency.YEARLY.value]) == 2
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _RangeDataSource(FakeDataSource):
+    """Serves the JSON sample file for the requested date range only."""
+
+    # ------------------------------------------------------
+    def __init__(self):
+
+        super().__init__()
+
+        self.daily = JsonFileDataSource(
+            "tests/resources/donnees_informatives.json", "tests/resources/temperatures.json"
+        ).load("22423299474865", date.min, date.max, [Frequency.DAILY])[Frequency.DAILY.value]
+
+    # ------------------------------------------------------
+    def daily_readings(self, pceIdentifier: str, startDate: date, endDate: date) -> list[dict[str, Any]]:
+
+        return TimePeriod.slice_daily(self.daily, startDate, endDate)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestClientIterReadings:
+
+    # ------------------------------------------------------
+    def test_daily(self):
+
+        dataSource = _RangeDataSource()
+        client = Client(dataSource)
+
+        readings = client.iter_readings("22423299474865", date(2020, 1, 1), date(2021, 12, 31), Frequency.DAILY, 30)
+
+        assert len(dataSource.loads) == 0
+
+        daily = list(readings)
+
+        assert daily == TimePeriod.slice_daily(dataSource.daily, date(2020, 1, 1), date(2021, 12, 31))
+        assert len(daily) == 731
+        assert len(dataSource.loads) == 25
+        assert all((end - start).days < 30 for _, start, end in dataSource.loads)
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("frequency", [Frequency.WEEKLY, Frequency.MONTHLY, Frequency.YEARLY])
+    def test_aligned_windows(self, frequency: Frequency):
+
+        dataSource = _RangeDataSource()
+        client = Client(dataSource)
+
+        readings = list(client.iter_readings("22423299474865", date(2020, 1, 1), date(2021, 12, 31), frequency, 45))
+
+        expected = client.load_date_range("22423299474865", date(2020, 1, 1), date(2021, 12, 31), [frequency])
+
+        # No period is split between two windows.
+        assert readings == expected[frequency.value]
+        for _, _, end in dataSource.loads[:-2]:
+            assert TimePeriod.last_day(end, frequency) == end
+
+    # ------------------------------------------------------
+    def test_unsliced_data_source(self):
+
+        # The file data source returns the whole file whatever the date range.
+        client = Client(
+            JsonFileDataSource("tests/resources/donnees_informatives.json", "tests/resources/temperatures.json")
+        )
+
+        daily = list(client.iter_readings("22423299474865", date(2021, 1, 1), date(2021, 6, 30), window_days=10))
+
+        assert len(daily) == 181
+        assert daily[0][PropertyName.TIME_PERIOD.value] == "01/01/2021"
+        assert daily[-1][PropertyName.TIME_PERIOD.value] == "30/06/2021"
+
+        with pytest.raises(ValueError):
+            next(client.iter_readings("22423299474865", date(2021, 1, 1), date(2021, 6, 30), window_days=0))
@@ -0,0 +1,230 @@
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from pygazpar.client import Client
+from pygazpar.daemon import PollingDaemon, PublicationSchedule
+from pygazpar.datasource import MeterReadings
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.sink import ISink, JsonLinesSink
+from tests.conftest import FakeDataSource
+
+PCE_IDENTIFIER = "22423299474865"
+
+# The gas day D is published the day after at 9:30.
+PUBLICATION_DELAY = timedelta(hours=9, minutes=30)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _PublishingDataSource(FakeDataSource):
+    """Daily readings published at PUBLICATION_DELAY after the end of their gas day (the simulated time)."""
+
+    # ------------------------------------------------------
+    def __init__(self, firstDay: date):
+
+        super().__init__([PCE_IDENTIFIER])
+
+        self.now = datetime.combine(firstDay, datetime.min.time())
+        self.firstDay = firstDay
+        self.corrections = dict[date, float]()
+
+    # ------------------------------------------------------
+    def daily_readings(self, pceIdentifier: str, startDate: date, endDate: date) -> list[dict[str, Any]]:
+
+        readings = list[dict[str, Any]]()
+        day = max(startDate, self.firstDay)
+        while (
+            day <= endDate
+            and datetime.combine(day + timedelta(days=1), datetime.min.time()) + PUBLICATION_DELAY <= self.now
+        ):
+            readings.append(
+                {
+                    PropertyName.TIME_PERIOD.value: day.strftime("%d/%m/%Y"),
+                    PropertyName.VOLUME.value: self.corrections.get(day, day.day),
+                    PropertyName.TIMESTAMP.value: self.now.isoformat(),
+                }
+            )
+            day += timedelta(days=1)
+
+        return readings
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _ListSink(ISink):
+
+    # ------------------------------------------------------
+    def __init__(self):
+
+        self.readings = list[tuple[str, dict[str, Any]]]()
+
+    # ------------------------------------------------------
+    def write(self, pceIdentifier: str, frequency: Frequency, readings: MeterReadings):
+
+        self.readings.extend((pceIdentifier, reading) for reading in readings)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestPollingDaemon:
+
+    # ------------------------------------------------------
+    def test_publication_time(self):
+
+        dataSource = _PublishingDataSource(date(2024, 1, 1))
+        sink = _ListSink()
+        daemon = PollingDaemon(Client(dataSource), sink, poll_days=3)
+
+        # 20 simulated days.
+        pollsByDay = dict[date, int]()
+        while dataSource.now < datetime(2024, 1, 21):
+            pollsByDay[dataSource.now.date()] = pollsByDay.get(dataSource.now.date(), 0) + 1
+            dataSource.now = daemon.run_pending(dataSource.now)
+
+        schedule = daemon.schedule(PCE_IDENTIFIER)
+
+        # Learned within the resolution of the polls.
+        assert schedule.typical_delay is not None
+        assert abs(schedule.typical_delay - PUBLICATION_DELAY) <= timedelta(minutes=30)
+
+        # Hourly polls while learning, then a few polls per day.
+        assert pollsByDay[date(2024, 1, 2)] == 24
+        assert all(pollsByDay[date(2024, 1, day)] <= 3 for day in range(10, 21))
+
+        # Each gas day is emitted once.
+        timePeriods = [reading[PropertyName.TIME_PERIOD.value] for _, reading in sink.readings]
+        assert len(timePeriods) == len(set(timePeriods)) == 19
+        assert schedule.last_day == date(2024, 1, 19)
+
+    # ------------------------------------------------------
+    def test_changes(self):
+
+        dataSource = _PublishingDataSource(date(2024, 1, 1))
+        dataSource.now = datetime(2024, 1, 6, 12)
+        sink = _ListSink()
+        daemon = PollingDaemon(Client(dataSource), sink, pce_identifiers=[PCE_IDENTIFIER], poll_days=30)
+
+        assert daemon.poll(PCE_IDENTIFIER, dataSource.now) == 5
+
+        # Nothing new: only the timestamps have changed.
+        dataSource.now += timedelta(hours=1)
+        assert daemon.poll(PCE_IDENTIFIER, dataSource.now) == 0
+
+        # A corrected day.
+        dataSource.corrections[date(2024, 1, 2)] = 100
+        dataSource.now += timedelta(hours=1)
+        assert daemon.poll(PCE_IDENTIFIER, dataSource.now) == 1
+
+        assert sink.readings[-1] == (
+            PCE_IDENTIFIER,
+            {
+                PropertyName.TIME_PERIOD.value: "02/01/2024",
+                PropertyName.VOLUME.value: 100,
+                PropertyName.TIMESTAMP.value: dataSource.now.isoformat(),
+            },
+        )
+
+    # ------------------------------------------------------
+    def test_failure_backoff(self):
+
+        dataSource = _PublishingDataSource(date(2024, 1, 1))
+        dataSource.failure = ConnectionError("Unavailable")
+        daemon = PollingDaemon(
+            Client(dataSource),
+            _ListSink(),
+            pce_identifiers=[PCE_IDENTIFIER],
+            min_retry_interval=timedelta(minutes=10),
+            max_retry_interval=timedelta(minutes=30),
+        )
+
+        now = datetime(2024, 1, 6, 12)
+        intervals = list[timedelta]()
+        for _ in range(4):
+            nextPoll = daemon.run_pending(now)
+            intervals.append(nextPoll - now)
+            now = nextPoll
+
+        assert intervals == [timedelta(minutes=10), timedelta(minutes=20), timedelta(minutes=30), timedelta(minutes=30)]
+
+        # Back to the normal schedule.
+        dataSource.failure = None
+        dataSource.now = now
+
+        assert daemon.run_pending(now) - now == timedelta(hours=1)
+
+    # ------------------------------------------------------
+    def test_pce_identifiers_failure(self):
+
+        dataSource = _PublishingDataSource(date(2024, 1, 1))
+        dataSource.failure = ConnectionError("Unavailable")
+        daemon = PollingDaemon(
+            Client(dataSource),
+            _ListSink(),
+            min_retry_interval=timedelta(minutes=10),
+            max_retry_interval=timedelta(minutes=30),
+        )
+
+        # The PCE identifiers are requested again at the next cycles, with a back-off.
+        now = datetime(2024, 1, 6, 12)
+        assert daemon.run_pending(now) - now == timedelta(minutes=10)
+        assert daemon.run_pending(now) - now == timedelta(minutes=20)
+        assert dataSource.loads == []
+
+        dataSource.failure = None
+        dataSource.now = now
+
+        assert daemon.run_pending(now) - now == timedelta(hours=1)
+        assert [pceIdentifier for pceIdentifier, _, _ in dataSource.loads] == [PCE_IDENTIFIER]
+
+    # ------------------------------------------------------
+    def test_schedule(self):
+
+        schedule = PublicationSchedule(min_retry_interval=timedelta(minutes=15))
+
+        schedule.observe(datetime(2024, 1, 1, 12), date(2023, 12, 31))
+
+        # Published between the polls at 9:00 and 10:00 the day after: about 9:30.
+        for day in [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)]:
+            dayAfter = datetime.combine(day + timedelta(days=1), datetime.min.time())
+            assert not schedule.observe(dayAfter + timedelta(hours=9), day - timedelta(days=1))
+            assert schedule.observe(dayAfter + timedelta(hours=10), day)
+
+        assert schedule.typical_delay == timedelta(hours=9, minutes=30)
+
+        # First poll a little before the expected publication of the next day.
+        now = datetime(2024, 1, 4, 10)
+        assert schedule.next_poll(now) == datetime(2024, 1, 5, 9, 15)
+
+        # Then backing off.
+        schedule.observe(datetime(2024, 1, 5, 9, 15), day)
+        assert schedule.next_poll(datetime(2024, 1, 5, 9, 15)) == datetime(2024, 1, 5, 9, 30)
+        schedule.observe(datetime(2024, 1, 5, 9, 30), day)
+        assert schedule.next_poll(datetime(2024, 1, 5, 9, 30)) == datetime(2024, 1, 5, 10, 0)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestJsonLinesSink:  # pylint: disable=too-few-public-methods
+
+    # ------------------------------------------------------
+    def test_write(self, tmp_path):
+
+        readings = [{PropertyName.TIME_PERIOD.value: "01/01/2024", PropertyName.VOLUME.value: 1.5}]
+
+        stream = io.StringIO()
+        sink = JsonLinesSink(stream)
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, readings)
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, readings)
+        sink.close()
+
+        lines = stream.getvalue().splitlines()
+
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == {"pce_identifier": PCE_IDENTIFIER, "frequency": "daily", **readings[0]}
+
+        # Appended to the file.
+        for _ in range(2):
+            sink = JsonLinesSink(str(tmp_path / "readings.jsonl"))
+            sink.write(PCE_IDENTIFIER, Frequency.DAILY, readings)
+            sink.close()
+
+        with open(tmp_path / "readings.jsonl", mode="r", encoding="utf-8") as jsonLinesFile:
+            assert jsonLinesFile.read() == stream.getvalue()
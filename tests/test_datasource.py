@@ -90,7 +90,7 @@ class TestAllDataSource:
 
         assert len(data[Frequency.DAILY.value]) == 1096
 
-        assert len(data[Frequency.WEEKLY.value]) == 155
+        assert len(data[Frequency.WEEKLY.value]) == 156
 
         assert len(data[Frequency.MONTHLY.value]) == 36
 
@@ -0,0 +1,187 @@
+import json
+import os
+import shutil
+from datetime import date
+
+from openpyxl import Workbook
+
+from pygazpar.datasource import (
+    DirectoryDataSource,
+    ExcelFileDataSource,
+    FrequencyConverter,
+    JsonFileDataSource,
+)
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.excelparser import ExcelParser
+
+PCE_IDENTIFIER = "22423299474865"
+
+EXCEL_PCE_IDENTIFIER = "12345678901234"
+
+MONTHLY_PCE_IDENTIFIER = "98765432109876"
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _archive(directory) -> str:
+    """A directory of archived exports of 3 PCEs, with overlapping files."""
+
+    resources = "tests/resources"
+
+    os.makedirs(directory / "json")
+    os.makedirs(directory / "excel" / "2021")
+
+    # JSON consumption, temperature and published documents.
+    shutil.copy(f"{resources}/donnees_informatives.json", directory / "json" / "donnees_informatives.json")
+    shutil.copy(f"{resources}/temperatures.json", directory / "json" / "temperatures.json")
+    shutil.copy(f"{resources}/donnees_publiees.json", directory / "json" / "donnees_publiees.json")
+
+    # A later export of the last days, with a corrected day.
+    with open(f"{resources}/donnees_informatives.json", mode="r", encoding="utf-8") as jsonFile:
+        data = json.load(jsonFile)
+    data[PCE_IDENTIFIER]["releves"] = data[PCE_IDENTIFIER]["releves"][-10:]
+    data[PCE_IDENTIFIER]["releves"][-1]["volumeBrutConsomme"] = 1000
+    with open(directory / "json" / "donnees_informatives_correction.json", mode="w", encoding="utf-8") as jsonFile:
+        json.dump(data, jsonFile)
+    os.utime(directory / "json" / "donnees_informatives_correction.json", (2e9, 2e9))
+
+    # Excel exports with the PCE identifier in their filename.
+    for frequency in ["DAILY", "WEEKLY"]:
+        shutil.copy(
+            f"{resources}/Donnees_informatives_PCE_{frequency}.xlsx",
+            directory / "excel" / "2021" / f"Donnees_informatives_{EXCEL_PCE_IDENTIFIER}_{frequency}.xlsx",
+        )
+
+    # An Excel export with the PCE identifier in its header.
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.cell(row=4, column=3, value="N° PCE :")  # type: ignore
+    worksheet.cell(row=4, column=4, value=MONTHLY_PCE_IDENTIFIER)  # type: ignore
+    worksheet.cell(row=9, column=2, value="Date de relevé")  # type: ignore
+    worksheet.cell(row=9, column=3, value="Volume consommé (m3)")  # type: ignore
+    worksheet.cell(row=9, column=4, value="Energie consommée (kWh)")  # type: ignore
+    for rownum, (month, volume) in enumerate([("Novembre 2020 ", 75), ("Décembre 2020 ", 345)], start=10):
+        worksheet.cell(row=rownum, column=2, value=month)  # type: ignore
+        worksheet.cell(row=rownum, column=3, value=volume)  # type: ignore
+        worksheet.cell(row=rownum, column=4, value=volume * 11)  # type: ignore
+    workbook.save(str(directory / "excel" / "monthly.xlsx"))
+
+    # Not an export.
+    Workbook().save(str(directory / "excel" / "other.xlsx"))
+
+    # Malformed files.
+    with open(directory / "json" / "notes.json", mode="w", encoding="utf-8") as jsonFile:
+        jsonFile.write("{broken")
+    with open(directory / "excel" / "broken.xlsx", mode="wb") as excelFile:
+        excelFile.write(b"not a workbook")
+
+    return str(directory)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestDirectoryDataSource:
+
+    # ------------------------------------------------------
+    def test_detect(self, tmp_path):
+
+        directory = _archive(tmp_path)
+
+        assert ExcelParser.detect("tests/resources/Donnees_informatives_PCE_DAILY.xlsx") == (None, Frequency.DAILY)
+        assert ExcelParser.detect("tests/resources/Donnees_informatives_PCE_WEEKLY.xlsx") == (None, Frequency.WEEKLY)
+        assert ExcelParser.detect(f"{directory}/excel/monthly.xlsx") == (MONTHLY_PCE_IDENTIFIER, Frequency.MONTHLY)
+        assert ExcelParser.detect(f"{directory}/excel/other.xlsx") == (None, None)
+
+    # ------------------------------------------------------
+    def test_malformed_file(self, tmp_path):
+
+        directory = _archive(tmp_path)
+
+        assert DirectoryDataSource.parse_file(f"{directory}/json/notes.json") == ({}, [])
+        assert DirectoryDataSource.parse_file(f"{directory}/excel/broken.xlsx") == ({}, [])
+
+    # ------------------------------------------------------
+    def test_load(self, tmp_path, without_timestamp):
+
+        dataSource = DirectoryDataSource(_archive(tmp_path), maxWorkers=0)
+
+        assert dataSource.get_pce_identifiers() == [EXCEL_PCE_IDENTIFIER, PCE_IDENTIFIER, MONTHLY_PCE_IDENTIFIER]
+
+        # JSON documents.
+        data = dataSource.load(PCE_IDENTIFIER, date(2019, 11, 30), date(2022, 11, 29))
+
+        expected = JsonFileDataSource(
+            "tests/resources/donnees_informatives.json", "tests/resources/temperatures.json"
+        ).load(PCE_IDENTIFIER, date(2019, 11, 30), date(2022, 11, 29), [Frequency.DAILY])[Frequency.DAILY.value]
+
+        daily = data[Frequency.DAILY.value]
+
+        assert len(daily) == 1096
+        assert Frequency.HOURLY.value not in data
+
+        # The corrected day of the file modified last wins.
+        assert daily[-1][PropertyName.VOLUME.value] == 1000
+        assert without_timestamp(daily[:-1]) == without_timestamp(expected[:-1])
+
+        # The date range.
+        data = dataSource.load(
+            PCE_IDENTIFIER, date(2022, 1, 1), date(2022, 1, 31), [Frequency.DAILY, Frequency.MONTHLY]
+        )
+
+        assert len(data[Frequency.DAILY.value]) == 31
+        assert len(data[Frequency.MONTHLY.value]) == 1
+
+    # ------------------------------------------------------
+    def test_excel(self, tmp_path, without_timestamp):
+
+        dataSource = DirectoryDataSource(_archive(tmp_path), maxWorkers=0)
+
+        data = dataSource.load(EXCEL_PCE_IDENTIFIER, date(2020, 1, 1), date(2022, 1, 1))
+
+        expected = ExcelFileDataSource("tests/resources/Donnees_informatives_PCE_DAILY.xlsx").load(
+            EXCEL_PCE_IDENTIFIER, date(2020, 1, 1), date(2022, 1, 1), [Frequency.DAILY]
+        )[Frequency.DAILY.value]
+
+        daily = data[Frequency.DAILY.value]
+
+        # Filled with the temperatures of the JSON document.
+        assert daily[10][PropertyName.TEMPERATURE.value] is not None
+        assert without_timestamp(daily) == [
+            {
+                **reading,
+                PropertyName.TEMPERATURE.value: daily[index][PropertyName.TEMPERATURE.value],
+                PropertyName.TIMESTAMP.value: None,
+            }
+            for index, reading in enumerate(expected)
+        ]
+
+        # Computed from the daily history.
+        assert data[Frequency.WEEKLY.value] == FrequencyConverter.computeWeekly(daily)
+
+        # Monthly export only.
+        data = dataSource.load(MONTHLY_PCE_IDENTIFIER, date(2020, 12, 1), date(2020, 12, 31))
+
+        assert list(data) == [Frequency.MONTHLY.value]
+        assert data[Frequency.MONTHLY.value][0][PropertyName.VOLUME.value] == 345
+
+        assert dataSource.load("unknown", date(2020, 1, 1), date(2022, 1, 1)) == {}
+
+    # ------------------------------------------------------
+    def test_process_pool(self, tmp_path, without_timestamp):
+
+        directory = _archive(tmp_path)
+
+        inProcess = DirectoryDataSource(directory, maxWorkers=0)
+        pooled = DirectoryDataSource(directory, maxWorkers=2)
+
+        for pceIdentifier in inProcess.get_pce_identifiers():
+            expected = inProcess.load(pceIdentifier, date(2019, 1, 1), date(2023, 1, 1))
+            data = pooled.load(pceIdentifier, date(2019, 1, 1), date(2023, 1, 1))
+
+            assert list(data) == list(expected)
+            for frequency in data:
+                assert without_timestamp(data[frequency]) == without_timestamp(expected[frequency])
+
+        # New files are found after a refresh.
+        os.remove(f"{directory}/excel/monthly.xlsx")
+        pooled.refresh()
+
+        assert MONTHLY_PCE_IDENTIFIER not in pooled.get_pce_identifiers()
@@ -0,0 +1,97 @@
+import threading
+from datetime import date
+from typing import Any
+
+import pytest
+
+from pygazpar.client import Client
+from pygazpar.enum import Frequency
+from pygazpar.fleet import FleetClient, FleetError
+from tests.conftest import FakeDataSource
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _AccountDataSource(FakeDataSource):
+
+    # Start order of the loads of all the accounts.
+    starts = list[str]()
+
+    startsLock = threading.Lock()
+
+    # ------------------------------------------------------
+    def __init__(self, pce_identifiers: list[str], delay: float = 0.02):
+
+        super().__init__(pce_identifiers, delay)
+
+    # ------------------------------------------------------
+    def daily_readings(self, pceIdentifier: str, startDate: date, endDate: date) -> list[dict[str, Any]]:
+
+        if pceIdentifier == "failing":
+            raise ValueError("Load failure")
+
+        with _AccountDataSource.startsLock:
+            _AccountDataSource.starts.append(pceIdentifier)
+
+        return [{"time_period": startDate.strftime("%d/%m/%Y"), "pce": pceIdentifier}]
+
+
+class TestFleetClient:
+
+    # ------------------------------------------------------
+    def setup_method(self):
+        """setup any state tied to the execution of the given method in a
+        class.  setup_method is invoked for every test method of a class.
+        """
+        _AccountDataSource.starts = []
+
+    # ------------------------------------------------------
+    def test_pce_identifiers(self):
+
+        dataSources = {
+            "account1": _AccountDataSource(["pce1", "pce2"]),
+            "account2": _AccountDataSource(["pce3"]),
+        }
+
+        fleet = FleetClient({account: Client(dataSource) for account, dataSource in dataSources.items()})
+
+        assert fleet.get_pce_identifiers() == {"pce1": "account1", "pce2": "account1", "pce3": "account2"}
+        assert fleet.account_of("pce3") == "account2"
+
+        # The mapping is cached.
+        assert dataSources["account1"].pce_list_count == 1
+
+        with pytest.raises(ValueError):
+            fleet.account_of("unknown")
+
+    # ------------------------------------------------------
+    def test_fair_scheduling(self):
+
+        bigAccount = _AccountDataSource([f"big{i}" for i in range(20)])
+        smallAccount = _AccountDataSource(["small0", "small1"])
+
+        fleet = FleetClient(
+            {"big": Client(bigAccount), "small": Client(smallAccount)}, max_concurrency_per_account=2, max_workers=3
+        )
+
+        data = fleet.load_date_range(None, date(2024, 1, 1), date(2024, 1, 31), [Frequency.DAILY])
+
+        assert len(data) == 22
+        assert data["small1"][Frequency.DAILY.value][0]["pce"] == "small1"
+
+        # The small account is not starved by the big one.
+        assert set(_AccountDataSource.starts[:4]) >= {"small0", "small1"}
+
+        # The concurrency limit by account is respected.
+        assert bigAccount.max_running == 2
+        assert smallAccount.max_running <= 2
+
+    # ------------------------------------------------------
+    def test_errors(self):
+
+        fleet = FleetClient({"account": Client(_AccountDataSource(["pce1", "failing"], delay=0))})
+
+        with pytest.raises(FleetError) as error:
+            fleet.load_since(["pce1", "failing"], 10, [Frequency.DAILY])
+
+        assert list(error.value.errors) == ["failing"]
+        assert list(error.value.results) == ["pce1"]
@@ -0,0 +1,86 @@
+from datetime import date
+
+from pygazpar.datasource import JsonFileDataSource
+from pygazpar.gapplanner import GapPlanner
+from pygazpar.jsonparser import JsonParser
+
+
+class TestGapPlanner:
+
+    # ------------------------------------------------------
+    @classmethod
+    def setup_class(cls):
+        """setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        with open("tests/resources/donnees_informatives.json", mode="r", encoding="utf-8") as consumptionJsonFile:
+            with open("tests/resources/temperatures.json", mode="r", encoding="utf-8") as temperatureJsonFile:
+                cls._daily = JsonParser.parse(consumptionJsonFile.read(), temperatureJsonFile.read(), "22423299474865")
+
+    # ------------------------------------------------------
+    def test_plan(self):
+
+        days = [date(2020, 1, 1), date(2020, 1, 2), date(2020, 1, 8), date(2020, 1, 20), date(2020, 3, 1)]
+
+        assert GapPlanner.plan(days) == [
+            (date(2020, 1, 1), date(2020, 1, 8)),
+            (date(2020, 1, 20), date(2020, 1, 20)),
+            (date(2020, 3, 1), date(2020, 3, 1)),
+        ]
+
+        assert GapPlanner.plan(days, max_gap_days=0) == [
+            (date(2020, 1, 1), date(2020, 1, 2)),
+            (date(2020, 1, 8), date(2020, 1, 8)),
+            (date(2020, 1, 20), date(2020, 1, 20)),
+            (date(2020, 3, 1), date(2020, 3, 1)),
+        ]
+
+        assert GapPlanner.plan(days, max_gap_days=100, max_window_days=30) == [
+            (date(2020, 1, 1), date(2020, 1, 20)),
+            (date(2020, 3, 1), date(2020, 3, 1)),
+        ]
+
+    # ------------------------------------------------------
+    def test_find_gaps(self):
+
+        daily = [dict(reading) for reading in TestGapPlanner._daily]
+
+        assert len(GapPlanner.find_missing_days(daily, date(2019, 11, 30), date(2022, 11, 29))) == 0
+        assert len(GapPlanner.find_inconsistent_days(daily)) == 0
+
+        # 10/12/2019 and 11/12/2019 are missing.
+        del daily[10:12]
+
+        # 01/02/2020 does not start where 31/01/2020 ends.
+        daily[61]["start_index_m3"] += 1
+
+        assert GapPlanner.find_missing_days(daily, date(2019, 11, 30), date(2022, 11, 29)) == [
+            date(2019, 12, 10),
+            date(2019, 12, 11),
+        ]
+        assert GapPlanner.find_inconsistent_days(daily) == [date(2020, 1, 31), date(2020, 2, 1)]
+
+        assert GapPlanner.plan_repair(daily, date(2019, 11, 30), date(2022, 11, 29)) == [
+            (date(2019, 12, 10), date(2019, 12, 11)),
+            (date(2020, 1, 31), date(2020, 2, 1)),
+        ]
+
+    # ------------------------------------------------------
+    def test_repair(self):
+
+        daily = [dict(reading) for reading in TestGapPlanner._daily]
+
+        del daily[10:12]
+        daily[61]["start_index_m3"] += 1
+
+        dataSource = JsonFileDataSource(
+            "tests/resources/donnees_informatives.json", "tests/resources/temperatures.json"
+        )
+
+        repaired = GapPlanner.repair(dataSource, "22423299474865", daily, date(2019, 11, 30), date(2022, 11, 29))
+
+        assert len(repaired) == len(TestGapPlanner._daily)
+        assert [reading["start_index_m3"] for reading in repaired] == [
+            reading["start_index_m3"] for reading in TestGapPlanner._daily
+        ]
+        assert len(GapPlanner.find_inconsistent_days(repaired)) == 0
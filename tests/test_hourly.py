@@ -0,0 +1,366 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+import pytest
+from openpyxl import Workbook
+
+from pygazpar.api_client import ConsumptionType
+from pygazpar.api_client import Frequency as APIClientFrequency
+from pygazpar.cache import MemoryResultCache
+from pygazpar.datasource import (
+    ExcelFileDataSource,
+    FrequencyConverter,
+    JsonFileDataSource,
+    JsonWebDataSource,
+    MemoryMappedDataSource,
+)
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.excelparser import ExcelParser
+from pygazpar.hourly import TIME_ZONE, HourlyReadings
+from pygazpar.timeperiod import TimePeriod
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _hourlyReleves(firstDay: date, days: int) -> list[dict[str, Any]]:
+    """Hourly releves of the gas days from firstDay, with UTC times: 1 m3 per hour, 2 m3 from 18:00 to 22:00
+    (local time).
+    """
+
+    res = []
+
+    index = 1000
+    hour = datetime(firstDay.year, firstDay.month, firstDay.day, 6, tzinfo=TIME_ZONE).astimezone(timezone.utc)
+    lastDay = firstDay + timedelta(days=days)
+    end = datetime(lastDay.year, lastDay.month, lastDay.day, 6, tzinfo=TIME_ZONE).astimezone(timezone.utc)
+    while hour < end:
+        local = hour.astimezone(TIME_ZONE)
+        volume = 2 if 18 <= local.hour < 22 else 1
+        res.append(
+            {
+                "dateDebutReleve": hour.isoformat(),
+                "dateFinReleve": (hour + timedelta(hours=1)).isoformat(),
+                "journeeGaziere": (local - timedelta(hours=6)).strftime("%Y-%m-%d"),
+                "indexDebut": index,
+                "indexFin": index + volume,
+                "volumeBrutConsomme": volume,
+                "energieConsomme": volume * 11,
+                "coeffConversion": 11.2,
+                "temperature": None,
+                "qualificationReleve": "Mesuré",
+                "frequenceReleve": "Horaire",
+            }
+        )
+        index += volume
+        hour += timedelta(hours=1)
+
+    return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _dailyReleves(firstDay: date, days: int) -> list[dict[str, Any]]:
+
+    res = []
+
+    index = 1000
+    for day in range(days):
+        journee = firstDay + timedelta(days=day)
+        res.append(
+            {
+                "journeeGaziere": journee.strftime("%Y-%m-%d"),
+                "indexDebut": index,
+                "indexFin": index + 28,
+                "volumeBrutConsomme": 28,
+                "energieConsomme": 308,
+                "coeffConversion": 11.2,
+                "temperature": 8.5,
+                "qualificationReleve": "Mesuré",
+            }
+        )
+        index += 28
+
+    return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestHourlyReadings:
+
+    # ------------------------------------------------------
+    def test_from_releves(self):
+
+        hourly = HourlyReadings.from_releves(_hourlyReleves(date(2022, 11, 27), 3))
+
+        assert len(hourly) == 72
+
+        readings = hourly.to_readings()
+
+        assert readings[0][PropertyName.TIME_PERIOD.value] == "27/11/2022 06:00"
+        assert readings[0][PropertyName.START_INDEX.value] == 1000
+        assert readings[0][PropertyName.VOLUME.value] == 1
+        assert readings[0][PropertyName.CONVERTER_FACTOR.value] == 11.2
+        assert readings[0][PropertyName.TEMPERATURE.value] is None
+        assert readings[0][PropertyName.TYPE.value] == "Mesuré"
+        assert readings[-1][PropertyName.TIME_PERIOD.value] == "30/11/2022 05:00"
+
+        # Round trip.
+        assert [
+            {**reading, PropertyName.TIMESTAMP.value: None}
+            for reading in HourlyReadings.from_readings(readings).to_readings()
+        ] == [{**reading, PropertyName.TIMESTAMP.value: None} for reading in readings]
+
+    # ------------------------------------------------------
+    def test_sort_and_duplicates(self):
+
+        releves = _hourlyReleves(date(2022, 11, 27), 1)
+        corrected = dict(releves[3], volumeBrutConsomme=5)
+
+        hourly = HourlyReadings.from_releves(list(reversed(releves)) + [corrected])
+
+        assert len(hourly) == 24
+        assert np.all(np.diff(hourly.starts.astype(np.int64)) == 60)
+        assert hourly.column(PropertyName.VOLUME.value)[3] == 5
+
+    # ------------------------------------------------------
+    def test_concat(self):
+
+        releves = _hourlyReleves(date(2022, 11, 27), 2)
+        corrected = [dict(releve, qualificationReleve="Corrigé") for releve in releves[20:30]]
+
+        hourly = HourlyReadings.concat([HourlyReadings.from_releves(releves), HourlyReadings.from_releves(corrected)])
+
+        assert len(hourly) == 48
+        assert [reading[PropertyName.TYPE.value] for reading in hourly.to_readings()[19:31]] == (
+            ["Mesuré"] + ["Corrigé"] * 10 + ["Mesuré"]
+        )
+        assert len(HourlyReadings.concat([])) == 0
+
+    # ------------------------------------------------------
+    def test_gas_days(self):
+
+        hourly = HourlyReadings.from_releves(_hourlyReleves(date(2022, 11, 27), 3))
+
+        # 05:00 belongs to the gas day before.
+        assert TimePeriod.start_of("28/11/2022 05:00", Frequency.HOURLY) == date(2022, 11, 27)
+        assert TimePeriod.start_of("28/11/2022 06:00", Frequency.HOURLY) == date(2022, 11, 28)
+
+        middle = hourly.between(date(2022, 11, 28), date(2022, 11, 28))
+
+        assert len(middle) == 24
+        assert middle.to_readings()[0][PropertyName.TIME_PERIOD.value] == "28/11/2022 06:00"
+        assert middle.to_readings()[-1][PropertyName.TIME_PERIOD.value] == "29/11/2022 05:00"
+        assert TimePeriod.slice_hourly(hourly.to_readings(), date(2022, 11, 28), date(2022, 11, 28)) == (
+            middle.to_readings()
+        )
+
+    # ------------------------------------------------------
+    def test_rollup_daily(self):
+
+        hourly = HourlyReadings.from_releves(_hourlyReleves(date(2022, 11, 27), 3))
+
+        daily = hourly.rollup_daily()
+
+        assert [reading[PropertyName.TIME_PERIOD.value] for reading in daily] == [
+            "27/11/2022",
+            "28/11/2022",
+            "29/11/2022",
+        ]
+        assert daily[0][PropertyName.START_INDEX.value] == 1000
+        assert daily[0][PropertyName.END_INDEX.value] == 1028
+        assert daily[1][PropertyName.START_INDEX.value] == 1028
+        assert daily[0][PropertyName.VOLUME.value] == 28
+        assert daily[0][PropertyName.ENERGY.value] == 308
+
+        # The rollup has the daily readings format.
+        assert FrequencyConverter.computeMonthly(daily)[0][PropertyName.VOLUME.value] == 84
+
+    # ------------------------------------------------------
+    def test_reconcile(self):
+
+        hourly = HourlyReadings.from_releves(_hourlyReleves(date(2022, 11, 27), 3))
+
+        daily = HourlyReadings.from_releves(_hourlyReleves(date(2022, 11, 27), 3)).rollup_daily()
+
+        assert hourly.reconcile(FrequencyConverter.computeDaily(daily)) == []
+
+        daily[1][PropertyName.VOLUME.value] = 30
+
+        assert hourly.reconcile(daily) == [
+            {
+                PropertyName.TIME_PERIOD.value: "28/11/2022",
+                "hours": 24,
+                "volume_difference_m3": 2.0,
+                "energy_difference_kwh": 0.0,
+            }
+        ]
+
+        # An incomplete gas day.
+        partial = hourly.between(date(2022, 11, 27), date(2022, 11, 27))
+        partial = HourlyReadings.from_readings(partial.to_readings()[:20])
+
+        assert [difference["hours"] for difference in partial.reconcile(daily)] == [20]
+
+    # ------------------------------------------------------
+    def test_compact(self):
+
+        hourly = HourlyReadings.from_releves(_hourlyReleves(date(2022, 1, 1), 365))
+
+        assert len(hourly) == 8760
+        assert hourly.nbytes < 600 * 1024
+        assert hourly.nbytes * 10 < MemoryResultCache.estimate_size({"hourly": hourly.to_readings()})
+
+    # ------------------------------------------------------
+    def test_daylight_saving_time(self):
+
+        hourly = HourlyReadings.from_releves(
+            _hourlyReleves(date(2024, 3, 29), 3) + _hourlyReleves(date(2024, 10, 25), 3)
+        )
+
+        assert _hourlyReleves(date(2024, 3, 29), 1)[0]["dateDebutReleve"] == "2024-03-29T05:00:00+00:00"
+        assert _hourlyReleves(date(2024, 10, 25), 1)[0]["dateDebutReleve"] == "2024-10-25T04:00:00+00:00"
+
+        readings = hourly.to_readings()
+
+        assert readings[0][PropertyName.TIME_PERIOD.value] == "29/03/2024 06:00"
+        # 02:00 is skipped in spring and 02:00 is repeated in autumn.
+        timePeriods = [reading[PropertyName.TIME_PERIOD.value] for reading in readings]
+        assert "31/03/2024 02:00" not in timePeriods
+        assert timePeriods.count("27/10/2024 02:00") == 2
+
+        assert [
+            (reading[PropertyName.TIME_PERIOD.value], reading[PropertyName.VOLUME.value])
+            for reading in hourly.rollup_daily()
+        ] == [
+            ("29/03/2024", 28),
+            ("30/03/2024", 27),
+            ("31/03/2024", 28),
+            ("25/10/2024", 28),
+            ("26/10/2024", 29),
+            ("27/10/2024", 28),
+        ]
+        assert hourly.reconcile(hourly.rollup_daily()) == []
+
+    # ------------------------------------------------------
+    def test_excel(self, tmp_path):
+
+        releves = _hourlyReleves(date(2022, 11, 27), 2)
+
+        workbook = Workbook()
+        worksheet = workbook.active
+        for rownum, releve in enumerate(releves, start=10):
+            hour = datetime.fromisoformat(releve["dateDebutReleve"]).astimezone(TIME_ZONE).replace(tzinfo=None)
+            row = [
+                # Both date times and texts are accepted.
+                hour if rownum % 2 == 0 else hour.strftime("%d/%m/%Y %H:%M"),
+                releve["indexDebut"],
+                releve["indexFin"],
+                releve["volumeBrutConsomme"],
+                str(releve["energieConsomme"]),
+                "11,2",
+                None,
+                " Mesuré ",
+            ]
+            for column, value in enumerate(row, start=2):
+                worksheet.cell(row=rownum, column=column, value=value)  # type: ignore
+        filename = str(tmp_path / "Donnees_informatives_horaires.xlsx")
+        workbook.save(filename)
+
+        expected = [
+            {**reading, PropertyName.TIMESTAMP.value: None}
+            for reading in HourlyReadings.from_releves(releves).to_readings()
+        ]
+
+        readings = ExcelParser.parse(filename, Frequency.HOURLY)
+
+        assert [{**reading, PropertyName.TIMESTAMP.value: None} for reading in readings] == expected
+
+        data = ExcelFileDataSource(filename).load(
+            PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 28), [Frequency.HOURLY]
+        )
+
+        assert len(data[Frequency.HOURLY.value]) == 48
+
+        # Not parsed by default.
+        data = ExcelFileDataSource("tests/resources/Donnees_informatives_PCE_DAILY.xlsx").load(
+            PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 28)
+        )
+
+        assert data[Frequency.HOURLY.value] == []
+        assert len(data[Frequency.DAILY.value]) > 0
+
+    # ------------------------------------------------------
+    def test_json_data_source(self, fake_api_client):
+
+        dataSource = JsonWebDataSource("username", "password")
+        apiClient = fake_api_client(
+            dataSource,
+            consumption={PCE_IDENTIFIER: {"releves": _dailyReleves(date(2022, 11, 27), 3)}},
+            hourly={PCE_IDENTIFIER: {"releves": _hourlyReleves(date(2022, 11, 27), 3)}},
+        )
+
+        data = dataSource.load(
+            PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 29), [Frequency.HOURLY, Frequency.DAILY]
+        )
+
+        # The hourly releves are streamed.
+        assert [
+            (request.consumption_type, request.frequency, request.streamed)
+            for request in apiClient.consumption_requests
+        ] == [
+            (ConsumptionType.INFORMATIVE, APIClientFrequency.HOURLY, True),
+            (ConsumptionType.INFORMATIVE, None, False),
+        ]
+        assert len(data[Frequency.HOURLY.value]) == 72
+        assert len(data[Frequency.DAILY.value]) == 3
+
+        # The hourly rollup reconciles with the daily readings.
+        hourly = HourlyReadings.from_readings(data[Frequency.HOURLY.value])
+        assert hourly.reconcile(data[Frequency.DAILY.value]) == []
+
+        # Hourly only.
+        data = dataSource.load(PCE_IDENTIFIER, date(2022, 11, 28), date(2022, 11, 28), [Frequency.HOURLY])
+
+        assert list(data) == [Frequency.HOURLY.value]
+        assert len(data[Frequency.HOURLY.value]) == 24
+
+        # Not requested by default.
+        apiClient.consumption_requests.clear()
+        data = dataSource.load(PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 29))
+
+        assert [request.frequency for request in apiClient.consumption_requests] == [None]
+        assert data[Frequency.HOURLY.value] == []
+        assert len(data[Frequency.DAILY.value]) == 3
+        assert len(dataSource.load_hourly(PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 28))) == 48
+
+    # ------------------------------------------------------
+    def test_daily_data_sources(self, tmp_path, fake_api_client):
+
+        # A daily consumption file cannot provide hourly readings.
+        jsonFileDataSource = JsonFileDataSource(
+            "tests/resources/donnees_informatives.json", "tests/resources/temperatures.json"
+        )
+
+        with pytest.raises(ValueError):
+            jsonFileDataSource.load(PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 28), [Frequency.HOURLY])
+
+        assert (
+            jsonFileDataSource.load(PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 28))[Frequency.HOURLY.value]
+            == []
+        )
+
+        with pytest.raises(ValueError):
+            MemoryMappedDataSource(str(tmp_path / "empty")).load(
+                PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 28), [Frequency.HOURLY]
+            )
+
+        # The store only holds daily readings: the hourly ones come from the underlying data source.
+        webDataSource = JsonWebDataSource("username", "password")
+        fake_api_client(webDataSource, hourly={PCE_IDENTIFIER: {"releves": _hourlyReleves(date(2022, 11, 27), 3)}})
+
+        data = MemoryMappedDataSource(str(tmp_path / "store"), webDataSource).load(
+            PCE_IDENTIFIER, date(2022, 11, 27), date(2022, 11, 28), [Frequency.HOURLY]
+        )
+
+        assert list(data) == [Frequency.HOURLY.value]
+        assert len(data[Frequency.HOURLY.value]) == 48
@@ -0,0 +1,98 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from pygazpar.enum import PropertyName
+from pygazpar.jsoncodec import JsonCodec
+from pygazpar.jsonparser import JsonParser
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestJsonCodec:
+
+    _consumption: bytes
+
+    _temperatures: bytes
+
+    # ------------------------------------------------------
+    @classmethod
+    def setup_class(cls):
+
+        with open("tests/resources/donnees_informatives.json", mode="rb") as jsonFile:
+            cls._consumption = jsonFile.read()
+
+        with open("tests/resources/temperatures.json", mode="rb") as jsonFile:
+            cls._temperatures = jsonFile.read()
+
+    # ------------------------------------------------------
+    def teardown_method(self):
+
+        JsonCodec.set_backend()
+
+    # ------------------------------------------------------
+    def test_backends(self):
+
+        assert JsonCodec.available_backends()[-1] == "json"
+        assert JsonCodec.backend() == JsonCodec.available_backends()[0]
+
+        with pytest.raises(ValueError):
+            JsonCodec.set_backend("unknown")
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("backend", JsonCodec.available_backends())
+    def test_loads_dumps(self, backend: str):
+
+        JsonCodec.set_backend(backend)
+
+        data = {"journeeGaziere": "2022-11-29", "indexDebut": 21879, "coeffConversion": 11.26, "temperature": None}
+
+        assert JsonCodec.loads(JsonCodec.dumps(data)) == data
+        assert JsonCodec.loads(JsonCodec.dumps(data).encode("utf-8")) == data
+        assert JsonCodec.loads(TestJsonCodec._consumption) == json.loads(TestJsonCodec._consumption)
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("backend", JsonCodec.available_backends())
+    def test_parse(self, backend: str):
+
+        JsonCodec.set_backend(backend)
+
+        daily = JsonParser.parse(TestJsonCodec._consumption, TestJsonCodec._temperatures, PCE_IDENTIFIER)
+
+        releves = json.loads(TestJsonCodec._consumption)[PCE_IDENTIFIER]["releves"]
+        temperatures = json.loads(TestJsonCodec._temperatures)
+
+        assert len(daily) == len(releves) == 1096
+
+        for reading, releve in zip(daily, releves):
+            timePeriod = datetime.strptime(releve["journeeGaziere"], "%Y-%m-%d").strftime("%d/%m/%Y")
+            assert reading[PropertyName.TIME_PERIOD.value] == timePeriod
+            assert reading[PropertyName.START_INDEX.value] == releve["indexDebut"]
+            assert reading[PropertyName.END_INDEX.value] == releve["indexFin"]
+            assert reading[PropertyName.VOLUME.value] == releve["volumeBrutConsomme"]
+            assert reading[PropertyName.ENERGY.value] == releve["energieConsomme"]
+            assert reading[PropertyName.CONVERTER_FACTOR.value] == releve["coeffConversion"]
+            assert reading[PropertyName.TYPE.value] == releve["qualificationReleve"]
+            assert reading[PropertyName.TEMPERATURE.value] == (
+                releve["temperature"]
+                if releve["temperature"] is not None
+                else temperatures.get(releve["journeeGaziere"])
+            )
+
+    # ------------------------------------------------------
+    def test_parse_data(self):
+
+        daily = JsonParser.parse_data(
+            json.loads(TestJsonCodec._consumption), json.loads(TestJsonCodec._temperatures), PCE_IDENTIFIER
+        )
+
+        expected = JsonParser.parse(TestJsonCodec._consumption, TestJsonCodec._temperatures, PCE_IDENTIFIER)
+
+        assert [{**reading, PropertyName.TIMESTAMP.value: None} for reading in daily] == [
+            {**reading, PropertyName.TIMESTAMP.value: None} for reading in expected
+        ]
+
+        # Without temperatures.
+        assert len(JsonParser.parse_data(json.loads(TestJsonCodec._consumption), None, PCE_IDENTIFIER)) == 1096
@@ -0,0 +1,180 @@
+import io
+import json
+from datetime import date
+from typing import Any
+
+import pytest
+from requests import Response, Session
+
+from pygazpar.api_client import APIClient, ConsumptionType
+from pygazpar.enum import PropertyName
+from pygazpar.jsonparser import RELEVE_FIELDS, JsonParser
+from pygazpar.jsonstream import ReleveScanner
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _chunks(content: bytes, size: int) -> list[bytes]:
+
+    return [content[index : index + size] for index in range(0, len(content), size)]
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _releve(journeeGaziere: str, indexDebut: int, **kwargs) -> dict[str, Any]:
+
+    res: dict[str, Any] = dict.fromkeys(RELEVE_FIELDS)
+    res.update(journeeGaziere=journeeGaziere, indexDebut=indexDebut, **kwargs)
+
+    return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _StreamingSession(Session):
+
+    def __init__(self, content: bytes):
+        super().__init__()
+        self.content = content
+        self.stream = False
+
+    def request(self, method, url, **kwargs):  # type: ignore # pylint: disable=arguments-differ
+        self.stream = kwargs.get("stream", False)
+        res = Response()
+        res.status_code = 200
+        res.headers["Content-Type"] = "application/json"
+        res.raw = io.BytesIO(self.content)
+        res.url = url
+        return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _StreamingAPIClient(APIClient):
+
+    def __init__(self, content: bytes):
+        super().__init__("username", "password")
+        self.session = _StreamingSession(content)
+
+    def _new_session(self) -> Session:
+        return self.session
+
+    def _authenticate(self, session: Session):
+        pass
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestJsonStream:
+
+    _consumption: bytes
+
+    _temperatures: dict[str, Any]
+
+    # ------------------------------------------------------
+    @classmethod
+    def setup_class(cls):
+
+        with open("tests/resources/donnees_informatives.json", mode="rb") as jsonFile:
+            cls._consumption = jsonFile.read()
+
+        with open("tests/resources/temperatures.json", mode="r", encoding="utf-8") as jsonFile:
+            cls._temperatures = json.load(jsonFile)
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("chunkSize", [13, 4096, 1 << 24])
+    def test_iter_parse(self, chunkSize: int, without_timestamp):
+
+        expected = JsonParser.parse_data(
+            json.loads(TestJsonStream._consumption), TestJsonStream._temperatures, PCE_IDENTIFIER
+        )
+
+        daily = list(
+            JsonParser.iter_parse(
+                _chunks(TestJsonStream._consumption, chunkSize), TestJsonStream._temperatures, PCE_IDENTIFIER
+            )
+        )
+
+        assert len(daily) == 1096
+        assert without_timestamp(daily) == without_timestamp(expected)
+
+    # ------------------------------------------------------
+    def test_incremental(self):
+
+        consumed = []
+
+        def chunks():
+            for chunk in _chunks(TestJsonStream._consumption, 4096):
+                consumed.append(chunk)
+                yield chunk
+
+        readings = JsonParser.iter_parse(chunks(), None, PCE_IDENTIFIER)
+
+        first = next(readings)
+
+        # The first reading is available long before the end of the download.
+        assert first[PropertyName.TIME_PERIOD.value] == "30/11/2019"
+        assert len(consumed) == 1
+
+        assert len(list(readings)) == 1095
+
+    # ------------------------------------------------------
+    def test_multiple_pce(self):
+
+        document = {
+            "1": {"idPce": "1", "releves": [_releve("2022-01-01", 1, status='}{"][')]},
+            "2": {
+                "idPce": "2",
+                "autre": {"releves": [_releve("1999-01-01", 0)]},
+                "releves": [
+                    _releve("2022-01-01", 10, detail={"a": [1, {"b": "\\\\"}]}),
+                    _releve("2022-01-02", 11, qualificationReleve="Mesuré"),
+                ],
+            },
+        }
+
+        content = json.dumps(document).encode("utf-8")
+
+        scanner = ReleveScanner()
+        releves = []
+        for chunk in _chunks(content, 3):
+            releves += list(scanner.feed(chunk.decode("latin-1")))
+        releves += list(scanner.close())
+
+        assert [(pce, releve["journeeGaziere"]) for pce, releve in releves] == [
+            ("1", "2022-01-01"),
+            ("2", "2022-01-01"),
+            ("2", "2022-01-02"),
+        ]
+        assert releves[1][1]["detail"] == {"a": [1, {"b": "\\\\"}]}
+        assert scanner.pce_identifiers == ["1", "2"]
+
+        daily = list(JsonParser.iter_parse(_chunks(content, 5), None, "2"))
+
+        assert [reading[PropertyName.START_INDEX.value] for reading in daily] == [10, 11]
+        assert daily[1][PropertyName.TYPE.value] == "Mesuré"
+
+    # ------------------------------------------------------
+    def test_errors(self):
+
+        with pytest.raises(KeyError):
+            list(JsonParser.iter_parse([TestJsonStream._consumption], None, "unknown"))
+
+        with pytest.raises(ValueError):
+            list(JsonParser.iter_parse([TestJsonStream._consumption[:-1000]], None, PCE_IDENTIFIER))
+
+        # Empty API response.
+        with pytest.raises(KeyError):
+            list(JsonParser.iter_parse([b"[]"], None, PCE_IDENTIFIER))
+
+    # ------------------------------------------------------
+    def test_api_client(self):
+
+        client = _StreamingAPIClient(TestJsonStream._consumption)
+        client.login()
+
+        chunks = client.iter_pce_consumption(
+            ConsumptionType.INFORMATIVE, date(2019, 11, 30), date(2022, 11, 29), [PCE_IDENTIFIER], chunk_size=1024
+        )
+
+        daily = list(JsonParser.iter_parse(chunks, TestJsonStream._temperatures, PCE_IDENTIFIER))
+
+        assert client.session.stream
+        assert len(daily) == 1096
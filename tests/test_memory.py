@@ -0,0 +1,226 @@
+import functools
+import gc
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Callable
+
+from openpyxl import Workbook
+
+from pygazpar.datasource import (
+    DirectoryDataSource,
+    ExcelFileDataSource,
+    JsonFileDataSource,
+    JsonWebDataSource,
+    MeterReadingsByFrequency,
+)
+from pygazpar.enum import Frequency
+
+PCE_IDENTIFIER = "22423299474865"
+
+FIRST_DAY = date(2003, 1, 1)
+
+YEARS = [10, 20]
+
+FREQUENCIES = [Frequency.DAILY, Frequency.WEEKLY, Frequency.MONTHLY, Frequency.YEARLY]
+
+# Memory budgets, in bytes per daily reading, of a load of all the frequencies: the peak of the memory allocated
+# while loading and the memory retained by the result. They leave about 50% of margin over the measured values:
+# a regression over them fails the tests.
+PEAK_BUDGETS = {
+    "json_file": 3000,
+    "json_web": 1200,
+    "excel_file": 2600,
+    "directory": 2400,
+}
+
+RETAINED_BUDGET = 1100
+
+# The memory must grow linearly with the history: the peak per reading of the 20-year history must stay close to
+# the one of the 10-year history.
+SCALING_TOLERANCE = 1.25
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _history(years: int) -> tuple[dict[str, Any], dict[str, Any]]:
+    """A synthetic consumption document and its temperature document, one releve per day."""
+
+    releves = list[dict[str, Any]]()
+    temperatures = dict[str, Any]()
+
+    index = 10000
+    day = FIRST_DAY
+    while day < FIRST_DAY.replace(year=FIRST_DAY.year + years):
+        volume = (day.toordinal() * 7) % 13 + 1
+        releves.append(
+            {
+                "coeffConversion": 11.12,
+                "dateDebutReleve": f"{day.isoformat()}T06:00:00+00:00",
+                "dateFinReleve": f"{(day + timedelta(days=1)).isoformat()}T06:00:00+00:00",
+                "energieConsomme": volume * 11,
+                "frequenceReleve": None,
+                "indexDebut": index,
+                "indexFin": index + volume,
+                "journeeGaziere": day.isoformat(),
+                "natureReleve": "Informative Journalier",
+                "pcs": None,
+                "pta": None,
+                "qualificationReleve": "Mesuré",
+                "status": None,
+                "temperature": None,
+                "volumeBrutConsomme": volume,
+                "volumeConverti": None,
+            }
+        )
+        temperatures[day.isoformat()] = round(5 + (day.toordinal() % 30) / 2, 2)
+        index += volume
+        day += timedelta(days=1)
+
+    return {PCE_IDENTIFIER: {"idPce": PCE_IDENTIFIER, "frequence": None, "releves": releves}}, temperatures
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _workbook(filename: str, consumption: dict[str, Any]):
+    """The daily Excel export of the consumption document."""
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    for rownum, releve in enumerate(consumption[PCE_IDENTIFIER]["releves"], start=10):
+        row = [
+            date.fromisoformat(releve["journeeGaziere"]).strftime("%d/%m/%Y"),
+            releve["indexDebut"],
+            releve["indexFin"],
+            releve["volumeBrutConsomme"],
+            releve["energieConsomme"],
+            "11,12",
+            None,
+            releve["qualificationReleve"],
+        ]
+        for column, value in enumerate(row, start=2):
+            worksheet.cell(row=rownum, column=column, value=value)  # type: ignore
+    workbook.save(filename)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestMemoryBudget:
+
+    _directory: str
+
+    _histories: dict[int, tuple[dict[str, Any], dict[str, Any]]]
+
+    # ------------------------------------------------------
+    @classmethod
+    def setup_class(cls):
+
+        cls._directory = tempfile.mkdtemp()
+        cls._histories = {}
+
+        for years in YEARS:
+            consumption, temperatures = cls._histories[years] = _history(years)
+
+            os.makedirs(f"{cls._directory}/{years}")
+            with open(f"{cls._directory}/{years}/consumption.json", mode="w", encoding="utf-8") as jsonFile:
+                json.dump(consumption, jsonFile)
+            with open(f"{cls._directory}/{years}/temperatures.json", mode="w", encoding="utf-8") as jsonFile:
+                json.dump(temperatures, jsonFile)
+
+            _workbook(f"{cls._directory}/daily_{years}.xlsx", consumption)
+
+    # ------------------------------------------------------
+    @classmethod
+    def teardown_class(cls):
+
+        shutil.rmtree(cls._directory, ignore_errors=True)
+
+    # ------------------------------------------------------
+    def test_json_file(self):
+
+        def load(years: int) -> MeterReadingsByFrequency:
+
+            dataSource = JsonFileDataSource(
+                f"{self._directory}/{years}/consumption.json", f"{self._directory}/{years}/temperatures.json"
+            )
+            return dataSource.load(PCE_IDENTIFIER, *self.__dateRange(years), FREQUENCIES)
+
+        self.__checkBudget("json_file", load)
+
+    # ------------------------------------------------------
+    def test_json_web(self, fake_api_client):
+
+        def load(years: int) -> MeterReadingsByFrequency:
+
+            dataSource = JsonWebDataSource("username", "password")
+            consumption, temperatures = self._histories[years]
+            fake_api_client(dataSource, consumption=consumption, temperatures=temperatures)
+            return dataSource.load(PCE_IDENTIFIER, *self.__dateRange(years), FREQUENCIES)
+
+        self.__checkBudget("json_web", load)
+
+    # ------------------------------------------------------
+    def test_excel_file(self):
+
+        def load(years: int) -> MeterReadingsByFrequency:
+
+            # The daily export: the other frequencies have their own exports.
+            dataSource = ExcelFileDataSource(f"{self._directory}/daily_{years}.xlsx")
+            return dataSource.load(PCE_IDENTIFIER, *self.__dateRange(years), [Frequency.DAILY, Frequency.YEARLY])
+
+        self.__checkBudget("excel_file", load)
+
+    # ------------------------------------------------------
+    def test_directory(self):
+
+        def load(years: int) -> MeterReadingsByFrequency:
+
+            dataSource = DirectoryDataSource(f"{self._directory}/{years}", maxWorkers=0)
+            return dataSource.load(PCE_IDENTIFIER, *self.__dateRange(years), FREQUENCIES)
+
+        self.__checkBudget("directory", load)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __dateRange(years: int) -> tuple[date, date]:
+
+        return FIRST_DAY, FIRST_DAY.replace(year=FIRST_DAY.year + years) - timedelta(days=1)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __measure(load: Callable[[], MeterReadingsByFrequency]) -> tuple[int, int, int]:
+        """Returns the number of daily readings loaded, the peak of the memory allocated by the load and the
+        memory retained by its result (in bytes).
+        """
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+            res = load()
+
+            gc.collect()
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return len(res[Frequency.DAILY.value]), peak - baseline, retained - baseline
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __checkBudget(name: str, load: Callable[[int], MeterReadingsByFrequency]):
+
+        peaks = dict[int, float]()
+        for years in YEARS:
+            count, peak, retained = TestMemoryBudget.__measure(functools.partial(load, years))
+
+            assert count == (TestMemoryBudget.__dateRange(years)[1] - FIRST_DAY).days + 1
+
+            peaks[years] = peak / count
+
+            assert peaks[years] <= PEAK_BUDGETS[name], f"{name}, {years} years: {peaks[years]:.0f} bytes per reading"
+            assert retained / count <= RETAINED_BUDGET, f"{name}, {years} years: {retained / count:.0f} bytes retained"
+
+        assert peaks[YEARS[-1]] <= peaks[YEARS[0]] * SCALING_TOLERANCE
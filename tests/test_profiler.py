@@ -0,0 +1,142 @@
+import json
+import pstats
+import sys
+from datetime import date
+
+from pygazpar.__main__ import main
+from pygazpar.client import Client
+from pygazpar.datasource import FrequencyConverter, JsonFileDataSource
+from pygazpar.enum import Frequency
+from pygazpar.profiler import Profiler
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestProfiler:
+
+    # ------------------------------------------------------
+    def test_client(self):
+
+        profiler = Profiler()
+        client = Client(
+            JsonFileDataSource("tests/resources/donnees_informatives.json", "tests/resources/temperatures.json"),
+            profiler=profiler,
+        )
+
+        client.load_date_range(PCE_IDENTIFIER, date(2019, 11, 30), date(2022, 11, 29), [Frequency.WEEKLY])
+        client.load_date_range(PCE_IDENTIFIER, date(2019, 11, 30), date(2022, 11, 29), [Frequency.WEEKLY])
+
+        stages = {stats.name: stats for stats in profiler.stages}
+
+        assert list(stages) == ["json decode", "json parse", "convert weekly", "load"]
+        # The consumption and temperature documents.
+        assert stages["json decode"].calls == 4
+        assert stages["load"].calls == stages["json parse"].calls == stages["convert weekly"].calls == 2
+
+        # The stages are nested in the load.
+        assert stages["load"].total >= stages["json parse"].total + stages["convert weekly"].total
+        assert stages["load"].peak_memory >= stages["json parse"].peak_memory > 0
+
+        assert "convert weekly" in profiler.summary()
+
+        # Not active anymore.
+        assert Profiler.current() is None
+
+        FrequencyConverter.computeDaily([])
+
+        assert "convert daily" not in [stats.name for stats in profiler.stages]
+
+    # ------------------------------------------------------
+    def test_stage(self):
+
+        profiler = Profiler(traceMemory=False)
+
+        # No active profiler: nothing is recorded.
+        with Profiler.stage("outer"):
+            pass
+
+        with profiler.activate():
+            assert Profiler.current() is profiler
+
+            with Profiler.stage("outer"):
+                with profiler.activate(), Profiler.stage("inner"):
+                    pass
+
+            # Recorded even if it fails.
+            try:
+                with Profiler.stage("failure"):
+                    raise ValueError()
+            except ValueError:
+                pass
+
+        assert [(stats.name, stats.calls, stats.peak_memory) for stats in profiler.stages] == [
+            ("inner", 1, 0),
+            ("outer", 1, 0),
+            ("failure", 1, 0),
+        ]
+
+    # ------------------------------------------------------
+    def test_dump(self, tmp_path):
+
+        profiler = Profiler(withCProfile=True)
+
+        with profiler.activate(), Profiler.stage("outer"), Profiler.stage("inner"):
+            FrequencyConverter.computeDaily([])
+
+        profiler.dump_stats(str(tmp_path / "profile.pstats"))
+
+        assert pstats.Stats(str(tmp_path / "profile.pstats")).total_calls > 0  # type: ignore
+
+        profiler.dump_speedscope(str(tmp_path / "profile.json"))
+
+        with open(tmp_path / "profile.json", mode="r", encoding="utf-8") as speedscopeFile:
+            document = json.load(speedscopeFile)
+
+        frames = [frame["name"] for frame in document["shared"]["frames"]]
+        events = [(event["type"], frames[event["frame"]]) for event in document["profiles"][0]["events"]]
+
+        assert events == [
+            ("O", "outer"),
+            ("O", "inner"),
+            ("O", "convert daily"),
+            ("C", "convert daily"),
+            ("C", "inner"),
+            ("C", "outer"),
+        ]
+
+    # ------------------------------------------------------
+    def test_command_line(self, tmp_path, monkeypatch, capsys):
+
+        speedscopeFile = str(tmp_path / "profile.json")
+
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "pygazpar",
+                "-u",
+                "username",
+                "-p",
+                "password",
+                "-c",
+                PCE_IDENTIFIER,
+                "-t",
+                str(tmp_path),
+                "--datasource",
+                "test",
+                "--profile",
+                "--profile-output",
+                speedscopeFile,
+            ],
+        )
+
+        assert main() == 0
+
+        summary = capsys.readouterr().err
+
+        assert "load" in summary
+        assert "serialize output" in summary
+
+        with open(speedscopeFile, mode="r", encoding="utf-8") as jsonFile:
+            assert json.load(jsonFile)["exporter"] == "pygazpar"
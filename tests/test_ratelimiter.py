@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from pygazpar.api_client import APIClient
+from pygazpar.ratelimiter import FileTokenBucket, RateLimiter, TokenBucket
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _acquireFileBucket(path: str, count: int):
+
+    bucket = FileTokenBucket(path, 50.0, 1.0)
+    for _ in range(count):
+        bucket.acquire()
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _FakeSession:  # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.urls = list[str]()
+
+    def request(self, method: str, url: str, **kwargs):  # pylint: disable=unused-argument
+        self.urls.append(url)
+
+
+class TestRateLimiter:
+
+    # ------------------------------------------------------
+    def test_token_bucket(self):
+
+        bucket = TokenBucket(50.0, 5.0)
+
+        # The burst is immediate.
+        start = time.monotonic()
+        for _ in range(5):
+            assert bucket.acquire() is True
+        assert time.monotonic() - start < 0.05
+
+        # Then the steady rate applies.
+        assert bucket.try_acquire() > 0
+        for _ in range(10):
+            bucket.acquire()
+        assert time.monotonic() - start >= 0.18
+
+        assert bucket.acquire(100.0, timeout=0.01) is False
+
+        with pytest.raises(ValueError):
+            TokenBucket(0, 1)
+
+    # ------------------------------------------------------
+    def test_threads(self):
+
+        bucket = TokenBucket(100.0, 1.0)
+
+        def worker():
+            for _ in range(5):
+                bucket.acquire()
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 20 requests at 100 requests per second with a single token burst.
+        assert time.monotonic() - start >= 0.18
+
+    # ------------------------------------------------------
+    def test_processes(self, tmp_path):
+
+        path = os.path.join(tmp_path, "shared.bucket")
+
+        start = time.monotonic()
+        processes = [multiprocessing.Process(target=_acquireFileBucket, args=(path, 5)) for _ in range(2)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert all(process.exitcode == 0 for process in processes)
+
+        # 10 requests at 50 requests per second with a single token burst.
+        assert time.monotonic() - start >= 0.18
+
+    # ------------------------------------------------------
+    def test_rules(self, tmp_path):
+
+        rateLimiter = RateLimiter(rules={r"/meteo$": (1.0, 1.0)}, directory=str(tmp_path))
+
+        meteo = rateLimiter.bucket("https://monespace.grdf.fr/api/e-conso/pce/0123456789/meteo")
+        consumption = rateLimiter.bucket("https://monespace.grdf.fr/api/e-conso/pce/consommation/informatives")
+
+        assert meteo is rateLimiter.bucket("https://monespace.grdf.fr/api/e-conso/pce/9876543210/meteo")
+        assert consumption is rateLimiter.bucket("https://monespace.grdf.fr/api/e-conso/pce")
+        assert meteo is not consumption
+        assert consumption is not rateLimiter.bucket("https://connexion.grdf.fr/idp/idx/identify")
+
+        assert len(os.listdir(tmp_path)) == 3
+
+    # ------------------------------------------------------
+    def test_api_client(self):
+
+        session = _FakeSession()
+
+        client = APIClient("username", "password", rate_limiter=RateLimiter(rate=50.0, capacity=1.0))
+
+        start = time.monotonic()
+        for _ in range(6):
+            client._request(session, "GET", "https://monespace.grdf.fr/api/e-conso/pce")  # type: ignore # pylint: disable=protected-access
+
+        assert len(session.urls) == 6
+        assert time.monotonic() - start >= 0.09
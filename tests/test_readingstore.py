@@ -0,0 +1,104 @@
+from datetime import date
+
+from pygazpar.datasource import (
+    FrequencyConverter,
+    JsonFileDataSource,
+    MemoryMappedDataSource,
+)
+from pygazpar.enum import Frequency
+from pygazpar.jsonparser import JsonParser
+from pygazpar.readingstore import DailyReadingStore
+
+
+class TestDailyReadingStore:
+
+    # ------------------------------------------------------
+    @classmethod
+    def setup_class(cls):
+        """setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        with open("tests/resources/donnees_informatives.json", mode="r", encoding="utf-8") as consumptionJsonFile:
+            with open("tests/resources/temperatures.json", mode="r", encoding="utf-8") as temperatureJsonFile:
+                cls._daily = JsonParser.parse(consumptionJsonFile.read(), temperatureJsonFile.read(), "22423299474865")
+
+    # ------------------------------------------------------
+    def test_write_read(self, tmp_path):
+
+        store = DailyReadingStore(str(tmp_path))
+
+        store.write("22423299474865", TestDailyReadingStore._daily)
+
+        assert store.pce_identifiers() == ["22423299474865"]
+        assert store.date_range("22423299474865") == (date(2019, 11, 30), date(2022, 11, 29))
+        assert store.read("22423299474865", date(2000, 1, 1), date(2030, 1, 1)) == TestDailyReadingStore._daily
+
+        # Date range access.
+        data = store.read("22423299474865", date(2020, 1, 1), date(2020, 1, 31))
+        assert data == TestDailyReadingStore._daily[32:63]
+
+        # Reopen the store.
+        store.close()
+        store = DailyReadingStore(str(tmp_path))
+        assert store.read("22423299474865", date(2020, 1, 1), date(2020, 1, 31)) == data
+
+        assert len(store.read("0123456789", date(2020, 1, 1), date(2020, 1, 31))) == 0
+
+    # ------------------------------------------------------
+    def test_append_prepend(self, tmp_path):
+
+        store = DailyReadingStore(str(tmp_path))
+
+        daily = TestDailyReadingStore._daily
+
+        store.write("22423299474865", daily[400:600])
+        store.write("22423299474865", daily[600:])
+        store.write("22423299474865", daily[:400])
+
+        assert store.read("22423299474865", date(2000, 1, 1), date(2030, 1, 1)) == daily
+
+    # ------------------------------------------------------
+    def test_missing_days(self, tmp_path):
+
+        store = DailyReadingStore(str(tmp_path))
+
+        store.write("22423299474865", TestDailyReadingStore._daily[2:5])
+
+        assert store.missing_days("22423299474865", date(2019, 11, 30), date(2019, 12, 5)) == [
+            date(2019, 11, 30),
+            date(2019, 12, 1),
+            date(2019, 12, 5),
+        ]
+
+        store.mark_absent("22423299474865", date(2019, 11, 29), date(2019, 12, 1))
+
+        assert store.missing_days("22423299474865", date(2019, 11, 28), date(2019, 12, 5)) == [
+            date(2019, 11, 28),
+            date(2019, 12, 5),
+        ]
+
+    # ------------------------------------------------------
+    def test_datasource(self, tmp_path):
+
+        dataSource = MemoryMappedDataSource(
+            str(tmp_path),
+            JsonFileDataSource("tests/resources/donnees_informatives.json", "tests/resources/temperatures.json"),
+        )
+
+        data = dataSource.load(
+            "22423299474865", date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY, Frequency.MONTHLY]
+        )
+
+        assert len(data[Frequency.DAILY.value]) == 366
+        assert data[Frequency.MONTHLY.value] == FrequencyConverter.computeMonthly(data[Frequency.DAILY.value])
+
+        assert len(dataSource.store.missing_days("22423299474865", date(2020, 1, 1), date(2020, 12, 31))) == 0
+
+        # Without any data source, the store is read only.
+        dataSource = MemoryMappedDataSource(str(tmp_path))
+
+        assert dataSource.get_pce_identifiers() == ["22423299474865"]
+
+        data = dataSource.load("22423299474865", date(2020, 1, 1), date(2020, 1, 31), [Frequency.DAILY])
+
+        assert len(data[Frequency.DAILY.value]) == 31
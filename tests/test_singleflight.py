@@ -0,0 +1,173 @@
+import threading
+import time
+from datetime import date
+from typing import Any
+
+import pytest
+
+from pygazpar.datasource import JsonWebDataSource
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.singleflight import SingleFlight
+from tests.conftest import FakeAPIClient
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestSingleFlight:
+
+    # ------------------------------------------------------
+    def test_coalescing(self):
+
+        flights = SingleFlight[int]()
+        calls = []
+        results = []
+
+        def fetch() -> int:
+            calls.append(1)
+            time.sleep(0.2)
+            return 42
+
+        def run(start: date, end: date):
+            results.append(flights.do("pce", start, end, fetch))
+
+        threads = [threading.Thread(target=run, args=(date(2021, 1, 1), date(2021, 12, 31)))]
+        threads[0].start()
+        time.sleep(0.05)
+
+        # A contained range and the same range wait for the fetch in flight.
+        threads.append(threading.Thread(target=run, args=(date(2021, 3, 1), date(2021, 3, 31))))
+        threads.append(threading.Thread(target=run, args=(date(2021, 1, 1), date(2021, 12, 31))))
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [(42, date(2021, 1, 1), date(2021, 12, 31))] * 3
+        assert flights.in_flight("pce") == 0
+
+    # ------------------------------------------------------
+    def test_no_coalescing(self):
+
+        flights = SingleFlight[int]()
+        calls = []
+
+        def fetch() -> int:
+            calls.append(1)
+            time.sleep(0.1)
+            return len(calls)
+
+        # An overlapping range and another key are fetched on their own.
+        threads = [
+            threading.Thread(target=flights.do, args=("pce", date(2021, 1, 1), date(2021, 6, 30), fetch)),
+            threading.Thread(target=flights.do, args=("pce", date(2021, 6, 1), date(2021, 12, 31), fetch)),
+            threading.Thread(target=flights.do, args=("other", date(2021, 1, 1), date(2021, 6, 30), fetch)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 3
+
+    # ------------------------------------------------------
+    def test_error(self):
+
+        flights = SingleFlight[int]()
+        errors = []
+
+        def fetch() -> int:
+            time.sleep(0.2)
+            raise ValueError("Fetch failure")
+
+        def run():
+            try:
+                flights.do("pce", date(2021, 1, 1), date(2021, 1, 31), fetch)
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+
+        # The failed fetch is not remembered.
+        assert flights.do("pce", date(2021, 1, 1), date(2021, 1, 31), lambda: 1)[0] == 1
+
+    # ------------------------------------------------------
+    def test_data_source(self, fake_api_client):
+
+        dataSource = JsonWebDataSource("username", "password")
+        apiClient = fake_api_client(dataSource, FakeAPIClient.from_resources(delay=0.2))
+
+        results = dict[str, Any]()
+
+        def run(name: str, start: date, end: date):
+            results[name] = dataSource.load(PCE_IDENTIFIER, start, end, [Frequency.DAILY, Frequency.MONTHLY])
+
+        threads = [threading.Thread(target=run, args=("year", date(2021, 1, 1), date(2021, 12, 31)))]
+        threads[0].start()
+        time.sleep(0.05)
+        threads.append(threading.Thread(target=run, args=("march", date(2021, 3, 1), date(2021, 3, 31))))
+        threads[1].start()
+        for thread in threads:
+            thread.join()
+
+        assert len(apiClient.consumption_requests) == 1
+        assert len(apiClient.meteo_requests) == 1
+
+        # The contained range gets its own readings only.
+        march = results["march"]
+        assert len(march[Frequency.DAILY.value]) == 31
+        assert march[Frequency.DAILY.value][0][PropertyName.TIME_PERIOD.value] == "01/03/2021"
+        assert [reading[PropertyName.TIME_PERIOD.value] for reading in march[Frequency.MONTHLY.value]] == ["Mars 2021"]
+
+        # The fake API returns the whole sample whatever the range.
+        assert len(results["year"][Frequency.DAILY.value]) == 1096
+
+    # ------------------------------------------------------
+    def test_data_source_copies(self, fake_api_client):
+
+        dataSource = JsonWebDataSource("username", "password")
+        apiClient = fake_api_client(dataSource, FakeAPIClient.from_resources(delay=0.2))
+
+        results = list[Any]()
+
+        def run():
+            results.append(dataSource.load(PCE_IDENTIFIER, date(2021, 1, 1), date(2021, 12, 31), [Frequency.DAILY]))
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+
+        # A single fetch, but the callers do not share the readings.
+        assert len(apiClient.consumption_requests) == 1
+
+        first, second = (result[Frequency.DAILY.value] for result in results)
+        volume = second[0][PropertyName.VOLUME.value]
+        first[0][PropertyName.VOLUME.value] = -1
+
+        assert second[0][PropertyName.VOLUME.value] == volume
+
+    # ------------------------------------------------------
+    def test_sequential_loads(self, fake_api_client):
+
+        dataSource = JsonWebDataSource("username", "password")
+        apiClient = fake_api_client(dataSource, FakeAPIClient.from_resources())
+
+        dataSource.load(PCE_IDENTIFIER, date(2021, 1, 1), date(2021, 12, 31), [Frequency.DAILY])
+        dataSource.load(PCE_IDENTIFIER, date(2021, 1, 1), date(2021, 12, 31), [Frequency.DAILY])
+
+        # Coalescing is not caching.
+        assert len(apiClient.consumption_requests) == 2
+
+        with pytest.raises(KeyError):
+            dataSource.load("unknown", date(2021, 1, 1), date(2021, 12, 31), [Frequency.DAILY])
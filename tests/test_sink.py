@@ -0,0 +1,199 @@
+import io
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any
+
+import pytest
+
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.sink import CsvSink, InfluxLineProtocolSink, SqlSink
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _reading(day: int, volume: float, readingType: str = "Mesuré") -> dict[str, Any]:
+
+    return {
+        PropertyName.TIME_PERIOD.value: f"{day:02d}/01/2024",
+        PropertyName.START_INDEX.value: 1000 + day,
+        PropertyName.END_INDEX.value: 1000 + day + volume,
+        PropertyName.VOLUME.value: volume,
+        PropertyName.ENERGY.value: volume * 11.2,
+        PropertyName.CONVERTER_FACTOR.value: 11.2,
+        PropertyName.TEMPERATURE.value: None,
+        PropertyName.TYPE.value: readingType,
+        PropertyName.TIMESTAMP.value: "2024-02-01T10:00:00",
+    }
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestSqlSink:
+
+    # ------------------------------------------------------
+    def test_upsert(self):
+
+        connection = sqlite3.connect(":memory:")
+        sink = SqlSink(connection, batchSize=2, flushInterval=None)
+
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, [_reading(1, 1), _reading(2, 2), _reading(3, 3)])
+
+        # A full batch written, the last reading buffered.
+        assert connection.execute("SELECT COUNT(*) FROM meter_readings").fetchone() == (2,)
+
+        sink.flush()
+
+        assert connection.execute("SELECT COUNT(*) FROM meter_readings").fetchone() == (3,)
+
+        # A corrected day replaces the previous reading.
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, [_reading(2, 20, "Corrigé")])
+        sink.write_all(PCE_IDENTIFIER, {Frequency.MONTHLY.value: [{PropertyName.TIME_PERIOD.value: "Janvier 2024"}]})
+        sink.close()
+
+        rows = connection.execute(
+            "SELECT frequency, time_period, period_start, volume_m3, temperature_degc, type FROM meter_readings"
+            " ORDER BY frequency, period_start"
+        ).fetchall()
+
+        assert rows == [
+            ("daily", "01/01/2024", "2024-01-01", 1.0, None, "Mesuré"),
+            ("daily", "02/01/2024", "2024-01-02", 20.0, None, "Corrigé"),
+            ("daily", "03/01/2024", "2024-01-03", 3.0, None, "Mesuré"),
+            ("monthly", "Janvier 2024", "2024-01-01", None, None, None),
+        ]
+
+    # ------------------------------------------------------
+    def test_write_stream(self):
+
+        connection = sqlite3.connect(":memory:")
+        sink = SqlSink(connection, table="readings", batchSize=500)
+
+        count = sink.write_stream(PCE_IDENTIFIER, Frequency.DAILY, (_reading(day % 28 + 1, day) for day in range(2500)))
+        sink.close()
+
+        assert count == 2500
+        assert connection.execute("SELECT COUNT(*), MAX(volume_m3) FROM readings").fetchone() == (28, 2499.0)
+
+    # ------------------------------------------------------
+    def test_flush_interval(self):
+
+        connection = sqlite3.connect(":memory:")
+        sink = SqlSink(connection, flushInterval=0)
+
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, [_reading(1, 1)])
+
+        assert connection.execute("SELECT COUNT(*) FROM meter_readings").fetchone() == (1,)
+
+    # ------------------------------------------------------
+    def test_idle_sink(self):
+
+        connection = sqlite3.connect(":memory:")
+        sink = SqlSink(connection, flushInterval=60)
+
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, [_reading(1, 1)])
+
+        # The interval is only checked when writing: the buffer of an idle sink is written by close().
+        assert connection.execute("SELECT COUNT(*) FROM meter_readings").fetchone() == (0,)
+
+        sink.close()
+
+        assert connection.execute("SELECT COUNT(*) FROM meter_readings").fetchone() == (1,)
+
+    # ------------------------------------------------------
+    def test_invalid_arguments(self):
+
+        with pytest.raises(ValueError):
+            SqlSink(sqlite3.connect(":memory:"), batchSize=0)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestInfluxLineProtocolSink:
+
+    # ------------------------------------------------------
+    def test_lines(self, tmp_path):
+
+        path = str(tmp_path / "readings.lp")
+        sink = InfluxLineProtocolSink(path, measurement="gas meter")
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, [_reading(1, 1.5)])
+        sink.write(
+            PCE_IDENTIFIER,
+            Frequency.HOURLY,
+            [{PropertyName.TIME_PERIOD.value: "01/01/2024 06:00", PropertyName.VOLUME.value: 0.25}],
+        )
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, [{PropertyName.TIME_PERIOD.value: "02/01/2024"}])
+        sink.close()
+
+        with open(path, mode="r", encoding="utf-8") as lineProtocolFile:
+            lines = lineProtocolFile.read().splitlines()
+
+        assert lines == [
+            f"gas\\ meter,pce_identifier={PCE_IDENTIFIER},frequency=daily"
+            " start_index_m3=1001.0,end_index_m3=1002.5,volume_m3=1.5,energy_kwh=16.799999999999997"
+            ',converter_factor_kwh/m3=11.2,type="Mesuré" 1704067200000000000',
+            f"gas\\ meter,pce_identifier={PCE_IDENTIFIER},frequency=hourly volume_m3=0.25 1704088800000000000",
+        ]
+
+    # ------------------------------------------------------
+    def test_http(self):
+
+        requests = list[tuple[str, dict[str, str], str]]()
+
+        class _Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):  # pylint: disable=invalid-name
+
+                body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+                requests.append((self.path, dict(self.headers), body))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            sink = InfluxLineProtocolSink(
+                f"http://127.0.0.1:{server.server_port}/api/v2/write?bucket=gas",
+                headers={"Authorization": "Token secret"},
+                batchSize=2,
+            )
+            sink.write(PCE_IDENTIFIER, Frequency.DAILY, [_reading(day, day) for day in range(1, 4)])
+            sink.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert [path for path, _, _ in requests] == ["/api/v2/write?bucket=gas"] * 2
+        assert requests[0][1]["Authorization"] == "Token secret"
+        assert [len(body.splitlines()) for _, _, body in requests] == [2, 1]
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestCsvSink:  # pylint: disable=too-few-public-methods
+
+    # ------------------------------------------------------
+    def test_write(self, tmp_path):
+
+        stream = io.StringIO()
+        sink = CsvSink(stream)
+        sink.write(PCE_IDENTIFIER, Frequency.DAILY, [_reading(1, 1.5)])
+        sink.close()
+
+        assert stream.getvalue().splitlines() == [
+            "pce_identifier,frequency,time_period,start_index_m3,end_index_m3,volume_m3,energy_kwh,"
+            "converter_factor_kwh/m3,temperature_degC,type,timestamp",
+            f"{PCE_IDENTIFIER},daily,01/01/2024,1001,1002.5,1.5,16.799999999999997,11.2,,Mesuré,2024-02-01T10:00:00",
+        ]
+
+        # The header only once in the file.
+        for _ in range(2):
+            sink = CsvSink(str(tmp_path / "readings.csv"))
+            sink.write(PCE_IDENTIFIER, Frequency.DAILY, [_reading(1, 1.5)])
+            sink.close()
+
+        with open(tmp_path / "readings.csv", mode="r", encoding="utf-8") as csvFile:
+            assert len(csvFile.read().splitlines()) == 3
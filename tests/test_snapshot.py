@@ -0,0 +1,204 @@
+from datetime import date, timedelta
+from typing import Any
+
+import pytest
+
+from pygazpar.client import Client
+from pygazpar.enum import PropertyName
+from pygazpar.snapshot import FileSnapshotStore, ISnapshotStore, MemorySnapshotStore
+from tests.conftest import FakeDataSource
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _reading(day: date, volume: float, timestamp: str = "2024-01-01T00:00:00") -> dict[str, Any]:
+
+    return {
+        PropertyName.TIME_PERIOD.value: day.strftime("%d/%m/%Y"),
+        PropertyName.VOLUME.value: volume,
+        PropertyName.TIMESTAMP.value: timestamp,
+    }
+
+
+# ------------------------------------------------------------------------------------------------------------
+class _DailyDataSource(FakeDataSource):
+
+    # ------------------------------------------------------
+    def __init__(self):
+
+        super().__init__([PCE_IDENTIFIER])
+
+        self.volumes = dict[date, float]()
+
+    # ------------------------------------------------------
+    def daily_readings(self, pceIdentifier: str, startDate: date, endDate: date) -> list[dict[str, Any]]:
+
+        # A new timestamp at each load.
+        return [
+            _reading(day, volume, f"2024-01-01T00:00:{len(self.loads):02d}")
+            for day, volume in sorted(self.volumes.items())
+            if startDate <= day <= endDate
+        ]
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestSnapshotStore:
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("storeType", ["memory", "file"])
+    def test_update(self, storeType: str, tmp_path):
+
+        store: ISnapshotStore = MemorySnapshotStore() if storeType == "memory" else FileSnapshotStore(str(tmp_path))
+
+        assert store.version(PCE_IDENTIFIER) == 0
+        assert store.changes(PCE_IDENTIFIER) == []
+
+        # Not in date order.
+        readings = [_reading(date(2024, 1, 2), 2), _reading(date(2024, 1, 1), 1)]
+
+        assert store.update(PCE_IDENTIFIER, readings) == 1
+        assert store.update(PCE_IDENTIFIER, [_reading(date(2024, 1, 1), 1, "2024-01-02T00:00:00")]) == 1
+        assert store.update(PCE_IDENTIFIER, [_reading(date(2024, 1, 1), 10), _reading(date(2024, 1, 3), 3)]) == 2
+
+        assert store.changes(PCE_IDENTIFIER, 1) == [_reading(date(2024, 1, 1), 10), _reading(date(2024, 1, 3), 3)]
+        assert store.changes(PCE_IDENTIFIER, 2) == []
+        assert len(store.changes(PCE_IDENTIFIER)) == 3
+
+        # Ahead of the store: all the days.
+        assert len(store.changes(PCE_IDENTIFIER, 5)) == 3
+
+        # The stored readings are copies.
+        readings[0][PropertyName.VOLUME.value] = 20
+        assert store.changes(PCE_IDENTIFIER, 0)[1][PropertyName.VOLUME.value] == 2
+
+        # So are the returned ones.
+        store.changes(PCE_IDENTIFIER)[0][PropertyName.VOLUME.value] = 30
+        assert store.changes(PCE_IDENTIFIER)[0][PropertyName.VOLUME.value] == 10
+
+    # ------------------------------------------------------
+    def test_missing_temperatures(self):
+
+        store = MemorySnapshotStore()
+
+        readings = [_reading(date(2024, 1, day), day) for day in (1, 2)]
+        for reading in readings:
+            reading[PropertyName.TEMPERATURE.value] = 5.0
+
+        version = store.update(PCE_IDENTIFIER, readings)
+
+        # The same volumes reloaded without temperatures (failed weather request): nothing has changed.
+        withoutTemperatures = [{**reading, PropertyName.TEMPERATURE.value: None} for reading in readings]
+
+        assert store.update(PCE_IDENTIFIER, withoutTemperatures) == version
+        assert store.changes(PCE_IDENTIFIER, version) == []
+        assert all(reading[PropertyName.TEMPERATURE.value] == 5.0 for reading in store.changes(PCE_IDENTIFIER))
+
+        # A corrected volume without temperature keeps the known temperature.
+        withoutTemperatures[0][PropertyName.VOLUME.value] = 10
+
+        assert store.update(PCE_IDENTIFIER, withoutTemperatures) == version + 1
+        assert store.changes(PCE_IDENTIFIER, version) == [
+            {**readings[0], PropertyName.VOLUME.value: 10, PropertyName.TEMPERATURE.value: 5.0}
+        ]
+
+    # ------------------------------------------------------
+    def test_fingerprint(self):
+
+        reading = _reading(date(2024, 1, 1), 1)
+        reordered = dict(reversed(list(reading.items())))
+
+        assert ISnapshotStore.fingerprint(reordered) == ISnapshotStore.fingerprint(reading)
+        assert ISnapshotStore.fingerprint(_reading(date(2024, 1, 1), 2)) != ISnapshotStore.fingerprint(reading)
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("storeType", ["memory", "file"])
+    def test_retention(self, storeType: str, tmp_path):
+
+        store: ISnapshotStore = (
+            MemorySnapshotStore(retention_days=10)
+            if storeType == "memory"
+            else FileSnapshotStore(str(tmp_path), retention_days=10)
+        )
+
+        store.update(PCE_IDENTIFIER, [_reading(date(2024, 1, 1) + timedelta(days=i), i) for i in range(10)])
+
+        assert len(store.changes(PCE_IDENTIFIER)) == 10
+
+        # The days older than 10 days before the most recent one are removed.
+        assert store.update(PCE_IDENTIFIER, [_reading(date(2024, 1, 15), 15)]) == 2
+        assert [reading[PropertyName.TIME_PERIOD.value] for reading in store.changes(PCE_IDENTIFIER)] == [
+            "06/01/2024",
+            "07/01/2024",
+            "08/01/2024",
+            "09/01/2024",
+            "10/01/2024",
+            "15/01/2024",
+        ]
+
+        # Unlimited retention.
+        store = MemorySnapshotStore(retention_days=None)
+        store.update(PCE_IDENTIFIER, [_reading(date(2020, 1, 1), 1), _reading(date(2024, 1, 1), 1)])
+
+        assert len(store.changes(PCE_IDENTIFIER)) == 2
+
+    # ------------------------------------------------------
+    def test_file_persistence(self, tmp_path):
+
+        store = FileSnapshotStore(str(tmp_path))
+        store.update(PCE_IDENTIFIER, [_reading(date(2024, 1, 1), 1), _reading(date(2024, 1, 2), 2)])
+        store.update(PCE_IDENTIFIER, [_reading(date(2024, 1, 2), 3)])
+
+        reopened = FileSnapshotStore(str(tmp_path))
+
+        assert reopened.version(PCE_IDENTIFIER) == 2
+        assert reopened.changes(PCE_IDENTIFIER, 1) == [_reading(date(2024, 1, 2), 3)]
+        assert reopened.update(PCE_IDENTIFIER, [_reading(date(2024, 1, 2), 3)]) == 2
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestLoadChanges:  # pylint: disable=too-few-public-methods
+
+    # ------------------------------------------------------
+    def test_load_changes(self):
+
+        dataSource = _DailyDataSource()
+        client = Client(dataSource)
+
+        endDate = date(2024, 1, 31)
+        for day in range(1, 31):
+            dataSource.volumes[date(2024, 1, day)] = day
+
+        readings, watermark = client.load_changes(PCE_IDENTIFIER, end_date=endDate)
+
+        assert len(readings) == 30
+
+        # Nothing new.
+        readings, watermark = client.load_changes(PCE_IDENTIFIER, watermark, end_date=endDate)
+
+        assert readings == []
+
+        # A new day and a corrected day.
+        dataSource.volumes[date(2024, 1, 31)] = 31
+        dataSource.volumes[date(2024, 1, 10)] = 100
+
+        readings, newWatermark = client.load_changes(PCE_IDENTIFIER, watermark, end_date=endDate)
+
+        assert newWatermark > watermark
+        assert [
+            (reading[PropertyName.TIME_PERIOD.value], reading[PropertyName.VOLUME.value]) for reading in readings
+        ] == [
+            ("10/01/2024", 100),
+            ("31/01/2024", 31),
+        ]
+
+        # A new consumer: all the days.
+        readings, _ = client.load_changes(PCE_IDENTIFIER, end_date=endDate)
+
+        assert len(readings) == 31
+
+        # Only the last days are loaded.
+        readings, _ = client.load_changes(PCE_IDENTIFIER, newWatermark, last_n_days=5, end_date=endDate + timedelta(1))
+
+        assert readings == []
+        assert len(dataSource.loads) == 5
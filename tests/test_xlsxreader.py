@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Any
+
+import pytest
+from openpyxl import Workbook
+
+from pygazpar.enum import Frequency, PropertyName
+from pygazpar.excelparser import ExcelParser
+from pygazpar.xlsxreader import XlsxReader
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _workbook(filename: str, rows: list[list[Any]]) -> str:
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    for rownum, row in enumerate(rows, start=10):
+        for column, value in enumerate(row, start=2):
+            worksheet.cell(row=rownum, column=column, value=value)  # type: ignore
+    workbook.save(filename)
+
+    return filename
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TestXlsxReader:
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("frequency", [Frequency.DAILY, Frequency.WEEKLY, Frequency.MONTHLY])
+    def test_same_output(self, frequency: Frequency, without_timestamp):
+
+        filename = f"tests/resources/Donnees_informatives_PCE_{frequency.name}.xlsx"
+
+        readings = ExcelParser.parse(filename, frequency)
+
+        assert len(readings) > 0
+        assert without_timestamp(readings) == without_timestamp(ExcelParser.parse(filename, frequency, False))
+
+    # ------------------------------------------------------
+    def test_iter_rows(self, tmp_path):
+
+        filename = _workbook(
+            str(tmp_path / "values.xlsx"),
+            [
+                ["01/01/2022", 1, 2.5, " a & <b> ", None, True],
+                [],
+                ["03/01/2022", None, None, None, None, False, None, "last", "ignored"],
+            ],
+        )
+
+        assert list(XlsxReader.iter_rows(filename, 10, 2, 9)) == [
+            ("01/01/2022", 1, 2.5, " a & <b> ", None, True, None, None),
+            ("03/01/2022", None, None, None, None, False, None, "last"),
+        ]
+
+        assert list(XlsxReader.iter_rows(filename, 12, 3, 4)) == []
+
+    # ------------------------------------------------------
+    def test_fallback(self, tmp_path, without_timestamp):
+
+        dates = _workbook(str(tmp_path / "dates.xlsx"), [[datetime(2022, 1, 1), 1, 2, 1, 11, "11,2", None, "Mesuré"]])
+        formulas = _workbook(str(tmp_path / "formulas.xlsx"), [["01/01/2022", 1, 2, 1, 11, None, None, '="Mesuré"']])
+
+        # Unexpected layouts: not read by the fast reader...
+        with pytest.raises(ValueError):
+            list(XlsxReader.iter_rows(dates, 10, 2, 9))
+
+        with pytest.raises(ValueError):
+            list(XlsxReader.iter_rows(formulas, 10, 2, 9))
+
+        # ... but by openpyxl.
+        for filename in [dates, formulas]:
+            assert without_timestamp(ExcelParser.parse(filename, Frequency.DAILY)) == without_timestamp(
+                ExcelParser.parse(filename, Frequency.DAILY, False)
+            )
+
+        assert ExcelParser.parse(dates, Frequency.DAILY)[0][PropertyName.TIME_PERIOD.value] == datetime(2022, 1, 1)
+        assert ExcelParser.parse(dates, Frequency.DAILY)[0][PropertyName.CONVERTER_FACTOR.value] == 11.2